@@ -1,5 +1,23 @@
+import io
+
 import streamlit as st
 
+from sf_security.network import (
+    ALLOWED, BLOCKED, INVALID, UNMATCHED, NetworkPolicyIndex, classify_log, parse_ip_list
+)
+from sf_security.identifiers import check_perimeter_names
+from sf_security.login_replay import replay_logins
+from sf_security.policy_builder import (
+    AUTHENTICATION_METHODS, DEFAULT_BATCH_SIZE, assign_policies, default_assignments,
+    default_authentication_policies, default_session_policies, load_users, render_policy_builder_sql,
+    validate_policies
+)
+from sf_security.project import get_project
+from sf_security.script_panels import render_optimize_options, render_run_panel
+from sf_security.session_sim import load_idle_gaps, reauthentications_by_user, simulate_timeouts
+from sf_security.spec import SPEC_VERSION, SpecError, dump_spec, load_spec, perimeter_section
+from sf_security.templates import CLIENT_TYPES, MFA_ENROLLMENT_OPTIONS, mfa_client_types_problem
+
 # Page configuration
 st.set_page_config(
     page_title="Snowflake Security Setup - Perimeter",
@@ -12,6 +30,53 @@ st.title("Snowflake Security Perimeter Setup")
 st.markdown("### Network Rules, Network Policy, Session Policy, and Authentication Policy")
 st.markdown("---")
 
+# Parse an uploaded query history export once and reuse the gaps and sweep across reruns
+@st.cache_data(show_spinner="Computing idle gaps...", max_entries=4)
+def upload_idle_gaps(file_bytes, file_name):
+    """Compute the idle gaps of an uploaded query history export"""
+    return load_idle_gaps(io.BytesIO(file_bytes), file_name=file_name)
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def sweep_session_timeouts(file_bytes, file_name):
+    """Compute the idle-timeout sweep for an uploaded query history export"""
+    return simulate_timeouts(upload_idle_gaps(file_bytes, file_name))
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def upload_reauthentications(file_bytes, file_name, timeout):
+    """Count the re-authentications one timeout would force on each user of an upload"""
+    return reauthentications_by_user(upload_idle_gaps(file_bytes, file_name), timeout)
+
+# Configuration kept in session state so an imported spec can replace it; the widgets start
+# from the project shared with the other pages, so values survive switching pages
+project = get_project()
+st.session_state.setdefault('company_name', project.fields['company_name'])
+st.session_state.setdefault('allowed_ips_input', "\n".join(project.fields['allowed_ips']))
+st.session_state.setdefault('blocked_ips_input', "\n".join(project.fields['blocked_ips']))
+st.session_state.setdefault('session_timeout', project.fields['session_timeout'])
+st.session_state.setdefault('mfa_enrollment', project.fields['mfa_enrollment'])
+st.session_state.setdefault('client_types', list(project.fields['client_types']))
+
+def import_perimeter_spec():
+    """Load the perimeter section of an uploaded spec into the configuration widgets"""
+    st.session_state.perimeter_spec_errors = []
+    uploaded = st.session_state.perimeter_spec_file
+    if uploaded is None:
+        return
+    try:
+        perimeter = load_spec(uploaded.getvalue(), file_name=uploaded.name)['perimeter']
+    except SpecError as e:
+        st.session_state.perimeter_spec_errors = e.errors
+        return
+    if perimeter is None:
+        st.session_state.perimeter_spec_errors = ["spec: has no 'perimeter' section"]
+        return
+    st.session_state.company_name = perimeter['company_name']
+    st.session_state.allowed_ips_input = "\n".join(perimeter['allowed_ips'])
+    st.session_state.blocked_ips_input = "\n".join(perimeter['blocked_ips'])
+    st.session_state.session_timeout = perimeter['session_timeout']
+    st.session_state.mfa_enrollment = perimeter['mfa_enrollment']
+    st.session_state.client_types = perimeter['client_types']
+
 # Input section
 st.subheader("📝 Configuration")
 col1, col2 = st.columns(2)
@@ -20,13 +85,14 @@ with col1:
     company_name = st.text_input(
         "Company Name",
         placeholder="Enter your company name (e.g., acme)",
-        help="Used to prefix network rules and policies"
+        help="Used to prefix network rules and policies",
+        key='company_name'
     )
 
 with col2:
     allowed_ips_input = st.text_area(
         "Allowed IP Ranges",
-        value="192.0.0.1/24",
+        key='allowed_ips_input',
         height=100,
         help="Enter one or more IPs/CIDR ranges (comma-separated or one per line)\nExample: 192.0.0.1/24, 10.0.0.0/16"
     )
@@ -36,7 +102,7 @@ col3, col4 = st.columns(2)
 with col3:
     blocked_ips_input = st.text_area(
         "Blocked IPs",
-        value="184.0.23.212",
+        key='blocked_ips_input',
         height=100,
         help="Enter one or more IPs to block (comma-separated or one per line)\nExample: 184.0.23.212, 192.168.1.100"
     )
@@ -46,23 +112,132 @@ with col4:
         "Session Idle Timeout (minutes)",
         min_value=5,
         max_value=480,
-        value=30,
+        key='session_timeout',
         help="Idle timeout for user sessions"
     )
+    
+    with st.expander("📈 Simulate timeout impact"):
+        st.caption(
+            "Upload a `QUERY_HISTORY` export with `USER_NAME` and `START_TIME` "
+            "(plus `SESSION_ID` and `END_TIME` when available) to see how many sessions "
+            "each timeout would have force-ended."
+        )
+        activity_file = st.file_uploader("Query history export", type=["csv", "parquet"])
+        if activity_file is not None:
+            try:
+                timeout_sweep = sweep_session_timeouts(activity_file.getvalue(), activity_file.name)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                current = timeout_sweep[timeout_sweep['TIMEOUT_MINS'] == session_timeout].iloc[0]
+                sweep_col1, sweep_col2 = st.columns(2)
+                sweep_col1.metric(f"Sessions ended at {session_timeout} min", f"{int(current['SESSIONS_ENDED']):,}")
+                sweep_col2.metric("Re-auths per user", f"{current['REAUTHS_PER_USER']:,}")
+                st.line_chart(timeout_sweep.set_index('TIMEOUT_MINS')[['SESSIONS_ENDED', 'REAUTHENTICATIONS']])
+                st.markdown(f"**Re-authentications per user at {session_timeout} min**")
+                st.dataframe(
+                    upload_reauthentications(activity_file.getvalue(), activity_file.name, session_timeout),
+                    hide_index=True
+                )
+
+col5, col6 = st.columns(2)
+
+with col5:
+    mfa_enrollment = st.selectbox(
+        "MFA Enrollment",
+        MFA_ENROLLMENT_OPTIONS,
+        key='mfa_enrollment',
+        help="Whether users must enroll in multi-factor authentication"
+    )
+
+with col6:
+    client_types = st.multiselect(
+        "Allowed Client Types",
+        list(CLIENT_TYPES),
+        format_func=CLIENT_TYPES.get,
+        key='client_types',
+        help="Clients allowed to authenticate (leave empty to allow all clients)"
+    )
+
+# Share the inputs; only the SQL fragments depending on a changed field are rebuilt
+project.update(
+    company_name=company_name,
+    allowed_ips=parse_ip_list(allowed_ips_input),
+    blocked_ips=parse_ip_list(blocked_ips_input),
+    session_timeout=session_timeout,
+    mfa_enrollment=mfa_enrollment,
+    client_types=client_types,
+)
+
+# Check the name before anything is rendered from it
+name_problems = check_perimeter_names(company_name) if company_name else []
+for problem in name_problems:
+    st.error(f"❌ {problem}")
+
+# Snowflake rejects a policy requiring MFA that doesn't allow the client users enroll through
+policy_problem = mfa_client_types_problem(mfa_enrollment, client_types)
+if policy_problem:
+    st.error(f"❌ {policy_problem}")
+
+# Policy-as-code import/export
+with st.expander("📁 Policy as Code"):
+    st.markdown("Load the configuration from a YAML/JSON spec, or export the current configuration as one.")
+    st.file_uploader(
+        "Import spec",
+        type=["yaml", "yml", "json"],
+        key='perimeter_spec_file',
+        on_change=import_perimeter_spec
+    )
+    for error in st.session_state.get('perimeter_spec_errors', []):
+        st.error(f"❌ {error}")
+    
+    if company_name and not name_problems and not policy_problem:
+        current_spec = {
+            'version': SPEC_VERSION,
+            'perimeter': perimeter_section(
+                company_name, parse_ip_list(allowed_ips_input), parse_ip_list(blocked_ips_input),
+                session_timeout, mfa_enrollment, client_types
+            ),
+        }
+        export_col1, export_col2 = st.columns(2)
+        with export_col1:
+            st.download_button(
+                label="📥 Export Spec (YAML)",
+                data=dump_spec(current_spec, 'yaml'),
+                file_name=f"security_perimeter_{company_name}.yaml",
+                mime="text/yaml"
+            )
+        with export_col2:
+            st.download_button(
+                label="📥 Export Spec (JSON)",
+                data=dump_spec(current_spec, 'json'),
+                file_name=f"security_perimeter_{company_name}.json",
+                mime="application/json"
+            )
 
-# Parse IP inputs to handle both comma-separated and newline-separated lists
-def parse_ip_list(ip_input):
-    """Parse IP input string into a list of IPs, handling commas and newlines"""
-    if not ip_input:
-        return []
-    # Replace newlines with commas, then split by comma
-    ips = ip_input.replace('\n', ',').split(',')
-    # Strip whitespace and filter out empty strings
-    ips = [ip.strip() for ip in ips if ip.strip()]
-    return ips
+# Build the IP lookup index once per distinct set of rules
+@st.cache_resource(show_spinner=False)
+def get_policy_index(allowed_ips, blocked_ips):
+    """Build a lookup index over the allowed and blocked network rules"""
+    return NetworkPolicyIndex(allowed_ips, blocked_ips)
 
-# Only show content if company name is provided
-if company_name:
+# Classify and replay uploads once per file and set of rules, not on every rerun
+@st.cache_data(show_spinner="Classifying log entries...", max_entries=8)
+def classify_access_log(file_bytes, allowed_ips, blocked_ips):
+    """Classify an uploaded access log against the network rules"""
+    return classify_log(io.BytesIO(file_bytes), get_policy_index(allowed_ips, blocked_ips))
+
+@st.cache_data(show_spinner="Replaying login history...", max_entries=8)
+def replay_login_history(file_bytes, file_name, allowed_ips, blocked_ips, successful_only):
+    """Replay an uploaded login history export through the network rules"""
+    return replay_logins(
+        io.BytesIO(file_bytes), get_policy_index(allowed_ips, blocked_ips),
+        file_name=file_name,
+        successful_only=successful_only
+    )
+
+# Only show content if a valid company name is provided
+if company_name and not name_problems and not policy_problem:
     # Parse the IP inputs
     allowed_ips_list = parse_ip_list(allowed_ips_input)
     blocked_ips_list = parse_ip_list(blocked_ips_input)
@@ -70,7 +245,9 @@ if company_name:
     st.markdown("---")
     
     # Create tabs for different views
-    tab1, tab2, tab3 = st.tabs(["📊 Policy Overview", "📜 Generated SQL", "📚 Documentation"])
+    tab1, tab2, tab3, tab4, tab5 = st.tabs(
+        ["📊 Policy Overview", "📜 Generated SQL", "📚 Documentation", "🔎 IP Lookup", "👥 Policy Builder"]
+    )
     
     with tab1:
         st.subheader("Security Policy Configuration")
@@ -120,137 +297,17 @@ if company_name:
         
         auth_col1, auth_col2 = st.columns(2)
         with auth_col1:
-            st.success("✅ **MFA:** Required")
+            st.success(f"✅ **MFA:** {mfa_enrollment.title()}")
         with auth_col2:
-            st.success("✅ **Allowed Clients:** Snowflake UI, Snowflake CLI")
+            allowed_clients = ", ".join(CLIENT_TYPES[c] for c in client_types) or "All clients"
+            st.success(f"✅ **Allowed Clients:** {allowed_clients}")
     
     with tab2:
         st.subheader("Generated SQL Script")
         st.markdown("This script sets up the complete security perimeter for your Snowflake account.")
         
-        # Format IP lists for SQL VALUE_LIST
-        allowed_ips_sql = ", ".join([f"'{ip}'" for ip in allowed_ips_list])
-        blocked_ips_sql = ", ".join([f"'{ip}'" for ip in blocked_ips_list])
-        
-        # Generate network rules SQL (only if IPs are provided)
-        allowed_rule_sql = ""
-        blocked_rule_sql = ""
-        allowed_rule_list = ""
-        blocked_rule_list = ""
-        
-        if allowed_ips_list:
-            allowed_rule_sql = f"""
-CREATE NETWORK RULE SECURITY_SCHEMA.{company_name}_allowed_ips
-    TYPE = IPV4
-    VALUE_LIST = ({allowed_ips_sql})
-    MODE = INGRESS
-    COMMENT = 'Allow access from specified IPs and subnets (VPN for instance)';
-"""
-            allowed_rule_list = f"    ALLOWED_NETWORK_RULE_LIST = ({company_name}_allowed_ips)"
-        
-        if blocked_ips_list:
-            blocked_rule_sql = f"""
-CREATE NETWORK RULE SECURITY_SCHEMA.{company_name}_blocked_ips
-    TYPE = IPV4
-    VALUE_LIST = ({blocked_ips_sql})
-    MODE = INGRESS
-    COMMENT = 'Block access from specified IPs';
-"""
-            blocked_rule_list = f"    BLOCKED_NETWORK_RULE_LIST = ({company_name}_blocked_ips)"
-        
-        # Build the network policy clause
-        network_policy_clauses = []
-        if allowed_rule_list:
-            network_policy_clauses.append(allowed_rule_list)
-        if blocked_rule_list:
-            network_policy_clauses.append(blocked_rule_list)
-        
-        network_policy_sql = ""
-        if network_policy_clauses:
-            network_policy_sql = f"""
-CREATE OR REPLACE NETWORK POLICY {company_name}_network_policy
-{chr(10).join(network_policy_clauses)}
-    COMMENT = 'Network policy for {company_name}';
-"""
-        
-        # Generate the SQL with replacements
-        sql_script = f"""-- ============================================================================
--- 1. PREPPING THE ROLE SECURITY CONFIGURATION
--- ============================================================================
-USE ROLE SYSADMIN;
-
-CREATE DATABASE IF NOT EXISTS SECURITY_DB;
-CREATE SCHEMA IF NOT EXISTS SECURITY_DB.SECURITY_SCHEMA;
-USE DATABASE SECURITY_DB;
-USE SCHEMA SECURITY_SCHEMA;
-
-GRANT USAGE ON DATABASE SECURITY_DB TO ROLE SECURITYADMIN;
-GRANT USAGE ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
-GRANT SELECT ON ALL TABLES IN SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
-GRANT SELECT ON FUTURE TABLES IN SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
-GRANT CREATE SESSION POLICY ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
-GRANT CREATE NETWORK RULE ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
-GRANT CREATE SESSION POLICY ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
-GRANT CREATE AUTHENTICATION POLICY ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
-
-GRANT CREATE NETWORK POLICY ON ACCOUNT TO ROLE SECURITYADMIN;
-
-
-USE ROLE SECURITYADMIN;
-
--- ============================================================================
--- 2. NETWORK RULES AND POLICY
--- ============================================================================
--- Network rules define access controls for external network locations
--- (used with external access integrations for data egress)
--- Ref: https://docs.snowflake.com/en/sql-reference/sql/create-network-rule
-{allowed_rule_sql}{blocked_rule_sql}{network_policy_sql}
-
-    
-
--- ============================================================================
--- 3. SESSION POLICY
--- ============================================================================
--- Session policies control user session behavior and timeouts
--- Idle timeout set to {session_timeout} minutes as specified
--- Ref: https://docs.snowflake.com/en/sql-reference/sql/create-session-policy
--- Can be applied to account or user
-
-CREATE OR REPLACE SESSION POLICY SECURITY_DB.SECURITY_SCHEMA.standard_session_policy
-    SESSION_IDLE_TIMEOUT_MINS = {session_timeout}
-    SESSION_UI_IDLE_TIMEOUT_MINS = {session_timeout}
-    COMMENT = 'Standard session policy with {session_timeout}-minute idle timeout';
-
-
--- ============================================================================
--- 4. AUTHENTICATION POLICY
--- ============================================================================
--- Authentication policies define authentication requirements for users
--- This policy allows Snowflake UI access and CLI access
--- Ref: https://docs.snowflake.com/en/sql-reference/sql/create-authentication-policy
-
-CREATE OR REPLACE AUTHENTICATION POLICY SECURITY_DB.SECURITY_SCHEMA.ui_cli_auth_policy
-  MFA_ENROLLMENT = REQUIRED
-  CLIENT_TYPES = ('SNOWFLAKE_UI', 'SNOWFLAKE_CLI');
-
-
--- ============================================================================
--- 5. APPLY POLICIES (OPTIONAL)
--- ============================================================================
--- Apply network policy to account
--- ALTER ACCOUNT SET NETWORK_POLICY = {company_name}_network_policy;
-
--- Apply session policy to account
--- ALTER ACCOUNT SET SESSION_POLICY = SECURITY_DB.SECURITY_SCHEMA.standard_session_policy;
-
--- Apply authentication policy to account
--- ALTER ACCOUNT SET AUTHENTICATION POLICY = SECURITY_DB.SECURITY_SCHEMA.ui_cli_auth_policy;
-
--- Or apply to specific users:
--- ALTER USER <username> SET NETWORK_POLICY = {company_name}_network_policy;
--- ALTER USER <username> SET SESSION POLICY = SECURITY_DB.SECURITY_SCHEMA.standard_session_policy;
--- ALTER USER <username> SET AUTHENTICATION POLICY = SECURITY_DB.SECURITY_SCHEMA.ui_cli_auth_policy;
-"""
+        sql_script = project.perimeter_sql()
+        sql_script = render_optimize_options(sql_script, key='perimeter_optimize')
         
         st.code(sql_script, language='sql')
         
@@ -261,6 +318,8 @@ CREATE OR REPLACE AUTHENTICATION POLICY SECURITY_DB.SECURITY_SCHEMA.ui_cli_auth_
             file_name=f"security_perimeter_setup_{company_name}.sql",
             mime="text/plain"
         )
+        
+        render_run_panel(sql_script, key='perimeter_run')
     
     with tab3:
         st.subheader("📚 Documentation & Best Practices")
@@ -321,11 +380,213 @@ CREATE OR REPLACE AUTHENTICATION POLICY SECURITY_DB.SECURITY_SCHEMA.ui_cli_auth_
         7. **Monitor Access**: Use query history to track policy effectiveness
         """)
 
-else:
+    with tab4:
+        st.subheader("🔎 Would This IP Be Allowed?")
+        st.markdown("""
+        Test client addresses against the configured network rules before deploying the policy.
+        Blocked rules take precedence over allowed rules. Addresses that match neither list are
+        **unmatched**, which Snowflake rejects as soon as an allowed list is in place.
+        """)
+        
+        try:
+            policy_index = get_policy_index(tuple(allowed_ips_list), tuple(blocked_ips_list))
+        except ValueError as e:
+            st.error(f"❌ The network rules could not be parsed: {e}")
+            policy_index = None
+        
+        if policy_index is not None:
+            status_labels = {
+                ALLOWED: "✅ Allowed",
+                BLOCKED: "🚫 Blocked",
+                UNMATCHED: "❔ Unmatched",
+                INVALID: "⚠️ Invalid address",
+            }
+            
+            lookup_input = st.text_area(
+                "Client IPs to check",
+                placeholder="192.0.0.10, 184.0.23.212",
+                height=100,
+                help="Enter one or more IPs (comma-separated or one per line)"
+            )
+            lookup_ips = parse_ip_list(lookup_input)
+            if lookup_ips:
+                lookup_results = policy_index.classify(lookup_ips)
+                st.dataframe(
+                    {"Client IP": lookup_ips, "Result": [status_labels[r] for r in lookup_results]},
+                    hide_index=True
+                )
+            
+            st.markdown("---")
+            st.markdown("### 📂 Check an Access Log")
+            st.markdown("""
+            Upload a `LOGIN_HISTORY` export (any CSV with a `CLIENT_IP` column) or a plain text access log.
+            For text logs, the first IPv4 address on each line is used. Files are processed in chunks.
+            """)
+            
+            log_file = st.file_uploader("Access log", type=["csv", "log", "txt"])
+            log_results = None
+            if log_file is not None:
+                try:
+                    log_results = classify_access_log(
+                        log_file.getvalue(), tuple(allowed_ips_list), tuple(blocked_ips_list)
+                    )
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+            if log_results is not None:
+                totals = log_results.groupby('status')['hits'].sum()
+                metric_cols = st.columns(4)
+                for metric_col, status in zip(metric_cols, [ALLOWED, BLOCKED, UNMATCHED, INVALID]):
+                    metric_col.metric(status_labels[status], f"{int(totals.get(status, 0)):,}")
+                
+                st.markdown("**Top client IPs**")
+                st.dataframe(
+                    log_results.head(1000).assign(status=lambda df: df['status'].map(status_labels)),
+                    hide_index=True
+                )
+                st.download_button(
+                    label="📥 Download Classification (CSV)",
+                    data=log_results.to_csv(index=False),
+                    file_name=f"ip_lookup_{company_name}.csv",
+                    mime="text/csv"
+                )
+            
+            st.markdown("---")
+            st.markdown("### 🔮 Predict Lockouts")
+            st.markdown(f"""
+            Before running `ALTER ACCOUNT SET NETWORK_POLICY = {company_name}_network_policy`, replay a
+            `LOGIN_HISTORY` export (CSV or Parquet) through the policy to see who would have been rejected.
+            The export needs `USER_NAME` and `CLIENT_IP` columns; `IS_SUCCESS` and `EVENT_TIMESTAMP` are used when present.
+            """)
+            st.code("""SELECT EVENT_TIMESTAMP, USER_NAME, CLIENT_IP, IS_SUCCESS
+FROM SNOWFLAKE.ACCOUNT_USAGE.LOGIN_HISTORY
+WHERE EVENT_TIMESTAMP >= DATEADD(day, -30, CURRENT_TIMESTAMP());""", language="sql")
+            
+            history_file = st.file_uploader("Login history export", type=["csv", "parquet"])
+            successful_only = st.checkbox(
+                "Only replay successful logins",
+                value=True,
+                help="Failed logins were already rejected, so they can't become new lockouts"
+            )
+            if history_file is not None:
+                try:
+                    lockouts_by_user, lockouts_by_ip = replay_login_history(
+                        history_file.getvalue(), history_file.name,
+                        tuple(allowed_ips_list), tuple(blocked_ips_list),
+                        successful_only
+                    )
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                else:
+                    replay_col1, replay_col2, replay_col3 = st.columns(3)
+                    replay_col1.metric("Users Affected", f"{len(lockouts_by_user):,}")
+                    replay_col2.metric("Users Fully Locked Out", f"{int(lockouts_by_user['LOCKED_OUT'].sum()):,}")
+                    replay_col3.metric("Rejected Logins", f"{int(lockouts_by_ip['REJECTED_LOGINS'].sum()):,}")
+                    
+                    if lockouts_by_user.empty:
+                        st.success("✅ No historical login would have been rejected by this policy.")
+                    else:
+                        st.markdown("**Rejected logins by user**")
+                        st.dataframe(lockouts_by_user, hide_index=True)
+                        st.markdown("**Rejected logins by user and client IP**")
+                        st.dataframe(lockouts_by_ip.head(1000), hide_index=True)
+                        st.download_button(
+                            label="📥 Download Lockout Report (CSV)",
+                            data=lockouts_by_ip.to_csv(index=False),
+                            file_name=f"lockout_report_{company_name}.csv",
+                            mime="text/csv"
+                        )
+
+    with tab5:
+        st.subheader("👥 Authentication & Session Policy Builder")
+        st.markdown(f"""
+        Define several authentication and session policies and assign them to groups of users,
+        e.g. MFA for people and key-pair authentication through `DRIVERS` for service accounts.
+        Policies are created in `SECURITY_DB.SECURITY_SCHEMA`. Lists such as client types and
+        authentication methods are comma-separated (`{", ".join(AUTHENTICATION_METHODS)}`).
+        """)
+        
+        st.markdown("**Authentication Policies**")
+        auth_policies = st.data_editor(
+            default_authentication_policies(),
+            num_rows="dynamic",
+            hide_index=True,
+            key='builder_auth_policies',
+            column_config={
+                'MFA_ENROLLMENT': st.column_config.SelectboxColumn(options=list(MFA_ENROLLMENT_OPTIONS)),
+            }
+        )
+        
+        st.markdown("**Session Policies**")
+        session_policies = st.data_editor(
+            default_session_policies(),
+            num_rows="dynamic",
+            hide_index=True,
+            key='builder_session_policies',
+            column_config={
+                'IDLE_TIMEOUT_MINS': st.column_config.NumberColumn(min_value=5, max_value=480, step=1),
+                'UI_IDLE_TIMEOUT_MINS': st.column_config.NumberColumn(min_value=5, max_value=480, step=1),
+            }
+        )
+        
+        st.markdown("**Assignments by User Group**")
+        assignments = st.data_editor(
+            default_assignments(),
+            num_rows="dynamic",
+            hide_index=True,
+            key='builder_assignments'
+        )
+        
+        policy_errors = validate_policies(auth_policies, session_policies, assignments)
+        for error in policy_errors:
+            st.error(f"❌ {error}")
+        
+        st.markdown("---")
+        st.markdown("""
+        Upload a user list with a `NAME` (or `USER_NAME`) column and a `USER_GROUP` (or `TYPE`) column,
+        for example the output of `SHOW USERS` exported to CSV.
+        """)
+        users_file = st.file_uploader("User list", type=["csv"], key='builder_users_file')
+        batch_size = st.number_input(
+            "Statements per batch",
+            min_value=100,
+            max_value=10000,
+            value=DEFAULT_BATCH_SIZE,
+            step=100,
+            help="ALTER USER statements are grouped per policy into batches of this size; each batch runs as one EXECUTE IMMEDIATE block"
+        )
+        
+        if users_file is not None and not policy_errors:
+            try:
+                builder_users = load_users(users_file)
+            except ValueError as e:
+                st.error(f"❌ {e}")
+            else:
+                assigned_users, unassigned_users = assign_policies(builder_users, assignments)
+                
+                builder_col1, builder_col2 = st.columns(2)
+                builder_col1.metric("Users Assigned", f"{len(assigned_users):,}")
+                builder_col2.metric("Users Without a Matching Group", f"{len(unassigned_users):,}")
+                if not unassigned_users.empty:
+                    with st.expander("Users without a matching group"):
+                        st.dataframe(unassigned_users.head(1000), hide_index=True)
+                
+                builder_sql = render_policy_builder_sql(
+                    auth_policies, session_policies, assigned_users, batch_size=int(batch_size)
+                )
+                preview_lines = builder_sql.splitlines()
+                st.code("\n".join(preview_lines[:200]) + ("\n-- ..." if len(preview_lines) > 200 else ""), language='sql')
+                st.download_button(
+                    label="📥 Download Policy Assignment Script",
+                    data=builder_sql,
+                    file_name=f"policy_assignments_{company_name}.sql",
+                    mime="text/plain"
+                )
+
+elif not company_name:
     st.info("👆 Please enter your Company Name to see the configuration and generated SQL.")
 
 # Footer
 st.markdown("---")
 st.markdown("*This page helps you set up the security perimeter for your Snowflake account including network policies, session policies, and authentication policies.*")
-st.markdown("**Next Step:** Check out the RBAC Setup page to configure role-based access control.")
+st.markdown("**Next Step:** Check out the RBAC Setup page to configure role-based access control, then download the full account script from the home page.")
 
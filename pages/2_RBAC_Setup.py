@@ -1,5 +1,14 @@
+import io
+
 import streamlit as st
-import graphviz
+
+from sf_security.diagram import render_rbac_diagram
+from sf_security.diagram_export import EXPORT_FORMATS, DiagramExportError, DiagramRenderer, iter_zip
+from sf_security.identifiers import check_rbac_names
+from sf_security.project import get_project
+from sf_security.script_panels import render_optimize_options, render_run_panel
+from sf_security.spec import SPEC_VERSION, SpecError, database_entry, dump_spec, load_spec, render_spec
+from sf_security.templates import FUNCTIONAL_ROLES
 
 # Page configuration
 st.set_page_config(
@@ -13,6 +22,34 @@ st.title("Snowflake RBAC Database Setup Example")
 st.markdown("### RBAC Structure: Database, Schema, Access Roles, and Functional Roles")
 st.markdown("---")
 
+# Configuration kept in session state so an imported spec can replace it; the widgets start
+# from the project shared with the other pages, so values survive switching pages
+project = get_project()
+st.session_state.setdefault('database_name', project.fields['database_name'])
+st.session_state.setdefault('schema_name', project.fields['schema_name'])
+st.session_state.setdefault('functional_roles', list(project.fields['functional_roles']))
+
+def import_rbac_spec():
+    """Load the rbac section of an uploaded spec; a single database also fills the configuration widgets"""
+    st.session_state.rbac_spec_errors = []
+    st.session_state.rbac_spec = None
+    uploaded = st.session_state.rbac_spec_file
+    if uploaded is None:
+        return
+    try:
+        spec = load_spec(uploaded.getvalue(), file_name=uploaded.name)
+    except SpecError as e:
+        st.session_state.rbac_spec_errors = e.errors
+        return
+    if not spec['rbac'] or not spec['rbac']['databases']:
+        st.session_state.rbac_spec_errors = ["spec: has no 'rbac.databases' entries"]
+        return
+    st.session_state.rbac_spec = {'version': SPEC_VERSION, 'perimeter': None, 'rbac': spec['rbac']}
+    first_database = spec['rbac']['databases'][0]
+    st.session_state.database_name = first_database['name']
+    st.session_state.schema_name = first_database['schema']
+    st.session_state.functional_roles = first_database['functional_roles']
+
 # Input section
 st.subheader("📝 Configuration")
 col1, col2 = st.columns(2)
@@ -21,18 +58,85 @@ with col1:
     database_name = st.text_input(
         "Database Name",
         placeholder="Enter database name (e.g., MARKETING_DB)",
-        help="The name of the database to create"
+        help="The name of the database to create",
+        key='database_name'
     )
 
 with col2:
     schema_name = st.text_input(
         "Schema Name",
         placeholder="Enter schema name (e.g., CRM_SCHEMA)",
-        help="The name of the managed access schema to create"
+        help="The name of the managed access schema to create",
+        key='schema_name'
     )
 
-# Only show visualizations if both inputs are provided
-if database_name and schema_name:
+functional_roles = st.multiselect(
+    "Functional Roles",
+    list(FUNCTIONAL_ROLES),
+    key='functional_roles',
+    help="Account level roles to create for the database"
+)
+
+# Share the inputs; only the artifacts depending on a changed field are rebuilt
+project.update(database_name=database_name, schema_name=schema_name, functional_roles=functional_roles)
+
+# Check the names before anything is rendered from them
+name_problems = check_rbac_names(database_name, schema_name) if database_name and schema_name else []
+for problem in name_problems:
+    st.error(f"❌ {problem}")
+
+# Policy-as-code import/export
+with st.expander("📁 Policy as Code"):
+    st.markdown("Load databases from a YAML/JSON spec, or export the current configuration as one.")
+    st.file_uploader(
+        "Import spec",
+        type=["yaml", "yml", "json"],
+        key='rbac_spec_file',
+        on_change=import_rbac_spec
+    )
+    for error in st.session_state.get('rbac_spec_errors', []):
+        st.error(f"❌ {error}")
+    
+    imported_spec = st.session_state.get('rbac_spec')
+    if imported_spec and len(imported_spec['rbac']['databases']) > 1:
+        database_count = len(imported_spec['rbac']['databases'])
+        st.info(f"The imported spec describes {database_count:,} databases; the page shows the first one.")
+        st.download_button(
+            label=f"📥 Download SQL for all {database_count:,} databases",
+            data="\n".join(sql for _, sql in render_spec(imported_spec)),
+            file_name="rbac_setup_spec.sql",
+            mime="text/plain"
+        )
+    
+    if database_name and schema_name and not name_problems:
+        current_spec = {
+            'version': SPEC_VERSION,
+            'rbac': {'databases': [database_entry(database_name, schema_name, functional_roles)]},
+        }
+        export_col1, export_col2 = st.columns(2)
+        with export_col1:
+            st.download_button(
+                label="📥 Export Spec (YAML)",
+                data=dump_spec(current_spec, 'yaml'),
+                file_name=f"rbac_{database_name}_{schema_name}.yaml",
+                mime="text/yaml"
+            )
+        with export_col2:
+            st.download_button(
+                label="📥 Export Spec (JSON)",
+                data=dump_spec(current_spec, 'json'),
+                file_name=f"rbac_{database_name}_{schema_name}.json",
+                mime="application/json"
+            )
+
+# One pool of dot processes shared by every session, so exports can't oversubscribe the host
+@st.cache_resource
+def get_diagram_renderer():
+    """Renderer used for diagram exports"""
+    return DiagramRenderer()
+
+# Only show visualizations if both inputs are provided and valid
+if database_name and schema_name and functional_roles and not name_problems:
     st.markdown("---")
     
     # Create tabs for different views
@@ -41,209 +145,8 @@ if database_name and schema_name:
     with tab1:
         st.subheader("Role Hierarchy and Permissions")
         
-        # Create a graphviz diagram
-        dot = graphviz.Digraph(comment='RBAC Structure')
-        dot.attr(rankdir='TB', size='14,10', compound='true', splines='ortho', nodesep='0.6', ranksep='0.8')
-        dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='11')
-        
-        # Role names
-        admin_role = f'RL_{database_name}_ADMIN'
-        read_role = f'DB_R_DBR_{database_name}'
-        create_role = f'DB_C_DBR_{database_name}'
-        write_role = f'DB_W_DBR_{database_name}'
-        
-        # Schema access roles
-        schema_read_role = f'SC_R_DBR_{database_name}'
-        schema_create_role = f'SC_C_DBR_{database_name}'
-        schema_write_role = f'SC_W_DBR_{database_name}'
-        
-        # Account level functional roles
-        analyst_role = f'{database_name}_ANALYST'
-        developer_role = f'{database_name}_DEVELOPER'
-        support_role = f'{database_name}_SUPPORT'
-        
-        # Level labels (all with same group to align vertically on left)
-        dot.node('LABEL_ACCOUNT', 'Object\nAdmin', shape='plaintext', fontsize='12', fontname='Arial Bold',
-                width='1.5', height='0.6', fixedsize='true', group='labels')
-        dot.node('LABEL_PROJECT', 'Project\nAdmin', shape='plaintext', fontsize='12', fontname='Arial Bold',
-                width='1.5', height='0.6', fixedsize='true', group='labels')
-        dot.node('LABEL_FUNCTIONAL', 'Functional\nAccess', shape='plaintext', fontsize='12', fontname='Arial Bold',
-                width='1.5', height='0.6', fixedsize='true', group='labels')
-        dot.node('LABEL_SCHEMA_ACCESS', 'Schema\nAccess', shape='plaintext', fontsize='12', fontname='Arial Bold',
-                width='1.5', height='0.6', fixedsize='true', group='labels')
-        
-        # Keep labels vertically aligned with invisible edges
-        dot.edge('LABEL_ACCOUNT', 'LABEL_PROJECT', style='invis')
-        dot.edge('LABEL_PROJECT', 'LABEL_FUNCTIONAL', style='invis')
-        dot.edge('LABEL_FUNCTIONAL', 'LABEL_SCHEMA_ACCESS', style='invis')
-        
-        # SYSADMIN  Level
-        with dot.subgraph() as s:
-            s.attr(rank='same')
-            s.node('LABEL_ACCOUNT')
-            s.node('SYSADMIN', 'SYSADMIN', 
-                  fillcolor='#7CC7E8', color='#2980B9', fontcolor='white', 
-                  style='rounded,filled', width='2', height='0.8')
-            # Invisible edge to keep label on left
-            s.edge('LABEL_ACCOUNT', 'SYSADMIN', style='invis')
-        
-        # Center SYSADMIN over database cluster
-        dot.edge('SYSADMIN', 'CREATE_ROLE', style='invis', minlen='1')
-        
-        # Project Admin Level
-        with dot.subgraph() as s:
-            s.attr(rank='same')
-            s.node('LABEL_PROJECT')
-            s.node('ADMIN_ROLE', f'{admin_role}', 
-                  fillcolor='#C67BA0', color='#922B5E', fontcolor='white',
-                  style='rounded,filled', width='2.5', height='0.8')
-            # Invisible edge to keep label on left
-            s.edge('LABEL_PROJECT', 'ADMIN_ROLE', style='invis')
-        
-        # Center ADMIN_ROLE over database cluster
-        dot.edge('ADMIN_ROLE', 'CREATE_ROLE', style='invis', minlen='1')
-        
-        # Functional Access Level - Account roles
-        with dot.subgraph() as s:
-            s.attr(rank='same')
-            s.node('LABEL_FUNCTIONAL')
-            s.node('ANALYST_ROLE', f'{analyst_role}', 
-                  fillcolor='#5DADE2', color='#21618C', fontcolor='white',
-                  style='rounded,filled', width='2', height='0.8')
-            s.node('DEVELOPER_ROLE', f'{developer_role}', 
-                  fillcolor='#48C9B0', color='#117A65', fontcolor='white',
-                  style='rounded,filled', width='2', height='0.8')
-            s.node('SUPPORT_ROLE', f'{support_role}', 
-                  fillcolor='#F8C471', color='#B7950B', fontcolor='white',
-                  style='rounded,filled', width='2', height='0.8')
-            # Invisible edges to keep label on left and roles ordered
-            s.edge('LABEL_FUNCTIONAL', 'ANALYST_ROLE', style='invis')
-            s.edge('ANALYST_ROLE', 'DEVELOPER_ROLE', style='invis')
-            s.edge('DEVELOPER_ROLE', 'SUPPORT_ROLE', style='invis')
-        
-        # Align functional roles to span the full width of database cluster
-        # Connect each functional role to its corresponding DB role below
-        dot.edge('ANALYST_ROLE', 'READ_ROLE', style='invis', minlen='1', weight='10')
-        dot.edge('DEVELOPER_ROLE', 'CREATE_ROLE', style='invis', minlen='1', weight='10')
-        dot.edge('SUPPORT_ROLE', 'WRITE_ROLE', style='invis', minlen='1', weight='12')
-        
-        # Database level - large container
-        with dot.subgraph(name='cluster_database') as db:
-            db.attr(label=f'Database: {database_name}', 
-                   labelloc='b', labeljust='l',
-                   style='rounded,filled', 
-                   fillcolor='#B8D4E8',
-                   color='#2C5F7C',
-                   fontcolor='#1F618D',
-                   fontsize='13',
-                   fontname='Arial Bold',
-                   penwidth='3',
-                   margin='25')
-            
-            # Database Roles inside database but outside schema (horizontal)
-            db.node('READ_ROLE', f'{read_role}\n \nRead (R)', 
-                      fillcolor='#9B59B6', color='#6C3483', fontcolor='white',
-                      width='2', height='1')
-            db.node('CREATE_ROLE', f'{create_role}\n \nCreate (C)', 
-                      fillcolor='#9B59B6', color='#6C3483', fontcolor='white',
-                      width='2', height='1')
-            db.node('WRITE_ROLE', f'{write_role}\n \nWrite (W)', 
-                      fillcolor='#9B59B6', color='#6C3483', fontcolor='white',
-                      width='2', height='1')
-            
-            # Force all database roles to be on the same horizontal rank
-            with db.subgraph() as db_roles:
-                db_roles.attr(rank='same')
-                db_roles.node('READ_ROLE')
-                db_roles.node('CREATE_ROLE')
-                db_roles.node('WRITE_ROLE')
-            
-            # Invisible edges for left-to-right ordering
-            db.edge('READ_ROLE', 'CREATE_ROLE', style='invis')
-            db.edge('CREATE_ROLE', 'WRITE_ROLE', style='invis')
-            
-            # Schema cluster inside database (below the roles)
-            with db.subgraph(name='cluster_schema') as schema:
-                schema.attr(label=f'Schema: {schema_name}', 
-                          labelloc='b', labeljust='l',
-                          style='rounded,filled',
-                          fillcolor='#E8F4F8',
-                          color='#34495E',
-                          fontcolor='#2C3E50',
-                          fontsize='12',
-                          fontname='Arial Bold',
-                          penwidth='2.5',
-                          margin='20')
-                
-                # Schema access roles (inside the schema)
-                schema.node('SCHEMA_READ_ROLE', f'{schema_read_role}\n(Schema Read)', 
-                          fillcolor='#BB8FCE', color='#6C3483', fontcolor='white',
-                          width='2', height='0.9')
-                schema.node('SCHEMA_CREATE_ROLE', f'{schema_create_role}\n(Schema Create)', 
-                          fillcolor='#BB8FCE', color='#6C3483', fontcolor='white',
-                          width='2', height='0.9')
-                schema.node('SCHEMA_WRITE_ROLE', f'{schema_write_role}\n(Schema Write)', 
-                          fillcolor='#BB8FCE', color='#6C3483', fontcolor='white',
-                          width='2', height='0.9')
-                
-                # Keep schema roles on same rank
-                with schema.subgraph() as schema_roles:
-                    schema_roles.attr(rank='same')
-                    schema_roles.node('SCHEMA_READ_ROLE')
-                    schema_roles.node('SCHEMA_CREATE_ROLE')
-                    schema_roles.node('SCHEMA_WRITE_ROLE')
-                
-                # Invisible edges for ordering
-                schema.edge('SCHEMA_READ_ROLE', 'SCHEMA_CREATE_ROLE', style='invis')
-                schema.edge('SCHEMA_CREATE_ROLE', 'SCHEMA_WRITE_ROLE', style='invis')
-                
-                # Tables area inside schema (below schema roles)
-                schema.node('TABLES_AREA', 'Tables\n(Future Objects)', 
-                          fillcolor='#F39C12', color='#D68910', fontcolor='white',
-                          shape='cylinder', width='5', height='1.2')
-                
-                # Connect schema roles to tables
-                schema.edge('SCHEMA_READ_ROLE', 'TABLES_AREA', style='dashed', color='#7F8C8D', arrowhead='vee')
-                schema.edge('SCHEMA_CREATE_ROLE', 'TABLES_AREA', style='dashed', color='#7F8C8D', arrowhead='vee')
-                schema.edge('SCHEMA_WRITE_ROLE', 'TABLES_AREA', style='dashed', color='#7F8C8D', arrowhead='vee')
-            
-            # Connect database roles to schema roles (inheritance/grants)
-            db.edge('READ_ROLE', 'SCHEMA_READ_ROLE', color='#9B59B6', penwidth='1.5', style='dashed')
-            db.edge('READ_ROLE', 'SCHEMA_CREATE_ROLE', color='#9B59B6', penwidth='1.5', style='dashed')
-            db.edge('READ_ROLE', 'SCHEMA_WRITE_ROLE', color='#9B59B6', penwidth='1.5', style='dashed')
-            
-            # Invisible edge to keep schema below roles
-            db.edge('CREATE_ROLE', 'SCHEMA_CREATE_ROLE', style='invis')
-        
-        # Keep Schema Access label on the left, aligned with schema area
-        # Use constraint and minlen to position label at schema level
-        dot.edge('LABEL_FUNCTIONAL', 'LABEL_SCHEMA_ACCESS', style='invis', minlen='2')
-        dot.edge('LABEL_SCHEMA_ACCESS', 'TABLES_AREA', style='invis', constraint='false')
-        
-        # Relationships between levels
-        dot.edge('SYSADMIN', 'ADMIN_ROLE', label='creates DB\ntransfers ownership', 
-                color='#2980B9', penwidth='2', fontsize='10')
-        
-        # Admin role creates account roles
-        dot.edge('ADMIN_ROLE', 'ANALYST_ROLE', label='creates', 
-                color='#C67BA0', penwidth='1.5', fontsize='9')
-        dot.edge('ADMIN_ROLE', 'DEVELOPER_ROLE', label='creates', 
-                color='#C67BA0', penwidth='1.5', fontsize='9')
-        dot.edge('ADMIN_ROLE', 'SUPPORT_ROLE', label='creates', 
-                color='#C67BA0', penwidth='1.5', fontsize='9')
-        
-        # Admin role creates database roles
-        dot.edge('ADMIN_ROLE', 'READ_ROLE', 
-                color='#C67BA0', penwidth='1.5', fontsize='9', lhead='cluster_database')
-        
-        # Account roles are granted database roles (through schema roles)
-        dot.edge('ANALYST_ROLE', 'SCHEMA_READ_ROLE', 
-                color='#5DADE2', penwidth='1.2', fontsize='9', style='dashed')
-        dot.edge('DEVELOPER_ROLE', 'SCHEMA_CREATE_ROLE', 
-                color='#48C9B0', penwidth='1.2', fontsize='9', style='dashed')
-        dot.edge('SUPPORT_ROLE', 'SCHEMA_WRITE_ROLE', 
-                color='#F8C471', penwidth='1.2', fontsize='9', style='dashed')
-        
+        # Only the labels depend on the inputs, so the DOT source is filled in from a precomputed skeleton
+        dot = project.artifact('diagram', ('database_name', 'schema_name', 'functional_roles'), render_rbac_diagram)
         st.graphviz_chart(dot)
         
         # Legend
@@ -260,165 +163,86 @@ if database_name and schema_name:
             st.markdown("**Relationships:**")
             st.markdown("➡️ **Solid**: Creates/Owns")
             st.markdown("⚪ **Dashed**: Permission grants")
+        
+        # Diagram export
+        with st.expander("📤 Export Diagram"):
+            renderer = get_diagram_renderer()
+            st.download_button(
+                label="📥 Download DOT Source",
+                data=dot,
+                file_name=f"rbac_{database_name}_{schema_name}.dot",
+                mime="text/vnd.graphviz"
+            )
+            
+            if not renderer.available():
+                st.warning(
+                    "Graphviz's `dot` isn't installed on this server, so only the DOT source can be exported. "
+                    "Render it elsewhere with `dot -Tsvg`, `-Tpng`, or `-Tpdf`."
+                )
+            else:
+                export_formats = st.multiselect(
+                    "Formats",
+                    list(EXPORT_FORMATS),
+                    default=['svg'],
+                    format_func=str.upper,
+                    key='diagram_export_formats'
+                )
+                if st.checkbox("Render for download", key='diagram_export_render'):
+                    export_cols = st.columns(max(1, len(export_formats)))
+                    for export_col, fmt in zip(export_cols, export_formats):
+                        with export_col:
+                            try:
+                                rendered = renderer.render(dot, fmt)
+                            except DiagramExportError as e:
+                                st.error(f"❌ {e}")
+                            else:
+                                st.download_button(
+                                    label=f"📥 Download {fmt.upper()}",
+                                    data=rendered,
+                                    file_name=f"rbac_{database_name}_{schema_name}.{fmt}",
+                                    mime=EXPORT_FORMATS[fmt],
+                                    key=f'diagram_export_{fmt}'
+                                )
+                
+                # Batch export of every database in an imported spec
+                imported_spec = st.session_state.get('rbac_spec')
+                spec_databases = imported_spec['rbac']['databases'] if imported_spec else []
+                if len(spec_databases) > 1 and export_formats and st.button(
+                    f"🗜️ Render diagrams for all {len(spec_databases):,} databases", key='diagram_export_all'
+                ):
+                    diagrams = [
+                        (f"rbac_{database['name']}_{database['schema']}",
+                         render_rbac_diagram(database['name'], database['schema'], database['functional_roles']))
+                        for database in spec_databases
+                    ]
+                    total = len(diagrams) * len(export_formats)
+                    progress = st.progress(0.0, text="Rendering diagrams...")
+                    rendered_count = [0]
+                    
+                    def show_progress(name, fmt):
+                        rendered_count[0] += 1
+                        progress.progress(rendered_count[0] / total, text=f"Rendered {rendered_count[0]:,} of {total:,}")
+                    
+                    archive = io.BytesIO()
+                    try:
+                        for chunk in iter_zip(renderer, diagrams, export_formats, on_entry=show_progress):
+                            archive.write(chunk)
+                    except DiagramExportError as e:
+                        st.error(f"❌ {e}")
+                    else:
+                        st.download_button(
+                            label="📥 Download Diagrams (ZIP)",
+                            data=archive.getvalue(),
+                            file_name="rbac_diagrams.zip",
+                            mime="application/zip",
+                            key='diagram_export_zip'
+                        )
     
     with tab2:
         st.subheader("Generated SQL Script")
         
-        # Generate the SQL with replacements
-        sql_script = f"""USE ROLE SYSADMIN;
-USE SECONDARY ROLES NONE;
-SET user_name = (SELECT CURRENT_USER());
-
-CREATE WAREHOUSE IF NOT EXISTS SIMPLE_COMPUTE 
-WITH 
-  WAREHOUSE_SIZE = 'XSMALL'
-  AUTO_SUSPEND = 300
-  AUTO_RESUME = TRUE;
-
-CREATE DATABASE IF NOT EXISTS {database_name}
-    COMMENT = 'Marketing production CRM database with private access.';
-
-
-USE ROLE SECURITYADMIN;
-
--- Create functional roles to manage the database
-CREATE OR REPLACE ROLE RL_{database_name}_ADMIN;
-
--- Grant the role to the proper user
-GRANT ROLE RL_{database_name}_ADMIN TO USER IDENTIFIER($user_name);;
-
--- Platform admin changes ownership to the DB_ADMIN role
-GRANT OWNERSHIP ON DATABASE {database_name} TO ROLE RL_{database_name}_ADMIN;
-
--- Create Database Roles
-USE ROLE RL_{database_name}_ADMIN;
-USE DATABASE {database_name};
-
-CREATE OR REPLACE DATABASE ROLE DB_R_DBR_{database_name}; -- read
-CREATE OR REPLACE DATABASE ROLE DB_C_DBR_{database_name}; -- create
-CREATE OR REPLACE DATABASE ROLE DB_W_DBR_{database_name}; -- write
-
-SHOW DATABASE ROLES IN DATABASE {database_name};
-
-
--- Grant database permissions to database roles
-GRANT USAGE ON DATABASE {database_name} TO DATABASE ROLE DB_R_DBR_{database_name};
-GRANT CREATE SCHEMA ON DATABASE {database_name} TO DATABASE ROLE DB_C_DBR_{database_name};
-GRANT ALL ON DATABASE {database_name} TO DATABASE ROLE DB_W_DBR_{database_name};
-
--- Create a Managed Access Schema
-USE ROLE RL_{database_name}_ADMIN;
-
-CREATE OR REPLACE SCHEMA {database_name}.{schema_name} WITH MANAGED ACCESS;
-
-SHOW GRANTS ON SCHEMA {database_name}.{schema_name};
-
-
--- Create schema access roles using database roles
-USE ROLE RL_{database_name}_ADMIN;
-
-
--- Create Schema access roles using database roles
-CREATE OR REPLACE DATABASE ROLE SC_R_DBR_{database_name};
-CREATE OR REPLACE DATABASE ROLE SC_C_DBR_{database_name};
-CREATE OR REPLACE DATABASE ROLE SC_W_DBR_{database_name};
-
-USE ROLE SYSADMIN;
-USE WAREHOUSE SIMPLE_COMPUTE;
-GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE RL_{database_name}_ADMIN;
-
-USE ROLE RL_{database_name}_ADMIN;
-USE WAREHOUSE SIMPLE_COMPUTE;
-CREATE OR REPLACE TABLE {database_name}.{schema_name}.INVENTORY_LEVELS (
-    INVENTORY_ID INT PRIMARY KEY,
-    WAREHOUSE_ID INT NOT NULL,
-    PRODUCT_ID INT NOT NULL,
-    QUANTITY_ON_HAND INT DEFAULT 0,
-    QUANTITY_RESERVED INT DEFAULT 0,
-    REORDER_POINT INT DEFAULT 0,
-    LAST_RESTOCK_DATE DATE,
-    NEXT_REORDER_DATE DATE
-) COMMENT = 'Inventory levels by warehouse and product';
-
-INSERT INTO {database_name}.{schema_name}.INVENTORY_LEVELS (INVENTORY_ID, WAREHOUSE_ID, PRODUCT_ID, QUANTITY_ON_HAND, QUANTITY_RESERVED, REORDER_POINT, LAST_RESTOCK_DATE, NEXT_REORDER_DATE)
-VALUES
-    (701, 501, 101, 75, 10, 20, '2023-06-01', '2023-07-15'),
-    (702, 501, 102, 35, 5, 15, '2023-06-01', '2023-07-01'),
-    (703, 502, 101, 50, 8, 20, '2023-06-05', '2023-07-20'),
-    (704, 502, 103, 250, 30, 50, '2023-06-10', '2023-08-01'),
-    (705, 503, 104, 15, 2, 10, '2023-06-15', '2023-06-25'),
-    (706, 503, 105, 60, 12, 25, '2023-06-12', '2023-07-30'),
-    (707, 505, 102, 40, 6, 15, '2023-06-08', '2023-07-05');
-
-
--- Schema Object Grants
--- Read Only
-GRANT USAGE ON SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_R_DBR_{database_name};
-GRANT SELECT ON ALL TABLES IN SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_R_DBR_{database_name};
-GRANT SELECT ON FUTURE TABLES IN SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_R_DBR_{database_name};
-
--- create any object
-GRANT ALL ON SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_C_DBR_{database_name};
-REVOKE MODIFY ON SCHEMA {database_name}.{schema_name} FROM DATABASE ROLE SC_C_DBR_{database_name};
-
--- write (allows renaming the schema)
-GRANT ALL ON SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_W_DBR_{database_name};
-
--- inheritance
-GRANT DATABASE ROLE SC_R_DBR_{database_name} TO DATABASE ROLE SC_C_DBR_{database_name};
-GRANT DATABASE ROLE SC_C_DBR_{database_name} TO DATABASE ROLE SC_W_DBR_{database_name};
-
-SHOW GRANTS ON SCHEMA {database_name}.{schema_name};
-
--- grant database role to schema roles
-USE ROLE RL_{database_name}_ADMIN;
-
-GRANT DATABASE ROLE DB_R_DBR_{database_name} TO DATABASE ROLE SC_R_DBR_{database_name};
-GRANT DATABASE ROLE DB_R_DBR_{database_name} TO DATABASE ROLE SC_C_DBR_{database_name};
-GRANT DATABASE ROLE DB_R_DBR_{database_name} TO DATABASE ROLE SC_W_DBR_{database_name};
-
-
--- Create account level roles
-USE ROLE SECURITYADMIN;
-
-CREATE OR REPLACE ROLE {database_name}_ANALYST;
-CREATE OR REPLACE ROLE {database_name}_DEVELOPER;
-CREATE OR REPLACE ROLE {database_name}_SUPPORT;
-
--- grant schema roles to account roles
-USE ROLE RL_{database_name}_ADMIN;
-USE DATABASE {database_name};
-
-GRANT DATABASE ROLE SC_R_DBR_{database_name} TO ROLE {database_name}_ANALYST;
-GRANT DATABASE ROLE SC_C_DBR_{database_name} TO ROLE {database_name}_SUPPORT;
-GRANT DATABASE ROLE SC_W_DBR_{database_name} TO ROLE {database_name}_DEVELOPER;
-
--- granting warehouse usage to our account roles
-USE ROLE SYSADMIN;
-GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE {database_name}_ANALYST;
-GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE {database_name}_DEVELOPER;
-GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE {database_name}_SUPPORT;
-
--- Granting roles to the user of your choice
-USE ROLE SECURITYADMIN;
-SET user_name = (SELECT CURRENT_USER());   
-GRANT ROLE {database_name}_ANALYST TO USER IDENTIFIER($user_name);
-GRANT ROLE {database_name}_DEVELOPER TO USER IDENTIFIER($user_name);
-GRANT ROLE {database_name}_SUPPORT TO USER IDENTIFIER($user_name);
-
-SHOW GRANTS ON DATABASE {database_name};
-SHOW GRANTS ON SCHEMA {database_name}.{schema_name};
-
--- USE ROLE SECURITYADMIN;
--- DROP ROLE IF EXISTS {database_name}_ANALYST;
--- DROP ROLE IF EXISTS {database_name}_DEVELOPER;
--- DROP ROLE IF EXISTS {database_name}_SUPPORT;
-
--- USE ROLE RL_{database_name}_ADMIN;
--- DROP DATABASE IF EXISTS {database_name};
--- USE ROLE SECURITYADMIN;
--- DROP ROLE IF EXISTS RL_{database_name}_ADMIN;
-"""
+        sql_script = project.rbac_sql()
+        sql_script = render_optimize_options(sql_script, key='rbac_optimize')
         
         st.code(sql_script, language='sql')
         
@@ -429,6 +253,8 @@ SHOW GRANTS ON SCHEMA {database_name}.{schema_name};
             file_name=f"rbac_setup_{database_name}_{schema_name}.sql",
             mime="text/plain"
         )
+        
+        render_run_panel(sql_script, key='rbac_run')
     
     with tab3:
         st.subheader("🧪 Test User Personas")
@@ -436,13 +262,15 @@ SHOW GRANTS ON SCHEMA {database_name}.{schema_name};
         
         # Persona selection
         st.markdown("### Select User Persona")
+        persona_descriptions = {
+            'ANALYST': "Read Only",
+            'DEVELOPER': "Read & Write",
+            'SUPPORT': "Full Access",
+        }
         persona = st.selectbox(
             "Choose a role to test:",
-            [
-                f"{database_name}_ANALYST (Read Only)",
-                f"{database_name}_DEVELOPER (Read & Write)",
-                f"{database_name}_SUPPORT (Full Access)"
-            ]
+            [f"{database_name}_{role} ({persona_descriptions[role]})"
+             for role in FUNCTIONAL_ROLES if role in functional_roles]
         )
         
         # Extract the role name from the selection
@@ -457,14 +285,11 @@ To test this persona's permissions in your Snowflake workspace:
 Copy and paste the example queries below into a Snowflake worksheet to test the permissions.
         """)
         
-        # Examples section
+        # Examples section, for the selected roles only
         st.markdown("### 💡 Example Queries to Test")
         
-        example_col1, example_col2, example_col3 = st.columns(3)
-        
-        with example_col1:
-            st.markdown("**As ANALYST (Read Only):**")
-            st.code(f"""
+        example_queries = {
+            'ANALYST': ("Read Only", f"""
 USE ROLE {database_name}_ANALYST;
 USE SECONDARY ROLES NONE;
 USE WAREHOUSE SIMPLE_COMPUTE;
@@ -481,11 +306,8 @@ CREATE OR REPLACE TABLE {database_name}.{schema_name}.ENGAGEMENT_LEVELS (
 -- ❌ Cannot insert to existing table
 INSERT INTO {database_name}.{schema_name}.INVENTORY_LEVELS 
 VALUES (701, 501, 101, 75, 10, 20, '2023-06-01', '2023-07-15');
-            """, language="sql")
-        
-        with example_col2:
-            st.markdown("**As SUPPORT (Create Objects):**")
-            st.code(f"""
+            """),
+            'SUPPORT': ("Create Objects", f"""
 USE ROLE {database_name}_SUPPORT;
 USE SECONDARY ROLES NONE;
 USE WAREHOUSE SIMPLE_COMPUTE;
@@ -513,11 +335,8 @@ ALTER SCHEMA {database_name}.{schema_name} SET COMMENT = 'test?';
 CREATE SCHEMA {database_name}.SANDBOX;
 
 
-            """, language="sql")
-        
-        with example_col3:
-            st.markdown("**As DEVELOPER (Full Write):**")
-            st.code(f"""
+            """),
+            'DEVELOPER': ("Full Write", f"""
 USE ROLE {database_name}_DEVELOPER;
 USE SECONDARY ROLES NONE;
 USE WAREHOUSE SIMPLE_COMPUTE;
@@ -537,9 +356,19 @@ ALTER SCHEMA {database_name}.{schema_name} SET COMMENT = 'SANDBOX';
 
 -- ✅ Can drop table
 DROP TABLE IF EXISTS {database_name}.{schema_name}.ENGAGEMENT_LEVELS;
-            """, language="sql")
-
-else:
+            """),
+        }
+        example_roles = [role for role in example_queries if role in functional_roles]
+        for example_col, role in zip(st.columns(len(example_roles)), example_roles):
+            with example_col:
+                title, queries = example_queries[role]
+                st.markdown(f"**As {role} ({title}):**")
+                st.code(queries, language="sql")
+
+elif database_name and schema_name and not name_problems:
+    st.info("👆 Please select at least one functional role to see the visualization and generated SQL.")
+
+elif not name_problems:
     st.info("👆 Please enter both Database Name and Schema Name to see the visualization and generated SQL.")
 
 # Footer
@@ -0,0 +1,180 @@
+import io
+
+import pandas as pd
+import streamlit as st
+
+from sf_security.role_graph import RoleGraph, load_grants, synthetic_grants
+
+# Page configuration
+st.set_page_config(
+    page_title="RBAC Explorer",
+    page_icon="🕸️",
+    layout="wide"
+)
+
+# Title and description
+st.title("Snowflake RBAC Explorer")
+st.markdown("### Search an Account's Roles and Grants, Trace Access Paths, and Find Orphaned Roles")
+st.markdown("---")
+
+# Build the graph once per upload and reuse it across reruns; graphs are large, so only a few
+# recent uploads are kept, and none for longer than an hour
+@st.cache_resource(show_spinner="Building the role graph...", max_entries=4, ttl=3600)
+def build_graph(files):
+    """Build the role graph from uploaded (name, bytes) exports"""
+    grants = pd.concat(
+        [load_grants(io.BytesIO(file_bytes), file_name=file_name) for file_name, file_bytes in files],
+        ignore_index=True
+    )
+    return RoleGraph(grants.drop_duplicates(ignore_index=True))
+
+@st.cache_resource(show_spinner="Generating an example account...")
+def build_example_graph():
+    """Build the role graph of a generated example account"""
+    return RoleGraph(synthetic_grants())
+
+def pick_node(graph, label, query, kinds=None, key=None):
+    """Resolve a search box to one node: an exact name, or a choice among the best matches"""
+    if not query:
+        return None
+    exact = graph.find(query)
+    if exact is not None and (not kinds or graph.kinds[exact] in kinds):
+        return exact
+    matches = graph.search(query, limit=20, kinds=kinds)
+    if matches.empty:
+        st.warning(f"No {label.lower()} matches '{query}'.")
+        return None
+    return st.selectbox(label, matches['NODE'].tolist(), format_func=graph.label, key=key)
+
+# Input section
+st.subheader("📂 Grant Inventory")
+st.markdown("""
+Upload exports of `SNOWFLAKE.ACCOUNT_USAGE.GRANTS_TO_ROLES` and `GRANTS_TO_USERS` (CSV or Parquet).
+Revoked grants (with `DELETED_ON` set) are ignored.
+""")
+st.code("""SELECT PRIVILEGE, GRANTED_ON, NAME, TABLE_CATALOG, TABLE_SCHEMA, GRANTED_TO, GRANTEE_NAME, DELETED_ON
+FROM SNOWFLAKE.ACCOUNT_USAGE.GRANTS_TO_ROLES;
+
+SELECT ROLE, GRANTED_TO, GRANTEE_NAME, DELETED_ON
+FROM SNOWFLAKE.ACCOUNT_USAGE.GRANTS_TO_USERS;""", language="sql")
+
+grant_files = st.file_uploader("Grant exports", type=["csv", "parquet"], accept_multiple_files=True)
+use_example = st.checkbox(
+    "Use a generated example account",
+    help="20,000 roles and about 1,000,000 grants, to try the explorer without an export",
+    key='explorer_use_example'
+)
+
+graph = None
+if grant_files:
+    try:
+        graph = build_graph(tuple((file.name, file.getvalue()) for file in grant_files))
+    except ValueError as e:
+        st.error(f"❌ {e}")
+elif use_example:
+    graph = build_example_graph()
+
+if graph is not None:
+    kind_counts = graph.counts()
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("Users", f"{int(kind_counts.get('USER', 0)):,}")
+    metric_cols[1].metric("Roles", f"{int(kind_counts.get('ROLE', 0) + kind_counts.get('DATABASE_ROLE', 0)):,}")
+    metric_cols[2].metric("Objects", f"{len(graph) - int(kind_counts.reindex(['USER', 'ROLE', 'DATABASE_ROLE']).fillna(0).sum()):,}")
+    metric_cols[3].metric("Grants", f"{graph.grant_count:,}")
+    
+    st.markdown("---")
+    
+    # Create tabs for different views
+    tab1, tab2, tab3, tab4 = st.tabs(["🔍 Search", "🧭 Access Path", "👻 Orphaned Roles", "🔑 Privileges"])
+    
+    with tab1:
+        st.subheader("Search Roles, Users, and Objects")
+        st.markdown("Names match by prefix (of the name or any part of it, e.g. `ORDERS`), then fuzzily.")
+        
+        search_col1, search_col2 = st.columns([3, 1])
+        with search_col1:
+            query = st.text_input("Search", placeholder="e.g. SALES_ANALYST", key='explorer_query')
+        with search_col2:
+            depth = st.slider("Neighborhood depth", min_value=1, max_value=3, value=1, key='explorer_depth')
+        
+        node = pick_node(graph, "Matches", query, key='explorer_node')
+        if node is not None:
+            max_edges = st.slider(
+                "Grants to draw",
+                min_value=10, max_value=200, value=60, step=10,
+                help="Grants beyond this are summarized as '+N more' nodes",
+                key='explorer_max_edges'
+            )
+            edges, omitted = graph.neighborhood(node, depth=depth, max_edges=max_edges)
+            st.graphviz_chart(graph.neighborhood_dot(node, neighborhood=(edges, omitted)))
+            
+            with st.expander("Grants shown"):
+                st.dataframe(
+                    {
+                        "Grantee": [graph.label(n) for n in edges['SOURCE']],
+                        "Granted": [graph.label(n) for n in edges['TARGET']],
+                        "Privileges": edges['PRIVILEGES'],
+                    },
+                    hide_index=True
+                )
+    
+    with tab2:
+        st.subheader("How Does a User Reach an Object?")
+        st.markdown("Finds the shortest chain of role grants from a user (or role) to an object or role.")
+        
+        path_col1, path_col2 = st.columns(2)
+        with path_col1:
+            source_query = st.text_input("User or role", placeholder="e.g. JSMITH", key='explorer_path_source')
+            source = pick_node(graph, "From", source_query, kinds=('USER', 'ROLE', 'DATABASE_ROLE'),
+                               key='explorer_path_source_node')
+        with path_col2:
+            target_query = st.text_input("Object or role", placeholder="e.g. SALES.RAW.ORDERS",
+                                         key='explorer_path_target')
+            target = pick_node(graph, "To", target_query, key='explorer_path_target_node')
+        
+        if source is not None and target is not None:
+            steps = graph.path(source, target)
+            if steps is None:
+                st.error(f"🚫 {graph.label(source)} has no access to {graph.label(target)}.")
+            else:
+                st.success(f"✅ {graph.label(source)} reaches {graph.label(target)} in {len(steps):,} step(s).")
+                st.dataframe(steps, hide_index=True)
+    
+    with tab3:
+        st.subheader("Orphaned Roles")
+        st.markdown("""
+        Roles that no user holds, directly or through other roles. They either were never granted,
+        or are only granted to roles that are themselves orphaned. `PUBLIC` is held by every user.
+        """)
+        
+        orphans = graph.orphaned_roles()
+        st.metric("Orphaned Roles", f"{len(orphans):,}")
+        if orphans.empty:
+            st.success("✅ Every role is held by at least one user.")
+        else:
+            st.dataframe(orphans, hide_index=True)
+            st.download_button(
+                label="📥 Download Orphaned Roles (CSV)",
+                data=orphans.to_csv(index=False),
+                file_name="orphaned_roles.csv",
+                mime="text/csv"
+            )
+    
+    with tab4:
+        st.subheader("Who Holds a Privilege?")
+        privilege_col1, privilege_col2 = st.columns(2)
+        with privilege_col1:
+            privilege = st.selectbox("Privilege", sorted(graph.privileges), key='explorer_privilege')
+        with privilege_col2:
+            object_kinds = sorted(pd.unique(graph.kinds[graph.target]))
+            object_kind = st.selectbox("On", ["Any object"] + object_kinds, key='explorer_privilege_kind')
+        holders = graph.roles_with_privilege(privilege, None if object_kind == "Any object" else object_kind)
+        st.markdown(f"**{len(holders):,}** grantee(s) hold `{privilege}` directly.")
+        st.dataframe(holders.head(1000), hide_index=True)
+
+else:
+    st.info("👆 Upload a grant export, or use the generated example account, to explore roles and grants.")
+
+# Footer
+st.markdown("---")
+st.markdown("*This page explores the roles and grants of a whole account, including roles not created by the RBAC Setup page.*")
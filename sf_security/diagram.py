@@ -0,0 +1,267 @@
+import re
+from itertools import combinations
+
+import graphviz
+from graphviz.quoting import quote
+
+from sf_security.templates import FUNCTIONAL_ROLES
+
+# Labels that depend on the inputs, by node ID (or cluster name); everything else in the
+# diagram (node IDs, edges, clusters, and styles) is the same for every database
+RBAC_DIAGRAM_LABELS = {
+    'ADMIN_ROLE': 'RL_{database}_ADMIN',
+    'ANALYST_ROLE': '{database}_ANALYST',
+    'DEVELOPER_ROLE': '{database}_DEVELOPER',
+    'SUPPORT_ROLE': '{database}_SUPPORT',
+    'cluster_database': 'Database: {database}',
+    'READ_ROLE': 'DB_R_DBR_{database}\n \nRead (R)',
+    'CREATE_ROLE': 'DB_C_DBR_{database}\n \nCreate (C)',
+    'WRITE_ROLE': 'DB_W_DBR_{database}\n \nWrite (W)',
+    'cluster_schema': 'Schema: {schema}',
+    'SCHEMA_READ_ROLE': 'SC_R_DBR_{database}\n(Schema Read)',
+    'SCHEMA_CREATE_ROLE': 'SC_C_DBR_{database}\n(Schema Create)',
+    'SCHEMA_WRITE_ROLE': 'SC_W_DBR_{database}\n(Schema Write)',
+}
+
+# How each functional role is drawn: its colors, the database role it sits above (with the
+# layout weight of that alignment), and the schema role it is granted
+FUNCTIONAL_ROLE_NODES = {
+    'ANALYST': {'fillcolor': '#5DADE2', 'color': '#21618C', 'above': 'READ_ROLE', 'weight': '10',
+                'schema_role': 'SCHEMA_READ_ROLE'},
+    'DEVELOPER': {'fillcolor': '#48C9B0', 'color': '#117A65', 'above': 'CREATE_ROLE', 'weight': '10',
+                  'schema_role': 'SCHEMA_CREATE_ROLE'},
+    'SUPPORT': {'fillcolor': '#F8C471', 'color': '#B7950B', 'above': 'WRITE_ROLE', 'weight': '12',
+                'schema_role': 'SCHEMA_WRITE_ROLE'},
+}
+
+
+def _selected_roles(functional_roles):
+    return tuple(role for role in FUNCTIONAL_ROLES if role in functional_roles)
+
+
+def rbac_diagram_labels(database_name, schema_name):
+    """The input dependent labels of the RBAC diagram"""
+    return {slot: template.format(database=database_name, schema=schema_name)
+            for slot, template in RBAC_DIAGRAM_LABELS.items()}
+
+
+def build_rbac_digraph(labels, functional_roles=FUNCTIONAL_ROLES):
+    """Build the role hierarchy diagram with the given labels (see RBAC_DIAGRAM_LABELS)
+
+    Only the selected functional roles, and their edges, are drawn.
+    """
+    roles = _selected_roles(functional_roles)
+    # Create a graphviz diagram
+    dot = graphviz.Digraph(comment='RBAC Structure')
+    dot.attr(rankdir='TB', size='14,10', compound='true', splines='ortho', nodesep='0.6', ranksep='0.8')
+    dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='11')
+    
+    # Level labels (all with same group to align vertically on left)
+    dot.node('LABEL_ACCOUNT', 'Object\nAdmin', shape='plaintext', fontsize='12', fontname='Arial Bold',
+            width='1.5', height='0.6', fixedsize='true', group='labels')
+    dot.node('LABEL_PROJECT', 'Project\nAdmin', shape='plaintext', fontsize='12', fontname='Arial Bold',
+            width='1.5', height='0.6', fixedsize='true', group='labels')
+    dot.node('LABEL_FUNCTIONAL', 'Functional\nAccess', shape='plaintext', fontsize='12', fontname='Arial Bold',
+            width='1.5', height='0.6', fixedsize='true', group='labels')
+    dot.node('LABEL_SCHEMA_ACCESS', 'Schema\nAccess', shape='plaintext', fontsize='12', fontname='Arial Bold',
+            width='1.5', height='0.6', fixedsize='true', group='labels')
+    
+    # Keep labels vertically aligned with invisible edges
+    dot.edge('LABEL_ACCOUNT', 'LABEL_PROJECT', style='invis')
+    dot.edge('LABEL_PROJECT', 'LABEL_FUNCTIONAL', style='invis')
+    dot.edge('LABEL_FUNCTIONAL', 'LABEL_SCHEMA_ACCESS', style='invis')
+    
+    # SYSADMIN  Level
+    with dot.subgraph() as s:
+        s.attr(rank='same')
+        s.node('LABEL_ACCOUNT')
+        s.node('SYSADMIN', 'SYSADMIN', 
+              fillcolor='#7CC7E8', color='#2980B9', fontcolor='white', 
+              style='rounded,filled', width='2', height='0.8')
+        # Invisible edge to keep label on left
+        s.edge('LABEL_ACCOUNT', 'SYSADMIN', style='invis')
+    
+    # Center SYSADMIN over database cluster
+    dot.edge('SYSADMIN', 'CREATE_ROLE', style='invis', minlen='1')
+    
+    # Project Admin Level
+    with dot.subgraph() as s:
+        s.attr(rank='same')
+        s.node('LABEL_PROJECT')
+        s.node('ADMIN_ROLE', labels['ADMIN_ROLE'], 
+              fillcolor='#C67BA0', color='#922B5E', fontcolor='white',
+              style='rounded,filled', width='2.5', height='0.8')
+        # Invisible edge to keep label on left
+        s.edge('LABEL_PROJECT', 'ADMIN_ROLE', style='invis')
+    
+    # Center ADMIN_ROLE over database cluster
+    dot.edge('ADMIN_ROLE', 'CREATE_ROLE', style='invis', minlen='1')
+    
+    # Functional Access Level - Account roles
+    with dot.subgraph() as s:
+        s.attr(rank='same')
+        s.node('LABEL_FUNCTIONAL')
+        for role in roles:
+            node = FUNCTIONAL_ROLE_NODES[role]
+            s.node(f'{role}_ROLE', labels[f'{role}_ROLE'], 
+                  fillcolor=node['fillcolor'], color=node['color'], fontcolor='white',
+                  style='rounded,filled', width='2', height='0.8')
+        # Invisible edges to keep label on left and roles ordered
+        chain = ['LABEL_FUNCTIONAL'] + [f'{role}_ROLE' for role in roles]
+        for left, right in zip(chain, chain[1:]):
+            s.edge(left, right, style='invis')
+    
+    # Align functional roles to span the full width of database cluster
+    # Connect each functional role to its corresponding DB role below
+    for role in roles:
+        node = FUNCTIONAL_ROLE_NODES[role]
+        dot.edge(f'{role}_ROLE', node['above'], style='invis', minlen='1', weight=node['weight'])
+    
+    # Database level - large container
+    with dot.subgraph(name='cluster_database') as db:
+        db.attr(label=labels['cluster_database'], 
+               labelloc='b', labeljust='l',
+               style='rounded,filled', 
+               fillcolor='#B8D4E8',
+               color='#2C5F7C',
+               fontcolor='#1F618D',
+               fontsize='13',
+               fontname='Arial Bold',
+               penwidth='3',
+               margin='25')
+        
+        # Database Roles inside database but outside schema (horizontal)
+        db.node('READ_ROLE', labels['READ_ROLE'], 
+                  fillcolor='#9B59B6', color='#6C3483', fontcolor='white',
+                  width='2', height='1')
+        db.node('CREATE_ROLE', labels['CREATE_ROLE'], 
+                  fillcolor='#9B59B6', color='#6C3483', fontcolor='white',
+                  width='2', height='1')
+        db.node('WRITE_ROLE', labels['WRITE_ROLE'], 
+                  fillcolor='#9B59B6', color='#6C3483', fontcolor='white',
+                  width='2', height='1')
+        
+        # Force all database roles to be on the same horizontal rank
+        with db.subgraph() as db_roles:
+            db_roles.attr(rank='same')
+            db_roles.node('READ_ROLE')
+            db_roles.node('CREATE_ROLE')
+            db_roles.node('WRITE_ROLE')
+        
+        # Invisible edges for left-to-right ordering
+        db.edge('READ_ROLE', 'CREATE_ROLE', style='invis')
+        db.edge('CREATE_ROLE', 'WRITE_ROLE', style='invis')
+        
+        # Schema cluster inside database (below the roles)
+        with db.subgraph(name='cluster_schema') as schema:
+            schema.attr(label=labels['cluster_schema'], 
+                      labelloc='b', labeljust='l',
+                      style='rounded,filled',
+                      fillcolor='#E8F4F8',
+                      color='#34495E',
+                      fontcolor='#2C3E50',
+                      fontsize='12',
+                      fontname='Arial Bold',
+                      penwidth='2.5',
+                      margin='20')
+            
+            # Schema access roles (inside the schema)
+            schema.node('SCHEMA_READ_ROLE', labels['SCHEMA_READ_ROLE'], 
+                      fillcolor='#BB8FCE', color='#6C3483', fontcolor='white',
+                      width='2', height='0.9')
+            schema.node('SCHEMA_CREATE_ROLE', labels['SCHEMA_CREATE_ROLE'], 
+                      fillcolor='#BB8FCE', color='#6C3483', fontcolor='white',
+                      width='2', height='0.9')
+            schema.node('SCHEMA_WRITE_ROLE', labels['SCHEMA_WRITE_ROLE'], 
+                      fillcolor='#BB8FCE', color='#6C3483', fontcolor='white',
+                      width='2', height='0.9')
+            
+            # Keep schema roles on same rank
+            with schema.subgraph() as schema_roles:
+                schema_roles.attr(rank='same')
+                schema_roles.node('SCHEMA_READ_ROLE')
+                schema_roles.node('SCHEMA_CREATE_ROLE')
+                schema_roles.node('SCHEMA_WRITE_ROLE')
+            
+            # Invisible edges for ordering
+            schema.edge('SCHEMA_READ_ROLE', 'SCHEMA_CREATE_ROLE', style='invis')
+            schema.edge('SCHEMA_CREATE_ROLE', 'SCHEMA_WRITE_ROLE', style='invis')
+            
+            # Tables area inside schema (below schema roles)
+            schema.node('TABLES_AREA', 'Tables\n(Future Objects)', 
+                      fillcolor='#F39C12', color='#D68910', fontcolor='white',
+                      shape='cylinder', width='5', height='1.2')
+            
+            # Connect schema roles to tables
+            schema.edge('SCHEMA_READ_ROLE', 'TABLES_AREA', style='dashed', color='#7F8C8D', arrowhead='vee')
+            schema.edge('SCHEMA_CREATE_ROLE', 'TABLES_AREA', style='dashed', color='#7F8C8D', arrowhead='vee')
+            schema.edge('SCHEMA_WRITE_ROLE', 'TABLES_AREA', style='dashed', color='#7F8C8D', arrowhead='vee')
+        
+        # Connect database roles to schema roles (inheritance/grants)
+        db.edge('READ_ROLE', 'SCHEMA_READ_ROLE', color='#9B59B6', penwidth='1.5', style='dashed')
+        db.edge('READ_ROLE', 'SCHEMA_CREATE_ROLE', color='#9B59B6', penwidth='1.5', style='dashed')
+        db.edge('READ_ROLE', 'SCHEMA_WRITE_ROLE', color='#9B59B6', penwidth='1.5', style='dashed')
+        
+        # Invisible edge to keep schema below roles
+        db.edge('CREATE_ROLE', 'SCHEMA_CREATE_ROLE', style='invis')
+    
+    # Keep Schema Access label on the left, aligned with schema area
+    # Use constraint and minlen to position label at schema level
+    dot.edge('LABEL_FUNCTIONAL', 'LABEL_SCHEMA_ACCESS', style='invis', minlen='2')
+    dot.edge('LABEL_SCHEMA_ACCESS', 'TABLES_AREA', style='invis', constraint='false')
+    
+    # Relationships between levels
+    dot.edge('SYSADMIN', 'ADMIN_ROLE', label='creates DB\ntransfers ownership', 
+            color='#2980B9', penwidth='2', fontsize='10')
+    
+    # Admin role creates account roles
+    for role in roles:
+        dot.edge('ADMIN_ROLE', f'{role}_ROLE', label='creates', 
+                color='#C67BA0', penwidth='1.5', fontsize='9')
+    
+    # Admin role creates database roles
+    dot.edge('ADMIN_ROLE', 'READ_ROLE', 
+            color='#C67BA0', penwidth='1.5', fontsize='9', lhead='cluster_database')
+    
+    # Account roles are granted database roles (through schema roles)
+    for role in roles:
+        node = FUNCTIONAL_ROLE_NODES[role]
+        dot.edge(f'{role}_ROLE', node['schema_role'], 
+                color=node['fillcolor'], penwidth='1.2', fontsize='9', style='dashed')
+    
+    return dot
+
+
+
+def _placeholder(slot):
+    return f'__LABEL_{slot}__'
+
+
+def _skeleton_parts(functional_roles):
+    """Split the diagram's DOT source around its labels: literal text at even positions, slots at odd ones"""
+    source = build_rbac_digraph({slot: _placeholder(slot) for slot in RBAC_DIAGRAM_LABELS}, functional_roles).source
+    pattern = '|'.join(re.escape(_placeholder(slot)) for slot in RBAC_DIAGRAM_LABELS)
+    parts = re.split(f'({pattern})', source)
+    slots = {_placeholder(slot): slot for slot in RBAC_DIAGRAM_LABELS}
+    # Each placeholder is a plain ID, so graphviz left it unquoted and it can be swapped for any quoted label
+    return [slots[part] if index % 2 else part for index, part in enumerate(parts)]
+
+
+# One skeleton per selection of functional roles, built once at import; rendering a diagram
+# only picks the skeleton and fills in the labels
+_SKELETON_PARTS = {
+    roles: _skeleton_parts(roles)
+    for count in range(len(FUNCTIONAL_ROLES) + 1)
+    for roles in combinations(FUNCTIONAL_ROLES, count)
+}
+
+
+def render_rbac_diagram(database_name, schema_name, functional_roles=FUNCTIONAL_ROLES):
+    """DOT source of the RBAC diagram, filled in from the precomputed skeleton
+
+    Gives the same source as build_rbac_digraph(rbac_diagram_labels(...), functional_roles).source,
+    with each label quoted the way graphviz would quote it.
+    """
+    labels = rbac_diagram_labels(database_name, schema_name)
+    parts = _SKELETON_PARTS[_selected_roles(functional_roles)]
+    return ''.join(quote(labels[part]) if index % 2 else part for index, part in enumerate(parts))
@@ -0,0 +1,181 @@
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+# Output formats dot can render, with their MIME types
+EXPORT_FORMATS = {
+    'svg': 'image/svg+xml',
+    'png': 'image/png',
+    'pdf': 'application/pdf',
+}
+
+DEFAULT_TIMEOUT = 30.0
+# Niceness of the dot processes, so exports yield the CPU to interactive sessions
+DEFAULT_NICE = 10
+
+
+class DiagramExportError(RuntimeError):
+    """Raised when a diagram can't be rendered (dot is missing, fails, or times out)"""
+
+
+def default_workers():
+    """Half of the CPUs (at least one), leaving the rest for the app's interactive sessions"""
+    return max(1, (os.cpu_count() or 2) // 2)
+
+
+def dot_key(source, fmt):
+    """Cache key of a rendering: the format and a hash of the DOT source"""
+    return fmt, hashlib.sha256(source.encode('utf-8')).hexdigest()
+
+
+class DiagramRenderer:
+    """Render DOT sources through a bounded pool of dot subprocesses
+
+    At most max_workers dot processes run at once, each at lowered priority (nice) and
+    killed after timeout seconds. Renderings are cached by DOT hash and format, and
+    concurrent requests for the same rendering share one dot process.
+    """
+
+    def __init__(self, max_workers=None, timeout=DEFAULT_TIMEOUT, nice=DEFAULT_NICE, dot_binary='dot',
+                 cache_size=256):
+        self.max_workers = max_workers or default_workers()
+        self.timeout = timeout
+        self.nice = nice
+        self.dot_binary = dot_binary
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='dot')
+
+    def available(self):
+        """Whether the dot binary can be found"""
+        return shutil.which(self.dot_binary) is not None
+
+    def _command(self, fmt):
+        command = [self.dot_binary, f'-T{fmt}']
+        # Prefixing nice (instead of os.nice in preexec_fn) is safe to use from worker threads
+        if self.nice and shutil.which('nice'):
+            command = ['nice', '-n', str(self.nice)] + command
+        return command
+
+    def _run(self, source, fmt):
+        if not self.available():
+            raise DiagramExportError(f"Graphviz '{self.dot_binary}' isn't installed, so diagrams can't be rendered")
+        try:
+            result = subprocess.run(
+                self._command(fmt), input=source.encode('utf-8'), capture_output=True, timeout=self.timeout
+            )
+        except FileNotFoundError:
+            raise DiagramExportError(f"Graphviz '{self.dot_binary}' isn't installed, so diagrams can't be rendered")
+        except subprocess.TimeoutExpired:
+            raise DiagramExportError(f"Rendering the diagram as {fmt.upper()} took over {self.timeout:g}s")
+        if result.returncode != 0:
+            message = result.stderr.decode('utf-8', errors='replace').strip()
+            raise DiagramExportError(f"dot failed to render {fmt.upper()}: {message or f'exit code {result.returncode}'}")
+        return result.stdout
+
+    def _finish(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.exception() is None:
+                self._cache[key] = future.result()
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+    def submit(self, source, fmt):
+        """Start rendering source as fmt; returns a Future with the rendered bytes"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported format '{fmt}'; use one of {', '.join(EXPORT_FORMATS)}")
+        key = dot_key(source, fmt)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                cached = Future()
+                cached.set_result(self._cache[key])
+                return cached
+            if key in self._pending:
+                return self._pending[key]
+            future = self._pool.submit(self._run, source, fmt)
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return future
+
+    def render(self, source, fmt):
+        """Render source as fmt and return the bytes"""
+        return self.submit(source, fmt).result()
+
+    def render_many(self, diagrams, formats):
+        """Yield (name, fmt, bytes) as renderings finish, for (name, source) diagrams
+
+        Only a couple of renderings per worker are queued at a time, so memory stays bounded
+        however many diagrams are exported.
+        """
+        window = self.max_workers * 2
+        # Identical diagrams share one future, so each future maps to every (name, fmt) waiting on it
+        in_flight = {}
+
+        def finished():
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                data = future.result()
+                for name, fmt in in_flight.pop(future):
+                    yield name, fmt, data
+
+        for name, source in diagrams:
+            for fmt in formats:
+                while len(in_flight) >= window:
+                    yield from finished()
+                in_flight.setdefault(self.submit(source, fmt), []).append((name, fmt))
+        while in_flight:
+            yield from finished()
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class _ZipStream:
+    """Write-only buffer that ZipFile streams into; the written bytes are taken after each entry"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def take(self):
+        data = b''.join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(renderer, diagrams, formats, on_entry=None):
+    """Render (name, source) diagrams in each format and yield a zip archive of them in chunks
+
+    Each entry is compressed and yielded as soon as it renders, so the archive is never held
+    in memory as a whole. on_entry(name, fmt) is called after each entry is written.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, fmt, data in renderer.render_many(diagrams, formats):
+            archive.writestr(f"{fmt}/{name}.{fmt}", data)
+            if on_entry is not None:
+                on_entry(name, fmt)
+            yield stream.take()
+    yield stream.take()
+
+
+def write_zip(file, renderer, diagrams, formats):
+    """Write the zip archive of iter_zip to a binary file object"""
+    for chunk in iter_zip(renderer, diagrams, formats):
+        file.write(chunk)
@@ -0,0 +1,509 @@
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+
+from sf_security.sql_script import STRING, WORD, split_statements, tokenize
+
+# Session context kinds, replayed in this order with the role switched to last (see context_statements)
+CONTEXT_KINDS = ('ROLE', 'SECONDARY ROLES', 'WAREHOUSE', 'DATABASE', 'SCHEMA')
+
+# Object types that may follow CREATE / ALTER / DROP, longest phrases first
+_OBJECT_TYPES = sorted([
+    ('DATABASE', 'ROLE'), ('NETWORK', 'RULE'), ('NETWORK', 'POLICY'), ('SESSION', 'POLICY'),
+    ('AUTHENTICATION', 'POLICY'), ('PASSWORD', 'POLICY'), ('API', 'INTEGRATION'), ('GIT', 'REPOSITORY'),
+    ('DATABASE',), ('SCHEMA',), ('ROLE',), ('USER',), ('WAREHOUSE',), ('TABLE',), ('VIEW',),
+    ('STAGE',), ('STREAMLIT',), ('FUNCTION',), ('PROCEDURE',), ('TASK',), ('STREAM',),
+], key=len, reverse=True)
+
+_BLOCK_BODY_RE = re.compile(r'\s*BEGIN\b(.*)\bEND\s*;?\s*$', re.IGNORECASE | re.DOTALL)
+
+_CREATE_MODIFIERS = {'OR', 'REPLACE', 'TRANSIENT', 'TEMPORARY', 'TEMP', 'SECURE', 'MANAGED', 'ACCESS'}
+_READ_ONLY_COMMANDS = {'SHOW', 'SELECT', 'DESCRIBE', 'DESC', 'LIST', 'LS'}
+
+# Words that are never object names in the generated scripts
+_KEYWORDS = frozenset("""
+    ACCESS ACCOUNT ALL ALLOWED_NETWORK_RULE_LIST ALTER AND APPLY AS AUTHENTICATION AUTHENTICATION_METHODS
+    AUTO_RESUME AUTO_SUSPEND BLOCKED_NETWORK_RULE_LIST BY CLIENT_TYPES COMMENT CREATE CURRENT_ROLE
+    CURRENT_USER DATABASE DATABASES DATE DEFAULT DESC DESCRIBE DROP ENABLED EXISTS FALSE FROM FUTURE
+    GRANT GRANTS IDENTIFIER IF IN INGRESS EGRESS INSERT INT INTEGER INTO IPV4 KEY LIMIT MANAGED
+    MFA_ENROLLMENT MODE MODIFY NETWORK NONE NOT NULL ON OPTIONAL OR OWNERSHIP POLICY PRIMARY
+    REPLACE REQUIRED REVOKE ROLE ROLES RULE SCHEMA SCHEMAS SECONDARY SELECT SESSION SESSION_IDLE_TIMEOUT_MINS
+    SESSION_UI_IDLE_TIMEOUT_MINS SET SHOW TABLE TABLES TO TRUE TYPE UNSET USAGE USE USER USERS VALUES
+    VALUE_LIST VARCHAR VIEW WAREHOUSE WAREHOUSES WAREHOUSE_SIZE WHERE WITH
+""".split())
+
+
+@dataclass
+class Statement:
+    """One executable statement with the session context it must run under"""
+    index: int
+    sql: str
+    context: dict
+    reads: set = field(default_factory=set)
+    writes: set = field(default_factory=set)
+    appends: set = field(default_factory=set)
+    query: bool = False
+
+
+@dataclass
+class StatementResult:
+    """Outcome of running one statement"""
+    index: int
+    sql: str
+    status: str
+    attempts: int = 0
+    elapsed: float = 0.0
+    error: str = ''
+    session: int = -1
+
+
+def _name_keys(name):
+    """Keys an object name is tracked under: the full name and its last part"""
+    name = name.upper()
+    return {name, name.rsplit('.', 1)[-1]}
+
+
+def _parent_keys(name):
+    """Keys for the containers of a qualified name (DB for DB.SCHEMA, etc.)"""
+    parts = name.upper().split('.')
+    return {'.'.join(parts[:i]) for i in range(1, len(parts))}
+
+
+def _contents_keys(name):
+    """Keys for the contents of each container of a qualified name (objects in DB, in DB.SCHEMA, ...)"""
+    return {f'CONTENTS:{parent}' for parent in _parent_keys(name)}
+
+
+def _container_grant_key(upper, words):
+    """Contents key of the container a GRANT/REVOKE ... ON ALL|FUTURE <objects> IN <container> covers"""
+    if 'ON' not in upper:
+        return None
+    on = upper.index('ON')
+    if upper[on + 1:on + 2] not in (['ALL'], ['FUTURE']) or 'IN' not in upper[on:]:
+        return None
+    position = on + upper[on:].index('IN') + 1
+    if upper[position:position + 1] in (['SCHEMA'], ['DATABASE']):
+        position += 1
+    if position < len(words):
+        return f'CONTENTS:{words[position].upper()}'
+    return None
+
+
+def _object_words(words):
+    """Words that look like object names rather than keywords"""
+    return [word for word in words if word.upper() not in _KEYWORDS]
+
+
+def _target_after_type(words, start):
+    """Return the object name following an object type phrase at words[start:]"""
+    upper = [word.upper() for word in words]
+    for object_type in _OBJECT_TYPES:
+        if tuple(upper[start:start + len(object_type)]) == object_type:
+            position = start + len(object_type)
+            # Skip IF [NOT] EXISTS
+            while position < len(upper) and upper[position] in ('IF', 'NOT', 'EXISTS'):
+                position += 1
+            if position < len(words):
+                return words[position]
+    return None
+
+
+def _classify(statement, words):
+    """Fill in the objects a statement reads, writes, or appends grants to"""
+    upper = [word.upper() for word in words]
+    command = upper[0] if upper else ''
+    names = _object_words(words)
+    reads = set()
+    for name in names:
+        reads |= _name_keys(name) | _parent_keys(name)
+
+    target = None
+    if command in ('CREATE', 'ALTER', 'DROP'):
+        position = 1
+        while position < len(upper) and upper[position] in _CREATE_MODIFIERS:
+            position += 1
+        target = _target_after_type(words, position)
+    elif command == 'INSERT' and len(words) > 2:
+        target = words[2]
+
+    if command in _READ_ONLY_COMMANDS:
+        statement.query = True
+    elif target is not None:
+        statement.writes |= _name_keys(target)
+        # Creating or changing an object changes what its schema and database contain
+        statement.appends |= _contents_keys(target)
+    elif command in ('GRANT', 'REVOKE') and names:
+        # Grants on ALL/FUTURE objects in a container wait for (and are waited on by) objects created in it
+        contents = _container_grant_key(upper, words)
+        if contents is not None:
+            reads.add(contents)
+        # The grantee is the last name; grants to the same grantee commute with each other
+        grantee = names[-1]
+        keys = _name_keys(grantee)
+        if command == 'REVOKE':
+            statement.writes |= keys
+        else:
+            statement.appends |= keys
+        if upper[1:2] == ['ROLE'] or upper[1:3] == ['DATABASE', 'ROLE']:
+            # Granting a role also changes who may USE it, so later USE ROLE statements wait for it
+            if command == 'REVOKE':
+                statement.writes |= _name_keys(names[0])
+            else:
+                statement.appends |= _name_keys(names[0])
+        if 'OWNERSHIP' in upper and len(names) > 1:
+            statement.writes |= _name_keys(names[-2])
+    else:
+        # Unknown statement shape: assume it touches everything it mentions
+        statement.writes |= reads
+    statement.reads |= reads - statement.writes - statement.appends
+
+
+def _context_update(words, sql):
+    """Return (kind, sql) when the statement changes session context, else None"""
+    upper = [word.upper() for word in words]
+    if len(upper) >= 2 and upper[0] == 'USE':
+        if upper[1] == 'SECONDARY':
+            return 'SECONDARY ROLES', sql
+        if upper[1] in ('ROLE', 'WAREHOUSE', 'DATABASE', 'SCHEMA'):
+            return upper[1], sql
+        # A bare "USE <database>[.<schema>]" selects a database
+        return 'DATABASE', sql
+    if upper and upper[0] == 'SET' and len(words) > 1:
+        return f"SET {upper[1]}", sql
+    return None
+
+
+def _context_reads(context):
+    """Objects a statement depends on through its session context"""
+    keys = set()
+    for kind, value in context.items():
+        if kind.startswith('SET') or kind == 'SECONDARY ROLES':
+            continue
+        # Replaying a context statement also needs the role it was issued as
+        for sql in [value] if kind == 'ROLE' else [sql for sql in value if sql is not None]:
+            words = [text for token_kind, text in tokenize(sql) if token_kind == WORD]
+            for name in _object_words(words[1:]):
+                keys |= _name_keys(name) | _parent_keys(name)
+    return keys
+
+
+class ExecutionPlan:
+    """Statements of a script and the dependencies between them"""
+
+    def __init__(self, statements):
+        self.statements = statements
+        self.dependencies = [set() for _ in statements]
+        self._build_dependencies()
+
+    def _build_dependencies(self):
+        last_writer = {}
+        appenders = {}
+        readers = {}
+        # Queries (SHOW, SELECT, ...) report the state at their place in the script: they wait for
+        # every earlier change, and later changes wait for them
+        last_query = None
+        changed_since_query = set()
+        for statement in self.statements:
+            deps = self.dependencies[statement.index]
+            if statement.query:
+                deps.update(changed_since_query)
+                if last_query is not None:
+                    deps.add(last_query)
+                last_query = statement.index
+                changed_since_query = set()
+            elif statement.writes or statement.appends:
+                if last_query is not None:
+                    deps.add(last_query)
+                changed_since_query.add(statement.index)
+            touched = statement.reads | statement.writes | statement.appends
+            # Read-after-write and write-after-write
+            for key in touched:
+                if key in last_writer:
+                    deps.add(last_writer[key])
+            # Grants must land before anything reads or replaces the grantee
+            for key in statement.reads | statement.writes:
+                deps.update(appenders.get(key, ()))
+            # Write-after-read
+            for key in statement.writes | statement.appends:
+                deps.update(readers.get(key, ()))
+
+            for key in statement.writes:
+                last_writer[key] = statement.index
+                appenders.pop(key, None)
+                readers.pop(key, None)
+            for key in statement.appends:
+                appenders.setdefault(key, set()).add(statement.index)
+            for key in statement.reads:
+                readers.setdefault(key, set()).add(statement.index)
+            deps.discard(statement.index)
+
+    def levels(self):
+        """Group statement indexes into waves that could run concurrently"""
+        depth = []
+        for statement in self.statements:
+            deps = self.dependencies[statement.index]
+            depth.append(1 + max((depth[d] for d in deps), default=-1))
+        waves = {}
+        for index, level in enumerate(depth):
+            waves.setdefault(level, []).append(index)
+        return [waves[level] for level in sorted(waves)]
+
+
+def _block_statements(tokens):
+    """Statements inside an EXECUTE IMMEDIATE $$ BEGIN ... END $$ block, or None for other statements"""
+    words = [text.upper() for kind, text in tokens[:2] if kind == WORD]
+    if words != ['EXECUTE', 'IMMEDIATE']:
+        return None
+    for kind, text in tokens[2:]:
+        if kind == STRING and text.startswith('$$'):
+            body = _BLOCK_BODY_RE.match(text[2:-2])
+            return split_statements(body.group(1) if body else text[2:-2])
+    return None
+
+
+def context_statements(context, current=None):
+    """Context statements needed to move a session from the current context to the given one
+
+    Context values are USE ROLE statements for 'ROLE' and (role in effect, statement) pairs
+    for everything else: a USE WAREHOUSE issued as SYSADMIN is replayed as SYSADMIN, since
+    the role the statement runs under may not be allowed to select that warehouse itself.
+    """
+    current = current or {}
+    role = current.get('ROLE')
+    statements = []
+    kinds = list(CONTEXT_KINDS[1:]) + sorted(kind for kind in context if kind.startswith('SET'))
+    for kind in kinds:
+        # The same statement has the same effect whichever role issued it
+        if kind not in context or current.get(kind, (None, None))[1] == context[kind][1]:
+            continue
+        issued_as, sql = context[kind]
+        if issued_as is not None and issued_as != role:
+            statements.append(issued_as)
+            role = issued_as
+        statements.append(sql)
+    if 'ROLE' in context and context['ROLE'] != role:
+        statements.append(context['ROLE'])
+    return statements
+
+
+def split_context(script):
+    """Split a script into (sql, context) pairs, folding USE and SET statements into the context"""
+    items = []
+    context = {}
+    for sql in split_statements(script):
+        words = [text for kind, text in tokenize(sql) if kind == WORD]
+        update = _context_update(words, sql)
+        if update is not None:
+            kind, context_sql = update
+            context = dict(context)
+            context[kind] = context_sql if kind == 'ROLE' else (context.get('ROLE'), context_sql)
+            continue
+        items.append((sql, context))
+    return items
+
+
+def plan_statements(items):
+    """Build an execution plan from (sql, context) pairs"""
+    statements = []
+    context_reads = {}
+    for sql, context in items:
+        statement = Statement(index=len(statements), sql=sql, context=context)
+        tokens = tokenize(sql)
+        # A scripting block touches everything its statements touch
+        for inner_tokens in [tokenize(inner) for inner in _block_statements(tokens) or []] or [tokens]:
+            # String literals never name objects, so only words are considered
+            part = Statement(index=statement.index, sql=sql, context=context)
+            _classify(part, [text for kind, text in inner_tokens if kind == WORD])
+            statement.query |= part.query
+            statement.reads |= part.reads
+            statement.writes |= part.writes
+            statement.appends |= part.appends
+        if id(context) not in context_reads:
+            context_reads[id(context)] = _context_reads(context)
+        statement.reads = (statement.reads | context_reads[id(context)]) - statement.writes - statement.appends
+        statements.append(statement)
+    return ExecutionPlan(statements)
+
+
+def build_plan(script):
+    """Parse a generated script into an execution plan
+
+    USE and SET statements become part of each following statement's context instead of
+    separate steps, so any pooled session can run any statement after switching context.
+    """
+    return plan_statements(split_context(script))
+
+
+class RecordingSession:
+    """Stand-in for a Snowpark session that records statements instead of running them
+
+    Used for dry runs and tests. Statements matching fail_on raise an error for the
+    first fail_times attempts, which exercises the retry logic.
+    """
+
+    def __init__(self, log=None, delay=0.0, fail_on=None, fail_times=1):
+        self.log = log if log is not None else []
+        self.delay = delay
+        self.fail_on = fail_on
+        self.fail_times = fail_times
+        self._failures = {}
+        self._lock = threading.Lock()
+
+    def sql(self, query):
+        return _RecordedQuery(self, query)
+
+    def close(self):
+        pass
+
+
+class _RecordedQuery:
+    def __init__(self, session, query):
+        self.session = session
+        self.query = query
+
+    def collect(self):
+        session = self.session
+        if session.delay:
+            time.sleep(session.delay)
+        with session._lock:
+            if session.fail_on and session.fail_on in self.query:
+                count = session._failures.get(self.query, 0)
+                if count < session.fail_times:
+                    session._failures[self.query] = count + 1
+                    raise RuntimeError(f"Simulated failure for: {self.query}")
+            session.log.append((id(session), self.query))
+        return []
+
+
+class ScriptExecutor:
+    """Run an execution plan over a small pool of sessions, respecting statement dependencies"""
+
+    def __init__(self, session_factory, max_sessions=4, retries=2, retry_delay=1.0, close_sessions=True):
+        self.session_factory = session_factory
+        self.close_sessions = close_sessions
+        self.max_sessions = max(1, int(max_sessions))
+        self.retries = max(0, int(retries))
+        self.retry_delay = retry_delay
+        self._idle_sessions = []
+        self._session_context = {}
+        self._session_ids = {}
+        self._lock = threading.Lock()
+
+    def _acquire_session(self):
+        with self._lock:
+            if self._idle_sessions:
+                return self._idle_sessions.pop()
+        # The worker count caps how many sessions are ever created
+        session = self.session_factory()
+        with self._lock:
+            self._session_context[id(session)] = {}
+            self._session_ids[id(session)] = len(self._session_ids)
+        return session
+
+    def _release_session(self, session):
+        with self._lock:
+            self._idle_sessions.append(session)
+
+    def _switch_context(self, session, context):
+        """Replay only the context statements that differ from the session's current context"""
+        current = self._session_context[id(session)]
+        for sql in context_statements(context, current):
+            session.sql(sql).collect()
+        current.update(context)
+
+    def _run_statement(self, statement):
+        session = self._acquire_session()
+        result = StatementResult(statement.index, statement.sql, 'failed', session=self._session_ids[id(session)])
+        started = time.perf_counter()
+        try:
+            for attempt in range(1, self.retries + 2):
+                result.attempts = attempt
+                try:
+                    self._switch_context(session, statement.context)
+                    session.sql(statement.sql).collect()
+                    result.status = 'succeeded'
+                    result.error = ''
+                    break
+                except Exception as e:
+                    result.error = str(e)
+                    # Context may be partially applied after a failure; replay it on retry
+                    self._session_context[id(session)] = {}
+                    if attempt <= self.retries:
+                        time.sleep(self.retry_delay * attempt)
+        finally:
+            result.elapsed = time.perf_counter() - started
+            self._release_session(session)
+        return result
+
+    def run(self, plan, on_result=None):
+        """Execute the plan and return one StatementResult per statement, in script order"""
+        results = [None] * len(plan.statements)
+        remaining = [len(deps) for deps in plan.dependencies]
+        dependents = [[] for _ in plan.statements]
+        for index, deps in enumerate(plan.dependencies):
+            for dep in deps:
+                dependents[dep].append(index)
+
+        def finish(result):
+            results[result.index] = result
+            if on_result is not None:
+                on_result(result)
+
+        def skip(index):
+            # Everything downstream of a failure is skipped
+            pending = [index]
+            while pending:
+                current = pending.pop()
+                if results[current] is not None:
+                    continue
+                finish(StatementResult(current, plan.statements[current].sql, 'skipped',
+                                       error="A statement it depends on failed"))
+                pending.extend(dependents[current])
+
+        ready = [index for index, count in enumerate(remaining) if count == 0]
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_sessions) as pool:
+                running = {}
+                while ready or running:
+                    for index in ready:
+                        running[pool.submit(self._run_statement, plan.statements[index])] = index
+                    ready = []
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        running.pop(future)
+                        result = future.result()
+                        finish(result)
+                        if result.status != 'succeeded':
+                            for dependent in dependents[result.index]:
+                                skip(dependent)
+                            continue
+                        for dependent in dependents[result.index]:
+                            remaining[dependent] -= 1
+                            if remaining[dependent] == 0 and results[dependent] is None:
+                                ready.append(dependent)
+        finally:
+            if self.close_sessions:
+                for session in self._idle_sessions:
+                    session.close()
+            self._idle_sessions = []
+            self._session_context = {}
+            self._session_ids = {}
+        return results
+
+
+def snowpark_session_factory(connection_parameters=None):
+    """Return (factory, max_sessions, close_sessions) for Snowpark sessions
+
+    With connection parameters every call opens a new session, so statements can run
+    in parallel. Without them the active session (e.g. Streamlit in Snowflake) is
+    reused, which limits execution to a single session.
+    """
+    if connection_parameters:
+        from snowflake.snowpark import Session
+        return (lambda: Session.builder.configs(dict(connection_parameters)).create()), None, True
+
+    from snowflake.snowpark.context import get_active_session
+    session = get_active_session()
+    return (lambda: session), 1, False
@@ -0,0 +1,120 @@
+import re
+
+import pandas as pd
+
+from sf_security.templates import FUNCTIONAL_ROLES
+
+# Snowflake's limit for identifiers (database, schema, role, policy, ... names)
+MAX_IDENTIFIER_LENGTH = 255
+
+# Snowflake reserved keywords; these can't be used as unquoted identifiers
+RESERVED_WORDS = frozenset("""
+    ACCOUNT ALL ALTER AND ANY AS BETWEEN BY CASE CAST CHECK COLUMN CONNECT CONNECTION CONSTRAINT
+    CREATE CROSS CURRENT CURRENT_DATE CURRENT_TIME CURRENT_TIMESTAMP CURRENT_USER DATABASE DELETE
+    DISTINCT DROP ELSE EXISTS FALSE FOLLOWING FOR FROM FULL GRANT GROUP GSCLUSTER HAVING ILIKE IN
+    INCREMENT INNER INSERT INTERSECT INTO IS ISSUE JOIN LATERAL LEFT LIKE LOCALTIME LOCALTIMESTAMP
+    MINUS NATURAL NOT NULL OF ON OR ORDER ORGANIZATION QUALIFY REGEXP REVOKE RIGHT RLIKE ROW ROWS
+    SAMPLE SCHEMA SELECT SET SOME START TABLE TABLESAMPLE THEN TO TRIGGER TRUE TRY_CAST UNION UNIQUE
+    UPDATE USING VALUES VIEW WHEN WHENEVER WHERE WINDOW WITH
+""".split())
+
+_UNQUOTED_IDENTIFIER_RE = re.compile(r'[A-Za-z_][A-Za-z0-9_$]*')
+_INVALID_CHARACTER_RE = re.compile(r'[^A-Za-z0-9_$]')
+
+# Object names the templates derive from each input; {name} is replaced by the input
+PERIMETER_DERIVED_NAMES = ('{name}_allowed_ips', '{name}_blocked_ips', '{name}_network_policy')
+RBAC_DATABASE_DERIVED_NAMES = (
+    'RL_{name}_ADMIN', 'DB_R_DBR_{name}', 'DB_C_DBR_{name}', 'DB_W_DBR_{name}',
+    'SC_R_DBR_{name}', 'SC_C_DBR_{name}', 'SC_W_DBR_{name}',
+) + tuple(f'{{name}}_{role}' for role in FUNCTIONAL_ROLES)
+
+
+def identifier_problem(value, max_length=MAX_IDENTIFIER_LENGTH):
+    """Return why value can't be used as an unquoted identifier, or None if it can"""
+    if not isinstance(value, str) or not value:
+        return "must not be empty"
+    if len(value) > max_length:
+        return f"is {len(value):,} characters long (the limit is {max_length:,})"
+    if not _UNQUOTED_IDENTIFIER_RE.fullmatch(value):
+        if value[0].isdigit() or value[0] == '$':
+            return f"'{value}' must start with a letter or underscore"
+        characters = sorted(set(_INVALID_CHARACTER_RE.findall(value)))
+        shown = ", ".join(repr(character) for character in characters)
+        return f"'{value}' contains characters that aren't allowed ({shown}); use letters, digits, _ and $"
+    if value.upper() in RESERVED_WORDS:
+        return f"'{value}' is a reserved word"
+    return None
+
+
+def derived_name_problems(value, templates):
+    """Problems with the object names a template builds from value (e.g. RL_<db>_ADMIN)"""
+    if not templates:
+        return []
+    longest = max(len(template.format(name='')) for template in templates)
+    max_length = MAX_IDENTIFIER_LENGTH - longest
+    if isinstance(value, str) and len(value) > max_length:
+        example = max(templates, key=lambda template: len(template.format(name='')))
+        return [f"'{value[:20]}...' is too long: derived names like {example.format(name='<name>')} "
+                f"must stay within {MAX_IDENTIFIER_LENGTH} characters, so use at most {max_length}"]
+    return []
+
+
+def check_perimeter_names(company_name):
+    """Problems with the perimeter page's name input, including the names derived from it"""
+    problem = identifier_problem(company_name)
+    if problem:
+        return [f"Company name {problem}"]
+    return [f"Company name {message}" for message in derived_name_problems(company_name, PERIMETER_DERIVED_NAMES)]
+
+
+def check_rbac_names(database_name, schema_name):
+    """Problems with the RBAC page's name inputs, including the role names derived from them"""
+    problems = []
+    for label, value in (("Database name", database_name), ("Schema name", schema_name)):
+        problem = identifier_problem(value)
+        if problem:
+            problems.append(f"{label} {problem}")
+    if not problems:
+        problems += [f"Database name {message}"
+                     for message in derived_name_problems(database_name, RBAC_DATABASE_DERIVED_NAMES)]
+    return problems
+
+
+def identifier_problems(values, max_length=MAX_IDENTIFIER_LENGTH):
+    """Validate many names in one vectorized pass
+
+    Returns a Series aligned with values holding the problem for each invalid name and None
+    for valid ones; only the invalid names are inspected individually for a precise message.
+    """
+    names = pd.Series(values, dtype=object)
+    is_string = names.map(type).eq(str)
+    text = names.where(is_string, '')
+    invalid = (
+        ~is_string
+        | ~text.str.fullmatch(_UNQUOTED_IDENTIFIER_RE.pattern)
+        | (text.str.len() > max_length)
+        | text.str.upper().isin(RESERVED_WORDS)
+    )
+    problems = pd.Series([None] * len(names), index=names.index, dtype=object)
+    if invalid.any():
+        problems[invalid] = [identifier_problem(value, max_length) for value in names[invalid]]
+    return problems
+
+
+def quote_identifier(name):
+    """Return name as a safe SQL identifier: unchanged when it can be used unquoted, else double-quoted"""
+    if _UNQUOTED_IDENTIFIER_RE.fullmatch(name) and name.upper() not in RESERVED_WORDS:
+        return name
+    return '"' + name.replace('"', '""') + '"'
+
+
+def quote_identifiers(names, always=False):
+    """Vectorized quote_identifier for a Series of names; always=True quotes every name
+
+    Quoting every name preserves its exact case, e.g. for user names taken from SHOW USERS.
+    """
+    quoted = '"' + names.str.replace('"', '""', regex=False) + '"'
+    if always:
+        return quoted
+    plain = names.str.fullmatch(_UNQUOTED_IDENTIFIER_RE.pattern) & ~names.str.upper().isin(RESERVED_WORDS)
+    return quoted.mask(plain, names)
@@ -0,0 +1,139 @@
+import pandas as pd
+
+from sf_security.network import find_column, open_text
+
+# Default column names in SNOWFLAKE.ACCOUNT_USAGE.LOGIN_HISTORY exports
+USER_COLUMN = 'USER_NAME'
+IP_COLUMN = 'CLIENT_IP'
+SUCCESS_COLUMN = 'IS_SUCCESS'
+TIMESTAMP_COLUMN = 'EVENT_TIMESTAMP'
+
+_FOLD_EVERY = 8
+
+
+def _is_parquet(file, file_name):
+    """Detect Parquet input from the file name or the PAR1 magic bytes"""
+    if file_name:
+        return str(file_name).lower().endswith(('.parquet', '.pq'))
+    if hasattr(file, 'read') and hasattr(file, 'seek'):
+        magic = file.read(4)
+        file.seek(0)
+        return magic == b'PAR1'
+    return False
+
+
+def _resolve_columns(available, columns, optional_columns=()):
+    """Map wanted column names onto the export's columns, ignoring case"""
+    found = {column: find_column(available, (column,)) for column in list(columns) + list(optional_columns)}
+    missing = [column for column in columns if found[column] is None]
+    if missing:
+        raise ValueError(f"Export is missing required column(s): {', '.join(missing)}")
+    return {column: export_column for column, export_column in found.items() if export_column is not None}
+
+
+def iter_export_chunks(file, columns, file_name=None, chunk_size=1_000_000, optional_columns=()):
+    """Yield chunks of a CSV or Parquet export as DataFrames with only the requested columns
+
+    Required columns must exist (matched case-insensitively); optional columns are
+    included when present. Only one chunk is held in memory at a time.
+    """
+    if _is_parquet(file, file_name):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Reading Parquet exports requires the pyarrow package")
+        parquet_file = pq.ParquetFile(file)
+        available = parquet_file.schema_arrow.names
+        mapping = _resolve_columns(available, columns, optional_columns)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=list(mapping.values())):
+            yield batch.to_pandas().rename(columns={v: k for k, v in mapping.items()})
+        return
+
+    with open_text(file) as text:
+        available = pd.read_csv(text, nrows=0).columns
+        text.seek(0)
+        mapping = _resolve_columns(available, columns, optional_columns)
+        reader = pd.read_csv(text, usecols=list(mapping.values()), dtype=str, chunksize=chunk_size)
+        for chunk in reader:
+            yield chunk.rename(columns={v: k for k, v in mapping.items()})
+
+
+def _fold(frames, keys, aggregations):
+    """Combine partial aggregates into one"""
+    return pd.concat(frames, ignore_index=True).groupby(keys, as_index=False, sort=False).agg(**aggregations)
+
+
+def replay_logins(file, index, file_name=None, chunk_size=1_000_000, successful_only=True,
+                  user_column=USER_COLUMN, ip_column=IP_COLUMN):
+    """Replay a login history export through a network policy index to predict lockouts
+
+    Returns two DataFrames: a per-user summary comparing rejected logins with all
+    replayed logins, and the rejected logins aggregated per user and client IP. Memory is
+    bounded by the number of distinct users and client IPs, not by the export size.
+    """
+    rejected_parts = []
+    user_parts = []
+    rejected_aggs = {
+        'STATUS': ('STATUS', 'first'),
+        'REJECTED_LOGINS': ('REJECTED_LOGINS', 'sum'),
+        'FIRST_SEEN': ('FIRST_SEEN', 'min'),
+        'LAST_SEEN': ('LAST_SEEN', 'max'),
+    }
+    user_aggs = {'TOTAL_LOGINS': ('TOTAL_LOGINS', 'sum')}
+
+    chunks = iter_export_chunks(
+        file, [user_column, ip_column], file_name=file_name, chunk_size=chunk_size,
+        optional_columns=[SUCCESS_COLUMN, TIMESTAMP_COLUMN]
+    )
+    for chunk in chunks:
+        if successful_only and SUCCESS_COLUMN in chunk:
+            # Failed logins were rejected anyway, so they can't turn into new lockouts
+            chunk = chunk[chunk[SUCCESS_COLUMN].astype(str).str.upper().isin(['YES', 'TRUE', '1'])]
+        if chunk.empty:
+            continue
+
+        users = chunk[user_column].fillna('').astype(str)
+        ips = chunk[ip_column].fillna('').astype(str).str.strip()
+        user_parts.append(users.value_counts().rename_axis(user_column).reset_index(name='TOTAL_LOGINS'))
+
+        statuses = index.classify(ips.to_numpy(dtype=object))
+        rejected = index.is_rejected(statuses)
+        if rejected.any():
+            timestamps = chunk[TIMESTAMP_COLUMN][rejected] if TIMESTAMP_COLUMN in chunk else None
+            if timestamps is not None:
+                timestamps = pd.to_datetime(timestamps, errors='coerce', format='mixed')
+            frame = pd.DataFrame({
+                user_column: users[rejected].to_numpy(),
+                ip_column: ips[rejected].to_numpy(),
+                'STATUS': statuses[rejected],
+                'REJECTED_LOGINS': 1,
+                'FIRST_SEEN': timestamps.to_numpy() if timestamps is not None else pd.NaT,
+                'LAST_SEEN': timestamps.to_numpy() if timestamps is not None else pd.NaT,
+            })
+            rejected_parts.append(_fold([frame], [user_column, ip_column], rejected_aggs))
+
+        # Fold partial aggregates together periodically to keep memory bounded
+        if len(rejected_parts) >= _FOLD_EVERY:
+            rejected_parts = [_fold(rejected_parts, [user_column, ip_column], rejected_aggs)]
+        if len(user_parts) >= _FOLD_EVERY:
+            user_parts = [_fold(user_parts, [user_column], user_aggs)]
+
+    if rejected_parts:
+        by_user_ip = _fold(rejected_parts, [user_column, ip_column], rejected_aggs)
+    else:
+        by_user_ip = pd.DataFrame(columns=[user_column, ip_column, *rejected_aggs])
+    by_user_ip = by_user_ip.sort_values('REJECTED_LOGINS', ascending=False, ignore_index=True)
+
+    if user_parts:
+        by_user = _fold(user_parts, [user_column], user_aggs)
+    else:
+        by_user = pd.DataFrame(columns=[user_column, *user_aggs])
+    rejected_per_user = by_user_ip.groupby(user_column)['REJECTED_LOGINS'].sum()
+    by_user['REJECTED_LOGINS'] = by_user[user_column].map(rejected_per_user).fillna(0).astype('int64')
+    by_user['REJECTED_SHARE'] = (by_user['REJECTED_LOGINS'] / by_user['TOTAL_LOGINS'].clip(lower=1)).round(4)
+    # A user is fully locked out when none of their historical logins would still be allowed
+    by_user['LOCKED_OUT'] = by_user['REJECTED_LOGINS'] >= by_user['TOTAL_LOGINS']
+    by_user = by_user[by_user['REJECTED_LOGINS'] > 0].sort_values(
+        ['LOCKED_OUT', 'REJECTED_LOGINS'], ascending=False, ignore_index=True
+    )
+    return by_user, by_user_ip
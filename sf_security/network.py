@@ -0,0 +1,202 @@
+import contextlib
+import csv
+import io
+import itertools
+import re
+
+import numpy as np
+import pandas as pd
+
+# Classification labels returned by the policy index
+ALLOWED = 'allowed'
+BLOCKED = 'blocked'
+UNMATCHED = 'unmatched'
+INVALID = 'invalid'
+
+# Dotted-quad address with an optional /prefix (network rules are TYPE = IPV4)
+_IPV4_RULE_RE = re.compile(r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})(?:/(\d{1,2}))?$')
+_IPV4_ADDRESS_RE = re.compile(r'^(\d{1,3})\.(\d{1,3})\.(\d{1,3})\.(\d{1,3})$')
+_IPV4_IN_TEXT_RE = re.compile(r'(?<![\d.])(\d{1,3}(?:\.\d{1,3}){3})(?![\d.])')
+
+# Column names commonly used for the client address in exported logs
+IP_COLUMN_CANDIDATES = ('CLIENT_IP', 'IP', 'IP_ADDRESS', 'CLIENT_ADDRESS', 'REMOTE_ADDR', 'SOURCE_IP')
+
+_MAX_IPV4 = 0xFFFFFFFF
+
+
+def parse_ip_list(ip_input):
+    """Parse IP input string into a list of IPs, handling commas and newlines"""
+    if not ip_input:
+        return []
+    # Replace newlines with commas, then split by comma
+    ips = ip_input.replace('\n', ',').split(',')
+    # Strip whitespace and filter out empty strings
+    ips = [ip.strip() for ip in ips if ip.strip()]
+    return ips
+
+
+def parse_ipv4_rule(value):
+    """Convert an IPv4 address or CIDR range into an inclusive (start, end) integer range"""
+    match = _IPV4_RULE_RE.match(value.strip())
+    if not match:
+        raise ValueError(f"'{value}' is not a valid IPv4 address or CIDR range")
+    octets = [int(octet) for octet in match.groups()[:4]]
+    if any(octet > 255 for octet in octets):
+        raise ValueError(f"'{value}' has an octet greater than 255")
+    prefix = 32 if match.group(5) is None else int(match.group(5))
+    if prefix > 32:
+        raise ValueError(f"'{value}' has a prefix length greater than 32")
+
+    address = (octets[0] << 24) | (octets[1] << 16) | (octets[2] << 8) | octets[3]
+    # Snowflake accepts ranges with host bits set (e.g. 192.0.0.1/24), so normalize to the network
+    mask = (_MAX_IPV4 << (32 - prefix)) & _MAX_IPV4
+    start = address & mask
+    end = start | (~mask & _MAX_IPV4)
+    return start, end
+
+
+def ipv4_to_int(ips):
+    """Vectorized dotted-quad to integer conversion; invalid addresses become -1"""
+    ips = pd.Series(ips, dtype=object)
+    # Log files repeat the same few addresses, so only parse each distinct value once
+    codes, uniques = pd.factorize(ips, use_na_sentinel=True)
+    octets = pd.Series(uniques, dtype=object).astype(str).str.strip().str.extract(_IPV4_ADDRESS_RE)
+    octets = octets.apply(pd.to_numeric, errors='coerce').to_numpy(dtype=np.float64).reshape(-1, 4)
+
+    # Non-matching rows come back as NaN; octets above 255 are out of range
+    valid = (np.nan_to_num(octets, nan=256) <= 255).all(axis=1)
+    octets = np.nan_to_num(octets).astype(np.int64)
+    unique_values = (octets[:, 0] << 24) | (octets[:, 1] << 16) | (octets[:, 2] << 8) | octets[:, 3]
+    unique_values = np.where(valid, unique_values, -1)
+
+    # Append a slot for missing values so the -1 sentinel from factorize maps to "invalid"
+    unique_values = np.append(unique_values, -1)
+    return unique_values[codes]
+
+
+class IntervalSet:
+    """Sorted, merged set of inclusive integer ranges supporting vectorized membership tests"""
+
+    def __init__(self, ranges):
+        ranges = sorted(ranges)
+        merged = []
+        for start, end in ranges:
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = np.array([start for start, _ in merged], dtype=np.int64)
+        self.ends = np.array([end for _, end in merged], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.starts)
+
+    def contains(self, values):
+        """Return a boolean array marking which integer addresses fall inside any range"""
+        values = np.asarray(values, dtype=np.int64)
+        if not len(self.starts):
+            return np.zeros(values.shape, dtype=bool)
+        # The candidate range is the last one starting at or before each value
+        idx = np.searchsorted(self.starts, values, side='right') - 1
+        return (idx >= 0) & (values <= self.ends[np.maximum(idx, 0)]) & (values >= 0)
+
+
+class NetworkPolicyIndex:
+    """Index over a network policy's allowed and blocked rules"""
+
+    def __init__(self, allowed_ips, blocked_ips):
+        self.allowed_ips = list(allowed_ips)
+        self.blocked_ips = list(blocked_ips)
+        self.allowed = IntervalSet(parse_ipv4_rule(ip) for ip in self.allowed_ips)
+        self.blocked = IntervalSet(parse_ipv4_rule(ip) for ip in self.blocked_ips)
+
+    def classify(self, ips):
+        """Classify addresses as allowed, blocked, unmatched or invalid (blocked takes precedence)"""
+        values = ipv4_to_int(ips)
+        labels = np.full(values.shape, UNMATCHED, dtype=object)
+        labels[self.allowed.contains(values)] = ALLOWED
+        labels[self.blocked.contains(values)] = BLOCKED
+        labels[values < 0] = INVALID
+        return labels
+
+    def classify_ip(self, ip):
+        """Classify a single address"""
+        return self.classify([ip])[0]
+
+    def is_rejected(self, labels):
+        """Mark which classifications Snowflake would reject under this policy"""
+        labels = np.asarray(labels, dtype=object)
+        rejected = labels == BLOCKED
+        # Once an allowed list exists, anything outside of it is denied as well
+        if len(self.allowed):
+            rejected |= labels == UNMATCHED
+        return rejected
+
+
+def find_column(columns, candidates):
+    """Return the first of columns named like one of candidates (ignoring case and padding), else None"""
+    by_upper = {str(column).strip().upper(): column for column in columns}
+    for candidate in candidates:
+        if candidate.upper() in by_upper:
+            return by_upper[candidate.upper()]
+    return None
+
+
+@contextlib.contextmanager
+def open_text(file):
+    """Expose an uploaded (binary) file as text without closing the caller's file object"""
+    if isinstance(file, (bytes, bytearray)):
+        file = io.BytesIO(file)
+    if isinstance(file, io.TextIOBase):
+        yield file
+        return
+    text = io.TextIOWrapper(file, encoding='utf-8', errors='replace')
+    try:
+        yield text
+    finally:
+        # Detach so garbage collecting the wrapper leaves the upload open for the next rerun
+        text.detach()
+
+
+def iter_log_ip_chunks(file, chunk_size=500_000):
+    """Yield the client IPs in a log file as pandas Series, chunk by chunk
+
+    CSV exports with a recognizable IP column are read column-wise; any other text
+    file is treated as one entry per line and the first IPv4 address on each line is used.
+    """
+    with open_text(file) as text:
+        header = text.readline()
+        ip_column = find_column(next(csv.reader([header]), []), IP_COLUMN_CANDIDATES)
+        text.seek(0)
+
+        if ip_column is not None:
+            for chunk in pd.read_csv(text, usecols=[ip_column], dtype=str, chunksize=chunk_size):
+                yield chunk[ip_column]
+            return
+
+        while True:
+            lines = list(itertools.islice(text, chunk_size))
+            if not lines:
+                return
+            yield pd.Series(lines, dtype=object).str.extract(_IPV4_IN_TEXT_RE, expand=False)
+
+
+def classify_log(file, index, chunk_size=500_000):
+    """Classify every entry of a log file, returning hit counts per IP and classification"""
+    counts = []
+    for ips in iter_log_ip_chunks(file, chunk_size=chunk_size):
+        # Count hits per distinct address first; the classification only depends on the address
+        counts.append(ips.fillna('').str.strip().value_counts())
+        # Fold partial counts together periodically so memory stays bounded by distinct IPs
+        if len(counts) >= 8:
+            counts = [pd.concat(counts).groupby(level=0).sum()]
+
+    if not counts:
+        return pd.DataFrame({'ip': [], 'status': [], 'hits': []})
+    totals = pd.concat(counts).groupby(level=0).sum()
+    result = pd.DataFrame({
+        'ip': totals.index.to_numpy(dtype=object),
+        'status': index.classify(totals.index.to_numpy(dtype=object)),
+        'hits': totals.to_numpy(),
+    })
+    return result.sort_values('hits', ascending=False, ignore_index=True)
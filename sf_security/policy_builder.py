@@ -0,0 +1,223 @@
+import numpy as np
+import pandas as pd
+
+from sf_security.identifiers import identifier_problems, quote_identifiers
+from sf_security.network import find_column
+from sf_security.spec import MAX_SESSION_TIMEOUT, MIN_SESSION_TIMEOUT
+from sf_security.sql_script import scripting_block
+from sf_security.templates import CLIENT_TYPES, MFA_ENROLLMENT_OPTIONS, mfa_client_types_problem
+
+# Schema that holds the generated policies (created by the perimeter script)
+POLICY_SCHEMA = 'SECURITY_DB.SECURITY_SCHEMA'
+
+AUTHENTICATION_METHODS = ('ALL', 'PASSWORD', 'SAML', 'OAUTH', 'KEYPAIR', 'PROGRAMMATIC_ACCESS_TOKEN')
+
+# Column names accepted for the user name and user group in uploaded user lists
+USER_NAME_COLUMNS = ('NAME', 'USER_NAME', 'LOGIN_NAME')
+USER_GROUP_COLUMNS = ('USER_GROUP', 'TYPE')
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def default_authentication_policies():
+    """Starter authentication policies: interactive users and key-pair service accounts"""
+    return pd.DataFrame([
+        {'NAME': 'human_auth_policy', 'MFA_ENROLLMENT': 'REQUIRED',
+         'CLIENT_TYPES': 'SNOWFLAKE_UI, SNOWFLAKE_CLI', 'AUTHENTICATION_METHODS': 'PASSWORD, SAML'},
+        {'NAME': 'service_auth_policy', 'MFA_ENROLLMENT': 'OPTIONAL',
+         'CLIENT_TYPES': 'DRIVERS, SNOWFLAKE_CLI', 'AUTHENTICATION_METHODS': 'KEYPAIR'},
+    ])
+
+
+def default_session_policies():
+    """Starter session policies: a short timeout for people, a longer one for services"""
+    return pd.DataFrame([
+        {'NAME': 'human_session_policy', 'IDLE_TIMEOUT_MINS': 30, 'UI_IDLE_TIMEOUT_MINS': 30},
+        {'NAME': 'service_session_policy', 'IDLE_TIMEOUT_MINS': 240, 'UI_IDLE_TIMEOUT_MINS': 240},
+    ])
+
+
+def default_assignments():
+    """Starter assignments keyed on the TYPE column of SHOW USERS"""
+    return pd.DataFrame([
+        {'USER_GROUP': 'PERSON', 'AUTHENTICATION_POLICY': 'human_auth_policy', 'SESSION_POLICY': 'human_session_policy'},
+        {'USER_GROUP': 'SERVICE', 'AUTHENTICATION_POLICY': 'service_auth_policy', 'SESSION_POLICY': 'service_session_policy'},
+        {'USER_GROUP': 'LEGACY_SERVICE', 'AUTHENTICATION_POLICY': 'service_auth_policy', 'SESSION_POLICY': 'service_session_policy'},
+    ])
+
+
+def _split_list(value):
+    """Split a comma-separated cell (or list) into upper-cased items"""
+    if isinstance(value, (list, tuple)):
+        items = value
+    elif value is None or (isinstance(value, float) and np.isnan(value)):
+        items = []
+    else:
+        items = str(value).split(',')
+    return [str(item).strip().upper() for item in items if str(item).strip()]
+
+
+def _sql_list(items):
+    return ", ".join([f"'{item}'" for item in items])
+
+
+def _blank(value):
+    return value is None or (isinstance(value, float) and np.isnan(value)) or str(value).strip() == ''
+
+
+def validate_policies(auth_policies, session_policies, assignments):
+    """Return a list of problems with the policy definitions and assignments"""
+    errors = []
+    names = {}
+    for kind, frame in (('authentication', auth_policies), ('session', session_policies)):
+        name_problems = identifier_problems(frame['NAME'].tolist()).tolist()
+        for i, name in enumerate(frame['NAME']):
+            if name_problems[i]:
+                errors.append(f"{kind} policy row {i + 1}: policy name {name_problems[i]}")
+            elif str(name).upper() in names:
+                errors.append(f"{kind} policy row {i + 1}: name '{name}' is already used by another policy")
+            else:
+                names[str(name).upper()] = kind
+
+    for i, row in enumerate(auth_policies.itertuples(index=False)):
+        if row.MFA_ENROLLMENT not in MFA_ENROLLMENT_OPTIONS:
+            errors.append(f"authentication policy row {i + 1}: MFA_ENROLLMENT must be one of {', '.join(MFA_ENROLLMENT_OPTIONS)}")
+        client_types = _split_list(row.CLIENT_TYPES)
+        for client_type in client_types:
+            if client_type not in CLIENT_TYPES:
+                errors.append(f"authentication policy row {i + 1}: unknown client type '{client_type}'")
+        mfa_problem = mfa_client_types_problem(row.MFA_ENROLLMENT, client_types)
+        if mfa_problem:
+            errors.append(f"authentication policy row {i + 1}: {mfa_problem}")
+        for method in _split_list(row.AUTHENTICATION_METHODS):
+            if method not in AUTHENTICATION_METHODS:
+                errors.append(f"authentication policy row {i + 1}: unknown authentication method '{method}'")
+
+    for i, row in enumerate(session_policies.itertuples(index=False)):
+        for column in ('IDLE_TIMEOUT_MINS', 'UI_IDLE_TIMEOUT_MINS'):
+            value = getattr(row, column)
+            if _blank(value) or not MIN_SESSION_TIMEOUT <= float(value) <= MAX_SESSION_TIMEOUT:
+                errors.append(f"session policy row {i + 1}: {column} must be between "
+                              f"{MIN_SESSION_TIMEOUT} and {MAX_SESSION_TIMEOUT} minutes")
+
+    groups = set()
+    for i, row in enumerate(assignments.itertuples(index=False)):
+        if _blank(row.USER_GROUP):
+            errors.append(f"assignment row {i + 1}: USER_GROUP is required")
+        elif str(row.USER_GROUP).upper() in groups:
+            errors.append(f"assignment row {i + 1}: user group '{row.USER_GROUP}' is assigned more than once")
+        else:
+            groups.add(str(row.USER_GROUP).upper())
+        for column, kind in (('AUTHENTICATION_POLICY', 'authentication'), ('SESSION_POLICY', 'session')):
+            value = getattr(row, column)
+            if not _blank(value) and names.get(str(value).upper()) != kind:
+                errors.append(f"assignment row {i + 1}: '{value}' is not a defined {kind} policy")
+    return errors
+
+
+def render_policy_definitions(auth_policies, session_policies):
+    """Render CREATE statements for every authentication and session policy"""
+    blocks = []
+    for row in auth_policies.itertuples(index=False):
+        clauses = [f"  MFA_ENROLLMENT = {row.MFA_ENROLLMENT}"]
+        client_types = _split_list(row.CLIENT_TYPES)
+        if client_types:
+            clauses.append(f"  CLIENT_TYPES = ({_sql_list(client_types)})")
+        methods = _split_list(row.AUTHENTICATION_METHODS)
+        if methods:
+            clauses.append(f"  AUTHENTICATION_METHODS = ({_sql_list(methods)})")
+        blocks.append(
+            f"CREATE OR REPLACE AUTHENTICATION POLICY {POLICY_SCHEMA}.{row.NAME}\n" + "\n".join(clauses) + ";"
+        )
+    for row in session_policies.itertuples(index=False):
+        blocks.append(
+            f"CREATE OR REPLACE SESSION POLICY {POLICY_SCHEMA}.{row.NAME}\n"
+            f"    SESSION_IDLE_TIMEOUT_MINS = {int(row.IDLE_TIMEOUT_MINS)}\n"
+            f"    SESSION_UI_IDLE_TIMEOUT_MINS = {int(row.UI_IDLE_TIMEOUT_MINS)};"
+        )
+    return "\n\n".join(blocks)
+
+
+def load_users(file, group_column=None):
+    """Read an uploaded user list (e.g. a SHOW USERS export) into USER_NAME and USER_GROUP columns"""
+    users = pd.read_csv(file, dtype=str)
+    name_column = find_column(users.columns, USER_NAME_COLUMNS)
+    group_column = group_column or find_column(users.columns, USER_GROUP_COLUMNS)
+    if name_column is None:
+        raise ValueError(f"User list needs one of these columns: {', '.join(USER_NAME_COLUMNS)}")
+    if group_column is None or group_column not in users.columns:
+        raise ValueError(f"User list needs one of these columns: {', '.join(USER_GROUP_COLUMNS)}")
+    return pd.DataFrame({
+        'USER_NAME': users[name_column].fillna('').str.strip(),
+        'USER_GROUP': users[group_column].fillna('').str.strip(),
+    })
+
+
+def assign_policies(users, assignments):
+    """Map each user to the policies of their group with a hash join on the user group
+
+    Returns the matched users (USER_NAME, USER_GROUP, AUTHENTICATION_POLICY, SESSION_POLICY)
+    and the users whose group has no assignment.
+    """
+    users = users[users['USER_NAME'] != ''].assign(GROUP_KEY=lambda df: df['USER_GROUP'].str.upper())
+    assignments = assignments.dropna(subset=['USER_GROUP']).assign(
+        GROUP_KEY=lambda df: df['USER_GROUP'].astype(str).str.strip().str.upper()
+    )[['GROUP_KEY', 'AUTHENTICATION_POLICY', 'SESSION_POLICY']]
+    merged = users.merge(assignments, on='GROUP_KEY', how='left', indicator=True)
+    matched = merged[merged['_merge'] == 'both'].drop(columns=['GROUP_KEY', '_merge'])
+    unmatched = merged[merged['_merge'] == 'left_only'][['USER_NAME', 'USER_GROUP']]
+    return matched.reset_index(drop=True), unmatched.reset_index(drop=True)
+
+
+def render_policy_assignments(assigned, batch_size=DEFAULT_BATCH_SIZE):
+    """Render ALTER USER statements grouped per policy into batches of at most batch_size users
+
+    Each batch is one scripting block, so it runs in a single round trip.
+    """
+    sections = []
+    # User names are always quoted so they match exactly as exported
+    quoted_users = quote_identifiers(assigned['USER_NAME'], always=True)
+    for column, clause in (('AUTHENTICATION_POLICY', 'AUTHENTICATION POLICY'), ('SESSION_POLICY', 'SESSION POLICY')):
+        has_policy = assigned[column].notna() & (assigned[column].astype(str).str.strip() != '')
+        policies = assigned.loc[has_policy, column].astype(str).str.strip()
+        statements = (
+            "ALTER USER " + quoted_users[has_policy] + f" SET {clause} {POLICY_SCHEMA}." + policies
+        )
+        frame = pd.DataFrame({'POLICY': policies, 'STATEMENT': statements}).sort_values('POLICY', kind='stable')
+        for policy, group in frame.groupby('POLICY', sort=True):
+            batch_numbers = np.arange(len(group)) // batch_size
+            batch_count = int(batch_numbers[-1]) + 1
+            for batch_number, batch in group.groupby(batch_numbers):
+                batch_statements = batch['STATEMENT'].tolist()
+                # A quoted user name could contain $$, which would end the block early
+                if len(batch_statements) > 1 and not any('$$' in sql for sql in batch_statements):
+                    body = scripting_block(batch_statements)
+                else:
+                    body = "\n".join(f"{sql};" for sql in batch_statements)
+                sections.append(
+                    f"-- {clause.title()}: {policy} (batch {batch_number + 1} of {batch_count}, "
+                    f"{len(batch)} user(s))\n" + body
+                )
+    return "\n\n".join(sections)
+
+
+def render_policy_builder_sql(auth_policies, session_policies, assigned, batch_size=DEFAULT_BATCH_SIZE):
+    """Render the full policy builder script: policy definitions followed by batched assignments"""
+    return f"""-- ============================================================================
+-- 1. AUTHENTICATION AND SESSION POLICIES
+-- ============================================================================
+USE ROLE SECURITYADMIN;
+
+{render_policy_definitions(auth_policies, session_policies)}
+
+
+-- ============================================================================
+-- 2. ASSIGN POLICIES TO USERS
+-- ============================================================================
+-- {len(assigned):,} user(s), in batches of up to {batch_size:,} statements per policy, one round trip per batch
+-- A user can only have one policy of each kind; unset an existing one first:
+-- ALTER USER <username> UNSET AUTHENTICATION POLICY;
+-- ALTER USER <username> UNSET SESSION POLICY;
+
+{render_policy_assignments(assigned, batch_size=batch_size)}
+"""
@@ -0,0 +1,129 @@
+from collections import Counter
+
+import streamlit as st
+
+from sf_security.identifiers import check_perimeter_names, check_rbac_names
+from sf_security.templates import (
+    DEFAULT_CLIENT_TYPES, FUNCTIONAL_ROLES, PERIMETER_PREP_SQL, mfa_client_types_problem, render_apply_policies_sql,
+    render_auth_policy_sql, render_network_rules_sql, render_rbac_sql, render_security_link_sql,
+    render_session_policy_sql
+)
+
+# Session state key holding the project shared by the pages
+PROJECT_KEY = 'project'
+
+# Configuration fields and the values a new project starts from
+DEFAULT_FIELDS = {
+    # Perimeter Setup
+    'company_name': "",
+    'allowed_ips': ["192.0.0.1/24"],
+    'blocked_ips': ["184.0.23.212"],
+    'session_timeout': 30,
+    'mfa_enrollment': "REQUIRED",
+    'client_types': list(DEFAULT_CLIENT_TYPES),
+    # RBAC Setup
+    'database_name': "",
+    'schema_name': "",
+    'functional_roles': list(FUNCTIONAL_ROLES),
+}
+
+
+def _freeze(value):
+    """A hashable snapshot of a field value, so later edits to a list don't touch the cache key"""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class Project:
+    """Configuration shared by the Perimeter and RBAC pages, and the artifacts built from it
+
+    Each artifact is cached under the values of the fields it is built from, so updating
+    one field only rebuilds the artifacts that depend on it.
+    """
+
+    def __init__(self, **fields):
+        unknown = set(fields) - set(DEFAULT_FIELDS)
+        if unknown:
+            raise KeyError(f"unknown project fields: {', '.join(sorted(unknown))}")
+        self.fields = {name: _freeze(value) for name, value in {**DEFAULT_FIELDS, **fields}.items()}
+        self.build_counts = Counter()
+        self._artifacts = {}
+
+    def update(self, **fields):
+        """Set fields from the page inputs; returns the names of the fields that changed"""
+        changed = []
+        for name, value in fields.items():
+            if name not in self.fields:
+                raise KeyError(f"unknown project field: {name}")
+            value = _freeze(value)
+            if self.fields[name] != value:
+                self.fields[name] = value
+                changed.append(name)
+        return changed
+
+    def artifact(self, name, depends_on, build):
+        """Return artifact name, calling build(*values of depends_on) only if one of those values changed"""
+        key = tuple(self.fields[field] for field in depends_on)
+        cached = self._artifacts.get(name)
+        if cached is None or cached[0] != key:
+            cached = (key, build(*key))
+            self._artifacts[name] = cached
+            self.build_counts[name] += 1
+        return cached[1]
+
+    def perimeter_ready(self):
+        """Whether the perimeter fields are complete and valid"""
+        company_name = self.fields['company_name']
+        return (bool(company_name) and not check_perimeter_names(company_name)
+                and not mfa_client_types_problem(self.fields['mfa_enrollment'], self.fields['client_types']))
+
+    def rbac_ready(self):
+        """Whether the RBAC fields are complete and valid"""
+        database_name = self.fields['database_name']
+        schema_name = self.fields['schema_name']
+        return (bool(database_name and schema_name and self.fields['functional_roles'])
+                and not check_rbac_names(database_name, schema_name))
+
+    def perimeter_sql(self):
+        """The perimeter setup script, assembled from one cached fragment per section"""
+        return (
+            PERIMETER_PREP_SQL
+            + self.artifact('network_rules_sql', ('company_name', 'allowed_ips', 'blocked_ips'),
+                            render_network_rules_sql)
+            + self.artifact('session_policy_sql', ('session_timeout',), render_session_policy_sql)
+            + self.artifact('auth_policy_sql', ('mfa_enrollment', 'client_types'), render_auth_policy_sql)
+            + self.artifact('apply_policies_sql', ('company_name',), render_apply_policies_sql)
+        )
+
+    def rbac_sql(self):
+        """The RBAC setup script for the project's database"""
+        return self.artifact('rbac_sql', ('database_name', 'schema_name', 'functional_roles'), render_rbac_sql)
+
+    def link_sql(self):
+        """Statements linking the SECURITY_DB.SECURITY_SCHEMA policies to the database's roles"""
+        return self.artifact(
+            'link_sql', ('company_name', 'database_name', 'allowed_ips', 'blocked_ips'),
+            lambda company_name, database_name, allowed_ips, blocked_ips: render_security_link_sql(
+                company_name, database_name, network_policy=bool(allowed_ips or blocked_ips)
+            )
+        )
+
+    def full_account_sql(self):
+        """The perimeter and RBAC scripts, plus the statements linking them, for whichever parts are ready"""
+        parts = []
+        if self.perimeter_ready():
+            parts.append(self.perimeter_sql())
+        if self.rbac_ready():
+            parts.append(self.rbac_sql())
+        if self.perimeter_ready() and self.rbac_ready():
+            parts.append(self.link_sql())
+        return "\n".join(parts)
+
+
+def get_project(state=None):
+    """The project kept in session state, created with the default fields on first use"""
+    state = st.session_state if state is None else state
+    if PROJECT_KEY not in state:
+        state[PROJECT_KEY] = Project()
+    return state[PROJECT_KEY]
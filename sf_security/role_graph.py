@@ -0,0 +1,473 @@
+import re
+
+import graphviz
+import numpy as np
+import pandas as pd
+
+from sf_security.login_replay import iter_export_chunks
+
+# Columns of SNOWFLAKE.ACCOUNT_USAGE.GRANTS_TO_ROLES exports
+GRANT_COLUMNS = ['PRIVILEGE', 'GRANTED_ON', 'NAME', 'GRANTED_TO', 'GRANTEE_NAME']
+GRANT_OPTIONAL_COLUMNS = ['TABLE_CATALOG', 'TABLE_SCHEMA', 'DELETED_ON']
+# Columns of SNOWFLAKE.ACCOUNT_USAGE.GRANTS_TO_USERS exports
+USER_GRANT_COLUMNS = ['ROLE', 'GRANTEE_NAME']
+
+# Node kinds that hold privileges and can be granted to other roles
+ROLE_KINDS = ('ROLE', 'DATABASE_ROLE')
+# Roles every user holds implicitly, so they are never orphaned
+IMPLICIT_ROLES = ('PUBLIC',)
+
+# Object kinds whose names are qualified by database (and schema) in the export
+_DATABASE_OBJECTS_NOT_IN_SCHEMAS = ('SCHEMA', 'DATABASE_ROLE')
+_ACCOUNT_OBJECTS = ('ACCOUNT', 'DATABASE', 'ROLE', 'USER', 'WAREHOUSE', 'INTEGRATION')
+
+_TOKEN_SPLIT_RE = re.compile(r'[._$\s"]+')
+
+# Diagram colors per node kind, matching the RBAC Setup diagram
+_NODE_STYLES = {
+    'USER': {'fillcolor': '#48C9B0', 'color': '#117A65', 'shape': 'ellipse'},
+    'ROLE': {'fillcolor': '#5DADE2', 'color': '#21618C'},
+    'DATABASE_ROLE': {'fillcolor': '#9B59B6', 'color': '#6C3483'},
+    'DATABASE': {'fillcolor': '#7CC7E8', 'color': '#2980B9', 'shape': 'cylinder'},
+}
+_OBJECT_STYLE = {'fillcolor': '#F39C12', 'color': '#D68910'}
+
+
+def _qualified_names(grants):
+    """Object names qualified by their database and schema, unless the name is already qualified"""
+    names = grants['NAME'].astype(str)
+    kinds = grants['GRANTED_ON']
+    if 'TABLE_CATALOG' not in grants:
+        return names
+    catalog = grants['TABLE_CATALOG']
+    schema = grants['TABLE_SCHEMA'] if 'TABLE_SCHEMA' in grants else pd.Series(np.nan, index=grants.index)
+    unqualified = ~names.str.contains('.', regex=False) & ~kinds.isin(_ACCOUNT_OBJECTS)
+    in_schema = unqualified & schema.notna() & ~kinds.isin(_DATABASE_OBJECTS_NOT_IN_SCHEMAS)
+    in_database = unqualified & catalog.notna() & ~in_schema
+    names = names.copy()
+    names[in_schema] = catalog[in_schema] + '.' + schema[in_schema] + '.' + names[in_schema]
+    names[in_database] = catalog[in_database] + '.' + names[in_database]
+    return names
+
+
+def normalize_grants(frame):
+    """Bring a GRANTS_TO_ROLES or GRANTS_TO_USERS export into the GRANTS_TO_ROLES layout
+
+    Returns a DataFrame with PRIVILEGE, GRANTED_ON, NAME, GRANTED_TO and GRANTEE_NAME; a
+    role granted to a user or role becomes a USAGE grant on that role. Revoked grants
+    (with DELETED_ON set) and repeated rows are dropped.
+    """
+    frame = frame.rename(columns={column: str(column).strip().upper() for column in frame.columns})
+    if 'DELETED_ON' in frame:
+        frame = frame[frame['DELETED_ON'].isna() | (frame['DELETED_ON'].astype(str).str.strip() == '')]
+    if 'PRIVILEGE' not in frame and 'ROLE' in frame:
+        frame = pd.DataFrame({
+            'PRIVILEGE': 'USAGE',
+            'GRANTED_ON': 'ROLE',
+            'NAME': frame['ROLE'],
+            'GRANTED_TO': frame['GRANTED_TO'] if 'GRANTED_TO' in frame else 'USER',
+            'GRANTEE_NAME': frame['GRANTEE_NAME'],
+        })
+    missing = [column for column in GRANT_COLUMNS if column not in frame]
+    if missing:
+        raise ValueError(f"Export is missing required column(s): {', '.join(missing)}")
+    frame = frame.dropna(subset=GRANT_COLUMNS)
+    frame = frame.assign(
+        GRANTED_ON=frame['GRANTED_ON'].astype(str).str.upper().str.replace(' ', '_', regex=False)
+    )
+    grants = pd.DataFrame({
+        'PRIVILEGE': frame['PRIVILEGE'].astype(str).str.upper(),
+        'GRANTED_ON': frame['GRANTED_ON'],
+        'NAME': _qualified_names(frame),
+        'GRANTED_TO': frame['GRANTED_TO'].astype(str).str.upper().str.replace(' ', '_', regex=False),
+        'GRANTEE_NAME': frame['GRANTEE_NAME'].astype(str),
+    })
+    return grants.drop_duplicates(ignore_index=True)
+
+
+def load_grants(file, file_name=None, chunk_size=1_000_000):
+    """Read a GRANTS_TO_ROLES or GRANTS_TO_USERS export (CSV or Parquet) into the GRANTS_TO_ROLES layout"""
+    try:
+        chunks = list(iter_export_chunks(file, GRANT_COLUMNS, file_name=file_name, chunk_size=chunk_size,
+                                         optional_columns=GRANT_OPTIONAL_COLUMNS))
+    except ValueError:
+        if hasattr(file, 'seek'):
+            file.seek(0)
+        chunks = list(iter_export_chunks(file, USER_GRANT_COLUMNS, file_name=file_name, chunk_size=chunk_size,
+                                         optional_columns=['GRANTED_TO', 'DELETED_ON']))
+    return normalize_grants(pd.concat(chunks, ignore_index=True))
+
+
+def synthetic_grants(users=2_000, roles=20_000, databases=50, tables_per_database=2_000, grants=1_000_000, seed=0):
+    """Generate a made-up account's grant inventory, for trying the explorer without an export
+
+    Roles form a hierarchy (each granted to an earlier role); a few are left ungranted so
+    there are orphans to find. Users hold one to three roles, and the remaining grants are
+    table privileges spread over the roles.
+    """
+    rng = np.random.default_rng(seed)
+    role_names = np.array([f"ROLE_{i}" for i in range(roles)], dtype=object)
+    user_names = np.array([f"USER_{i}" for i in range(users)], dtype=object)
+
+    # Role hierarchy: role i is granted to a random earlier role, except roughly 1% left ungranted
+    children = np.arange(1, roles)
+    children = children[rng.random(children.size) > 0.01]
+    parents = (rng.random(children.size) * children).astype(int)
+    hierarchy = pd.DataFrame({
+        'PRIVILEGE': 'USAGE', 'GRANTED_ON': 'ROLE', 'NAME': role_names[children],
+        'GRANTED_TO': 'ROLE', 'GRANTEE_NAME': role_names[parents],
+    })
+
+    user_roles = rng.integers(1, 4, size=users)
+    holders = np.repeat(np.arange(users), user_roles)
+    # Users mostly hold the top of the hierarchy, so most roles are reachable
+    held = (rng.random(holders.size) ** 3 * roles).astype(int)
+    memberships = pd.DataFrame({
+        'PRIVILEGE': 'USAGE', 'GRANTED_ON': 'ROLE', 'NAME': role_names[held],
+        'GRANTED_TO': 'USER', 'GRANTEE_NAME': user_names[holders],
+    })
+
+    remaining = max(0, grants - len(hierarchy) - len(memberships))
+    table_ids = rng.integers(0, databases * tables_per_database, size=remaining)
+    database_ids = table_ids // tables_per_database
+    table_names = pd.Series(
+        np.char.add(np.char.add('DB_', database_ids.astype(str)), '.PUBLIC.TABLE_')
+    ).str.cat(pd.Series(table_ids % tables_per_database).astype(str))
+    table_grants = pd.DataFrame({
+        'PRIVILEGE': np.array(['SELECT', 'INSERT', 'UPDATE', 'DELETE'], dtype=object)[rng.integers(0, 4, remaining)],
+        'GRANTED_ON': 'TABLE', 'NAME': table_names,
+        'GRANTED_TO': 'ROLE', 'GRANTEE_NAME': role_names[rng.integers(0, roles, remaining)],
+    })
+    return pd.concat([hierarchy, memberships, table_grants], ignore_index=True).drop_duplicates(ignore_index=True)
+
+
+def _csr(keys, count):
+    """Offsets and order grouping the positions of keys (node ids) by key"""
+    order = np.argsort(keys, kind='stable')
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=count), out=offsets[1:])
+    return offsets, order
+
+
+def _gather(offsets, order, nodes):
+    """Positions grouped under each of nodes, with the node each position came from"""
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=nodes.dtype)
+    shifts = np.repeat(starts - (np.cumsum(counts) - counts), counts)
+    return order[shifts + np.arange(total)], np.repeat(nodes, counts)
+
+
+class RoleGraph:
+    """In-memory graph of an account's grants, with a search index over its names
+
+    Nodes are users, roles, database roles, and the objects privileges are granted on;
+    each grant is an edge from the grantee to the role or object it was granted on. A role
+    granted to a user or role (USAGE on the role) is an inheritance edge. grants are in the
+    layout returned by load_grants (see normalize_grants).
+    """
+
+    def __init__(self, grants):
+        source_keys = grants['GRANTED_TO'] + ':' + grants['GRANTEE_NAME']
+        target_keys = grants['GRANTED_ON'] + ':' + grants['NAME']
+        codes, keys = pd.factorize(pd.concat([source_keys, target_keys], ignore_index=True))
+        node_count = len(keys)
+        self.source = codes[:len(grants)].astype(np.int64)
+        self.target = codes[len(grants):].astype(np.int64)
+        self.privilege_codes, self.privileges = pd.factorize(grants['PRIVILEGE'])
+
+        split = pd.Series(keys, dtype=object).str.split(':', n=1, expand=True)
+        self.kinds = split[0].to_numpy(dtype=object)
+        self.names = split[1].to_numpy(dtype=object)
+        self.inherits = (grants['PRIVILEGE'].eq('USAGE') & grants['GRANTED_ON'].isin(ROLE_KINDS)).to_numpy()
+
+        # Out and in edges per node; inheritance edges get their own index for BFS
+        self._out_offsets, self._out_order = _csr(self.source, node_count)
+        self._in_offsets, self._in_order = _csr(self.target, node_count)
+        member_edges = np.flatnonzero(self.inherits)
+        self._member_offsets, member_order = _csr(self.source[member_edges], node_count)
+        self._member_order = member_edges[member_order]
+
+        self._lower_names = pd.Series(self.names, dtype=object).str.lower()
+        self._name_order = np.argsort(self._lower_names.to_numpy(dtype=str), kind='stable')
+        self._sorted_names = self._lower_names.to_numpy(dtype=str)[self._name_order]
+        # Position of each node in name order, to sort nodes by name with integer keys
+        self._name_rank = np.empty(len(self.names), dtype=np.int64)
+        self._name_rank[self._name_order] = np.arange(len(self.names))
+        # Inverted index from each name token (e.g. "sales" in DB_SALES.RAW.ORDERS) to its nodes
+        tokens = self._lower_names.str.split(_TOKEN_SPLIT_RE.pattern, regex=True).explode()
+        tokens = tokens[tokens.str.len() > 0]
+        token_order = np.argsort(tokens.to_numpy(dtype=str), kind='stable')
+        self._sorted_tokens = tokens.to_numpy(dtype=str)[token_order]
+        self._token_nodes = tokens.index.to_numpy()[token_order]
+        self._trigram_index = None
+
+    def __len__(self):
+        return len(self.names)
+
+    @property
+    def grant_count(self):
+        return len(self.source)
+
+    def counts(self):
+        """Number of nodes of each kind"""
+        return pd.Series(self.kinds).value_counts()
+
+    def label(self, node):
+        return f"{self.names[node]} ({self.kinds[node]})"
+
+    def find(self, name, kind=None):
+        """Node id for an exact name (matched case-insensitively when no exact match exists), or None"""
+        matches = np.flatnonzero(self.names == name)
+        if matches.size == 0:
+            matches = self._prefix_range(self._sorted_names, self._name_order, name.lower(), exact=True)
+        if kind is not None:
+            matches = matches[self.kinds[matches] == kind]
+        return int(matches[0]) if matches.size else None
+
+    def _prefix_range(self, sorted_values, nodes, prefix, exact=False):
+        start = np.searchsorted(sorted_values, prefix, side='left')
+        end = np.searchsorted(sorted_values, prefix if exact else prefix + '\U0010ffff', side='right')
+        return np.sort(nodes[start:end])
+
+    def prefix_search(self, prefix, limit=20):
+        """Nodes whose name, or any token of it, starts with prefix; whole-name matches come first"""
+        prefix = prefix.strip().lower()
+        if not prefix:
+            return np.empty(0, dtype=np.int64)
+        by_name = self._prefix_range(self._sorted_names, self._name_order, prefix)
+        by_token = self._prefix_range(self._sorted_tokens, self._token_nodes, prefix)
+        matches = pd.unique(np.concatenate([by_name, by_token]))
+        return matches[:limit]
+
+    def _build_trigram_index(self):
+        padded = ("  " + self._lower_names + " ").tolist()
+        grams = [[name[i:i + 3] for i in range(len(name) - 2)] for name in padded]
+        counts = np.fromiter((len(g) for g in grams), dtype=np.int64, count=len(grams))
+        codes, vocabulary = pd.factorize(pd.Series([g for name_grams in grams for g in name_grams], dtype=object))
+        nodes = np.repeat(np.arange(len(grams)), counts)
+        offsets, order = _csr(codes, len(vocabulary))
+        lookup = pd.Index(vocabulary)
+        self._trigram_index = (lookup, offsets, nodes[order], counts)
+
+    def fuzzy_search(self, query, limit=20):
+        """Nodes ranked by the trigrams their name shares with query, tolerating typos and reordering"""
+        query = query.strip().lower()
+        if not query:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        if self._trigram_index is None:
+            self._build_trigram_index()
+        lookup, offsets, postings, gram_counts = self._trigram_index
+        padded = f"  {query} "
+        query_grams = list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+        codes = lookup.get_indexer(query_grams)
+        codes = codes[codes >= 0]
+        if codes.size == 0:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        candidates, _ = _gather(offsets, np.arange(len(postings)), codes)
+        shared = np.bincount(postings[candidates], minlength=len(self.names))
+        hits = np.flatnonzero(shared)
+        # Jaccard similarity of the trigram sets
+        scores = shared[hits] / (len(query_grams) + gram_counts[hits] - shared[hits])
+        top = np.argsort(-scores, kind='stable')[:limit]
+        return hits[top], scores[top]
+
+    def search(self, query, limit=20, kinds=None):
+        """Search names: prefix and token matches first, then fuzzy matches to fill up to limit
+
+        Returns a DataFrame with NODE, NAME, KIND, MATCH and SCORE columns.
+        """
+        prefix_hits = self.prefix_search(query, limit=limit * 5 if kinds else limit)
+        fuzzy_hits, fuzzy_scores = self.fuzzy_search(query, limit=limit * 5 if kinds else limit)
+        results = pd.DataFrame({
+            'NODE': np.concatenate([prefix_hits, fuzzy_hits]).astype(np.int64),
+            'MATCH': ['prefix'] * len(prefix_hits) + ['fuzzy'] * len(fuzzy_hits),
+            'SCORE': np.concatenate([np.ones(len(prefix_hits)), fuzzy_scores]),
+        }).drop_duplicates('NODE')
+        results.insert(1, 'NAME', self.names[results['NODE']])
+        results.insert(2, 'KIND', self.kinds[results['NODE']])
+        if kinds:
+            results = results[results['KIND'].isin(kinds)]
+        return results.head(limit).reset_index(drop=True)
+
+    def roles_with_privilege(self, privilege, object_kind=None):
+        """Grantees holding privilege directly, with the number of objects it covers (inverted index lookup)"""
+        code = self.privileges.get_indexer([privilege.upper()])[0]
+        if code < 0:
+            return pd.DataFrame({'GRANTEE': [], 'KIND': [], 'OBJECTS': []})
+        edges = np.flatnonzero(self.privilege_codes == code)
+        if object_kind is not None:
+            edges = edges[self.kinds[self.target[edges]] == object_kind]
+        grantees, objects = np.unique(self.source[edges], return_counts=True)
+        result = pd.DataFrame({'GRANTEE': self.names[grantees], 'KIND': self.kinds[grantees], 'OBJECTS': objects})
+        return result.sort_values(['OBJECTS', 'GRANTEE'], ascending=[False, True], ignore_index=True)
+
+    def _inherited_bfs(self, starts):
+        """Level-synchronous BFS along inheritance edges; returns the depth and parent edge of each node"""
+        depth = np.full(len(self.names), -1, dtype=np.int64)
+        parent_edge = np.full(len(self.names), -1, dtype=np.int64)
+        frontier = np.unique(np.asarray(starts, dtype=np.int64))
+        depth[frontier] = 0
+        level = 0
+        while frontier.size:
+            edges, _ = _gather(self._member_offsets, self._member_order, frontier)
+            targets = self.target[edges]
+            new = depth[targets] < 0
+            targets, first = np.unique(targets[new], return_index=True)
+            level += 1
+            depth[targets] = level
+            parent_edge[targets] = edges[new][first]
+            frontier = targets
+        return depth, parent_edge
+
+    def path(self, source, target):
+        """Shortest chain of grants through which source (a user or role) reaches target
+
+        Returns a DataFrame of steps (GRANTEE, GRANTED, PRIVILEGES), or None when target
+        is out of reach. Roles are followed through inheritance; the last step may be any
+        privilege on target.
+        """
+        depth, parent_edge = self._inherited_bfs([source])
+        if depth[target] >= 0:
+            last_node, last_edges = target, None
+        else:
+            # The last hop is a privilege held by the nearest reached grantee
+            incoming, _ = _gather(self._in_offsets, self._in_order, np.array([target]))
+            holders = self.source[incoming]
+            reached = depth[holders] >= 0
+            if not reached.any():
+                return None
+            holder = holders[reached][np.argmin(depth[holders[reached]])]
+            last_node, last_edges = holder, incoming[holders == holder]
+
+        steps = []
+        if last_edges is not None:
+            steps.append((last_node, target, last_edges))
+        node = last_node
+        while node != source:
+            edge = parent_edge[node]
+            steps.append((self.source[edge], node, np.array([edge])))
+            node = self.source[edge]
+        steps.reverse()
+        return pd.DataFrame({
+            'GRANTEE': [self.label(grantee) for grantee, _, _ in steps],
+            'GRANTED': [self.label(granted) for _, granted, _ in steps],
+            'PRIVILEGES': [", ".join(sorted(self.privileges[self.privilege_codes[edges]])) for _, _, edges in steps],
+        })
+
+    def orphaned_roles(self):
+        """Roles no user holds, directly or through other roles
+
+        Returns a DataFrame with ROLE, KIND, GRANTED_TO_ROLES (how many roles it is granted
+        to), PRIVILEGES (grants it holds on objects), and the REASON it is orphaned.
+        """
+        depth, _ = self._inherited_bfs(np.flatnonzero(self.kinds == 'USER'))
+        is_role = np.isin(self.kinds, ROLE_KINDS) & ~np.isin(self.names, IMPLICIT_ROLES)
+        orphans = np.flatnonzero(is_role & (depth < 0))
+        member_edges = np.flatnonzero(self.inherits)
+        granted_to = np.bincount(self.target[member_edges], minlength=len(self.names))
+        held = np.bincount(self.source[~self.inherits], minlength=len(self.names))
+        result = pd.DataFrame({
+            'ROLE': self.names[orphans],
+            'KIND': self.kinds[orphans],
+            'GRANTED_TO_ROLES': granted_to[orphans],
+            'PRIVILEGES': held[orphans],
+        })
+        result['REASON'] = np.where(result['GRANTED_TO_ROLES'] == 0, "not granted to any user or role",
+                                    "only granted to roles no user holds")
+        return result.sort_values(['GRANTED_TO_ROLES', 'ROLE'], kind='stable', ignore_index=True)
+
+    def neighborhood(self, node, depth=1, max_edges=60):
+        """Grants within depth hops of node (in either direction), capped at max_edges
+
+        Returns the edges as a DataFrame (SOURCE, TARGET, PRIVILEGES) and the left-out
+        grants as a DataFrame (NODE, DIRECTION, KIND, COUNT) so a diagram can summarize them.
+        Inheritance edges are kept before privileges on objects.
+        """
+        kept = []
+        kept_pairs = np.empty(0, dtype=np.int64)
+        omitted = []
+        seen = {node}
+        frontier = np.array([node], dtype=np.int64)
+        budget = max_edges
+        for _ in range(depth):
+            out_edges, out_from = _gather(self._out_offsets, self._out_order, frontier)
+            in_edges, in_from = _gather(self._in_offsets, self._in_order, frontier)
+            edges = np.concatenate([out_edges, in_edges])
+            anchors = np.concatenate([out_from, in_from])
+            others = np.concatenate([self.target[out_edges], self.source[in_edges]])
+            directions = np.array(['out'] * len(out_edges) + ['in'] * len(in_edges), dtype=object)
+            # Structural edges first, then by the other end's name (ignoring case) for a stable pick
+            order = np.lexsort((self._name_rank[others], ~self.inherits[edges]))
+            edges, anchors, others, directions = edges[order], anchors[order], others[order], directions[order]
+            pairs = np.minimum(self.source[edges], self.target[edges]) * len(self.names) + np.maximum(
+                self.source[edges], self.target[edges])
+            _, first = np.unique(pairs, return_index=True)
+            # Pairs kept at a previous hop (e.g. the edge back to node) are already drawn
+            first = np.sort(first[~np.isin(pairs[first], kept_pairs)])
+            take, drop = first[:budget], first[budget:]
+            budget -= len(take)
+            kept.append(edges[take])
+            kept_pairs = np.concatenate([kept_pairs, pairs[take]])
+            if len(drop):
+                omitted.append(pd.DataFrame({
+                    'NODE': anchors[drop], 'DIRECTION': directions[drop], 'KIND': self.kinds[others[drop]],
+                }))
+            frontier = np.setdiff1d(others[take], np.fromiter(seen, dtype=np.int64))
+            seen.update(frontier.tolist())
+            if budget <= 0 or frontier.size == 0:
+                break
+
+        kept = np.concatenate(kept) if kept else np.empty(0, dtype=np.int64)
+        # Every grant between the kept pairs, so all privileges are listed on one edge
+        pair_keys = pd.MultiIndex.from_arrays([self.source[kept], self.target[kept]]).unique()
+        all_edges, _ = _gather(self._out_offsets, self._out_order, np.unique(self.source[kept]))
+        all_edges = all_edges[pd.MultiIndex.from_arrays(
+            [self.source[all_edges], self.target[all_edges]]).isin(pair_keys)]
+        edges = pd.DataFrame({
+            'SOURCE': self.source[all_edges],
+            'TARGET': self.target[all_edges],
+            'PRIVILEGE': self.privileges[self.privilege_codes[all_edges]],
+        }).groupby(['SOURCE', 'TARGET'], as_index=False, sort=False).agg(
+            PRIVILEGES=('PRIVILEGE', lambda values: ", ".join(sorted(values)))
+        )
+        if omitted:
+            omitted = pd.concat(omitted, ignore_index=True).groupby(
+                ['NODE', 'DIRECTION', 'KIND'], as_index=False).size().rename(columns={'size': 'COUNT'})
+        else:
+            omitted = pd.DataFrame({'NODE': [], 'DIRECTION': [], 'KIND': [], 'COUNT': []})
+        return edges, omitted
+
+    def neighborhood_dot(self, node, depth=1, max_edges=60, neighborhood=None):
+        """Graphviz diagram of the grants around node; left-out grants appear as summary nodes
+
+        neighborhood is the (edges, omitted) result of neighborhood() when already computed.
+        """
+        if neighborhood is None:
+            neighborhood = self.neighborhood(node, depth=depth, max_edges=max_edges)
+        edges, omitted = neighborhood
+        dot = graphviz.Digraph(comment=f'Neighborhood of {self.names[node]}')
+        dot.attr(rankdir='LR', nodesep='0.3', ranksep='0.8')
+        dot.attr('node', shape='box', style='rounded,filled', fontname='Arial', fontsize='10', fontcolor='white')
+        dot.attr('edge', fontname='Arial', fontsize='8', color='#7F8C8D')
+
+        nodes = pd.unique(np.concatenate([[node], edges['SOURCE'].to_numpy(), edges['TARGET'].to_numpy()]))
+        for other in nodes:
+            style = _NODE_STYLES.get(self.kinds[other], _OBJECT_STYLE)
+            attributes = dict(style, penwidth='3' if other == node else '1')
+            dot.node(f'N{other}', f"{self.names[other]}\n{self.kinds[other].lower()}", **attributes)
+        for row in edges.itertuples(index=False):
+            inherited = row.PRIVILEGES == 'USAGE' and self.kinds[row.TARGET] in ROLE_KINDS
+            dot.edge(f'N{row.SOURCE}', f'N{row.TARGET}', label='' if inherited else row.PRIVILEGES,
+                     style='solid' if inherited else 'dashed')
+        for index, row in enumerate(omitted.itertuples(index=False)):
+            summary = f'MORE{index}'
+            dot.node(summary, f"+{int(row.COUNT):,} more {row.KIND.lower()}", shape='note',
+                     fillcolor='#ECF0F1', color='#95A5A6', fontcolor='#2C3E50')
+            if row.DIRECTION == 'out':
+                dot.edge(f'N{row.NODE}', summary, style='dotted')
+            else:
+                dot.edge(summary, f'N{row.NODE}', style='dotted')
+        return dot
@@ -0,0 +1,138 @@
+import pandas as pd
+import streamlit as st
+
+from sf_security.executor import RecordingSession, ScriptExecutor, build_plan, snowpark_session_factory
+from sf_security.sql_optimize import DEFAULT_BATCH_SIZE, optimize_script
+
+
+def _connection_parameters():
+    """Snowflake connection from .streamlit/secrets.toml ([connections.snowflake]), if configured"""
+    try:
+        return dict(st.secrets['connections']['snowflake'])
+    except (KeyError, FileNotFoundError):
+        return None
+
+
+@st.cache_data(show_spinner=False)
+def _optimize(sql_script, batch_size):
+    return optimize_script(sql_script, batch_size=batch_size)
+
+
+def recorded_log(log):
+    """Table of a dry run's recorded (session, statement) log, numbering sessions by first use"""
+    session_numbers = {}
+    return pd.DataFrame([{
+        'ORDER': order + 1,
+        'SESSION': session_numbers.setdefault(session, len(session_numbers) + 1),
+        'STATEMENT': sql,
+    } for order, (session, sql) in enumerate(log)], columns=['ORDER', 'SESSION', 'STATEMENT'])
+
+
+def render_optimize_options(sql_script, key):
+    """Checkbox to coalesce, deduplicate, and group the script by role; returns the script to show"""
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        optimize = st.checkbox(
+            "⚡ Optimize statements",
+            help="Merge grants on the same object, drop repeated statements, and group statements by role "
+                 "so the script needs fewer statements and USE ROLE switches",
+            key=f"{key}_enabled"
+        )
+    if not optimize:
+        return sql_script
+    with col2:
+        batch_size = st.number_input(
+            "Statements per batch",
+            min_value=1, max_value=1000, value=DEFAULT_BATCH_SIZE,
+            help="Statements sharing a role are sent as one EXECUTE IMMEDIATE block (one round trip); "
+                 "1 keeps every statement separate",
+            key=f"{key}_batch_size"
+        )
+    optimized, before, after = _optimize(sql_script, int(batch_size))
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Statements", f"{after.statements:,}", delta=after.statements - before.statements, delta_color="inverse")
+    col2.metric("Role switches", f"{after.role_switches:,}", delta=after.role_switches - before.role_switches,
+                delta_color="inverse")
+    col3.metric("Round trips", f"{after.round_trips:,}", delta=after.round_trips - before.round_trips,
+                delta_color="inverse")
+    return optimized
+
+
+def render_run_panel(sql_script, key):
+    """Expander that runs a generated script against Snowflake, or records it in a dry run"""
+    with st.expander("▶️ Run in Snowflake"):
+        plan = build_plan(sql_script)
+        waves = plan.levels()
+        st.markdown(
+            f"The script has **{len(plan.statements):,}** statements in **{len(waves):,}** dependency "
+            f"levels; statements in the same level run concurrently."
+        )
+
+        connection_parameters = _connection_parameters()
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            dry_run = st.checkbox(
+                "Dry run",
+                value=True,
+                help="Record the statements in execution order without connecting to Snowflake",
+                key=f"{key}_dry_run"
+            )
+        with col2:
+            max_sessions = st.number_input(
+                "Sessions", min_value=1, max_value=8, value=4,
+                help="Statements run over a pool of this many sessions",
+                key=f"{key}_max_sessions"
+            )
+        with col3:
+            retries = st.number_input(
+                "Retries", min_value=0, max_value=5, value=2,
+                help="Times a failing statement is retried before its dependents are skipped",
+                key=f"{key}_retries"
+            )
+
+        if not dry_run and connection_parameters is None:
+            st.info("No [connections.snowflake] secret found; the active Snowflake session is used, "
+                    "so statements run one at a time.")
+
+        if st.button("▶️ Run script", key=f"{key}_run"):
+            if dry_run:
+                log = []
+                factory, pool_size, close_sessions = (lambda: RecordingSession(log)), int(max_sessions), True
+            else:
+                try:
+                    factory, pool_size, close_sessions = snowpark_session_factory(connection_parameters)
+                except Exception as e:
+                    st.error(f"❌ Could not connect to Snowflake: {e}")
+                    return
+                pool_size = min(int(max_sessions), pool_size or int(max_sessions))
+
+            executor = ScriptExecutor(factory, max_sessions=pool_size, retries=int(retries),
+                                      retry_delay=0.0 if dry_run else 1.0, close_sessions=close_sessions)
+            # Streamlit calls aren't made from the worker threads, so only a spinner is shown while running
+            with st.spinner(f"Running {len(plan.statements):,} statements..."):
+                results = executor.run(plan)
+
+            frame = pd.DataFrame([{
+                'STEP': result.index + 1,
+                'STATUS': result.status,
+                'SESSION': result.session + 1 if result.session >= 0 else None,
+                'ATTEMPTS': result.attempts,
+                'SECONDS': round(result.elapsed, 3),
+                'STATEMENT': result.sql.splitlines()[0],
+                'ERROR': result.error,
+            } for result in results])
+            counts = frame['STATUS'].value_counts()
+            col1, col2, col3 = st.columns(3)
+            col1.metric("Succeeded", f"{counts.get('succeeded', 0):,}")
+            col2.metric("Failed", f"{counts.get('failed', 0):,}")
+            col3.metric("Skipped", f"{counts.get('skipped', 0):,}")
+            if counts.get('failed', 0):
+                st.error("❌ Some statements failed; statements depending on them were skipped.")
+            elif dry_run:
+                st.success("✅ Dry run complete. No statements were sent to Snowflake.")
+            else:
+                st.success("✅ Script executed successfully.")
+            st.dataframe(frame, hide_index=True)
+            if dry_run:
+                st.markdown("**Recorded execution order** (including each session's `USE` context switches)")
+                st.dataframe(recorded_log(log), hide_index=True)
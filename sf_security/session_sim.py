@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+
+from sf_security.login_replay import iter_export_chunks
+
+# Column names in SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY exports
+USER_COLUMN = 'USER_NAME'
+SESSION_COLUMN = 'SESSION_ID'
+START_COLUMN = 'START_TIME'
+END_COLUMN = 'END_TIME'
+
+# Range accepted by SESSION_IDLE_TIMEOUT_MINS
+MIN_TIMEOUT_MINS = 5
+MAX_TIMEOUT_MINS = 480
+
+
+def load_idle_gaps(file, file_name=None, chunk_size=1_000_000):
+    """Read a query history export and compute the idle gaps between consecutive activity
+
+    Activity is grouped per session when a SESSION_ID column is present, otherwise per
+    user. Returns a DataFrame with USER_NAME, SESSION_KEY and GAP_MINS columns.
+    """
+    chunks = iter_export_chunks(
+        file, [USER_COLUMN, START_COLUMN], file_name=file_name, chunk_size=chunk_size,
+        optional_columns=[SESSION_COLUMN, END_COLUMN]
+    )
+    activity = pd.concat(list(chunks), ignore_index=True)
+    return idle_gaps(activity)
+
+
+def idle_gaps(activity):
+    """Compute idle gaps (in minutes) between consecutive activity within each session"""
+    frame = pd.DataFrame({
+        USER_COLUMN: activity[USER_COLUMN].fillna('').astype(str),
+        'START': pd.to_datetime(activity[START_COLUMN], errors='coerce', format='mixed', utc=True),
+    })
+    if SESSION_COLUMN in activity:
+        frame['SESSION_KEY'] = activity[SESSION_COLUMN].astype(str)
+    else:
+        frame['SESSION_KEY'] = frame[USER_COLUMN]
+    if END_COLUMN in activity:
+        frame['END'] = pd.to_datetime(activity[END_COLUMN], errors='coerce', format='mixed', utc=True)
+        frame['END'] = frame['END'].fillna(frame['START'])
+    else:
+        frame['END'] = frame['START']
+
+    frame = frame.dropna(subset=['START']).sort_values(['SESSION_KEY', 'START'], kind='stable')
+    # Overlapping queries keep a session busy, so idle time starts at the latest end seen so far
+    busy_until = frame.groupby('SESSION_KEY', sort=False)['END'].cummax()
+    previous_end = busy_until.groupby(frame['SESSION_KEY'], sort=False).shift()
+    gap_mins = (frame['START'] - previous_end).dt.total_seconds() / 60
+
+    gaps = pd.DataFrame({
+        USER_COLUMN: frame[USER_COLUMN],
+        'SESSION_KEY': frame['SESSION_KEY'],
+        'GAP_MINS': gap_mins.clip(lower=0),
+    })
+    return gaps.dropna(subset=['GAP_MINS']).reset_index(drop=True)
+
+
+def simulate_timeouts(gaps, timeouts=None):
+    """Sweep idle timeouts in a single pass over the sorted idle gaps
+
+    Every gap longer than the timeout ends the session and forces the user to
+    re-authenticate. Counts for all candidate timeouts come from binary searches
+    into the sorted gaps (and sorted per-session maximum gaps), not rescans.
+    """
+    if timeouts is None:
+        timeouts = np.arange(MIN_TIMEOUT_MINS, MAX_TIMEOUT_MINS + 1)
+    timeouts = np.asarray(timeouts, dtype=np.float64)
+
+    sorted_gaps = np.sort(gaps['GAP_MINS'].to_numpy(dtype=np.float64))
+    longest_per_session = np.sort(gaps.groupby('SESSION_KEY', sort=False)['GAP_MINS'].max().to_numpy())
+    user_count = max(gaps[USER_COLUMN].nunique(), 1)
+
+    reauthentications = len(sorted_gaps) - np.searchsorted(sorted_gaps, timeouts, side='right')
+    sessions_ended = len(longest_per_session) - np.searchsorted(longest_per_session, timeouts, side='right')
+    return pd.DataFrame({
+        'TIMEOUT_MINS': timeouts.astype(np.int64),
+        'SESSIONS_ENDED': sessions_ended,
+        'REAUTHENTICATIONS': reauthentications,
+        'REAUTHS_PER_USER': np.round(reauthentications / user_count, 2),
+    })
+
+
+def reauthentications_by_user(gaps, timeout):
+    """Count the re-authentications a single timeout would force on each user"""
+    forced = gaps[gaps['GAP_MINS'] > timeout]
+    counts = forced[USER_COLUMN].value_counts().rename_axis(USER_COLUMN).reset_index(name='REAUTHENTICATIONS')
+    return counts
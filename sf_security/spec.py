@@ -0,0 +1,302 @@
+import json
+import re
+
+import yaml
+
+from sf_security.identifiers import (
+    PERIMETER_DERIVED_NAMES, RBAC_DATABASE_DERIVED_NAMES, derived_name_problems, identifier_problem,
+    identifier_problems
+)
+from sf_security.network import parse_ip_list, parse_ipv4_rule
+from sf_security.templates import (
+    CLIENT_TYPES, DEFAULT_CLIENT_TYPES, FUNCTIONAL_ROLES, MFA_ENROLLMENT_OPTIONS,
+    render_perimeter_sql, render_rbac_sql
+)
+
+SPEC_VERSION = 1
+DEFAULT_SESSION_TIMEOUT = 30
+MIN_SESSION_TIMEOUT = 5
+MAX_SESSION_TIMEOUT = 480
+
+# The libyaml-backed loader is an order of magnitude faster when it is available
+_YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+_YAML_DUMPER = getattr(yaml, 'CSafeDumper', yaml.SafeDumper)
+
+# Fast pre-check for IPv4 rules; only entries failing it are re-parsed for a precise message
+_OCTET = r'(?:25[0-5]|2[0-4]\d|1\d\d|[1-9]?\d)'
+_VALID_IPV4_RULE_RE = re.compile(rf'{_OCTET}\.{_OCTET}\.{_OCTET}\.{_OCTET}(?:/(?:3[0-2]|[12]?\d))?')
+_MAX_ERRORS = 50
+
+_PERIMETER_KEYS = ('company_name', 'allowed_ips', 'blocked_ips', 'session_timeout', 'mfa_enrollment', 'client_types')
+_DATABASE_KEYS = ('name', 'schema', 'functional_roles')
+
+
+class SpecError(ValueError):
+    """Raised when a spec can't be parsed or fails validation; errors lists every problem found"""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        super().__init__("\n".join(self.errors))
+
+
+class _ErrorCollector:
+    """Collect validation errors with the path of the offending value"""
+
+    def __init__(self):
+        self.errors = []
+
+    def add(self, path, message):
+        if len(self.errors) < _MAX_ERRORS:
+            self.errors.append(f"{path}: {message}")
+        elif len(self.errors) == _MAX_ERRORS:
+            self.errors.append("... further errors omitted")
+
+    def raise_if_any(self):
+        if self.errors:
+            raise SpecError(self.errors)
+
+
+def parse_spec(data, file_name=None):
+    """Parse a JSON or YAML spec document into Python objects"""
+    if isinstance(data, (bytes, bytearray)):
+        data = data.decode('utf-8-sig')
+    name = (file_name or '').lower()
+    is_json = name.endswith('.json') or (not name.endswith(('.yml', '.yaml')) and data.lstrip().startswith('{'))
+
+    if is_json:
+        try:
+            return json.loads(data)
+        except json.JSONDecodeError as e:
+            raise SpecError([f"line {e.lineno}, column {e.colno}: {e.msg}"])
+    try:
+        return yaml.load(data, Loader=_YAML_LOADER)
+    except yaml.YAMLError as e:
+        mark = getattr(e, 'problem_mark', None)
+        location = f"line {mark.line + 1}, column {mark.column + 1}: " if mark is not None else ""
+        raise SpecError([f"{location}{getattr(e, 'problem', None) or e}"])
+
+
+def _check_keys(section, allowed, path, errors):
+    for key in section:
+        if key not in allowed:
+            errors.add(f"{path}.{key}", f"unknown key (expected one of: {', '.join(allowed)})")
+
+
+def _check_identifier(value, problem, path, errors, derived_names=()):
+    """Record the (precomputed) identifier problem of value, or problems with names derived from it"""
+    if problem:
+        errors.add(path, problem)
+    else:
+        for message in derived_name_problems(value, derived_names):
+            errors.add(path, message)
+    return value if isinstance(value, str) and value else None
+
+
+def _check_string_list(value, path, errors):
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        errors.add(path, "must be a list")
+        return []
+    for i, item in enumerate(value):
+        if not isinstance(item, str):
+            errors.add(f"{path}[{i}]", "must be a string")
+    return [item.strip() for item in value if isinstance(item, str)]
+
+
+def _check_ip_list(value, path, errors):
+    # IP lists may also be given as one comma/newline separated string, like the page's text areas
+    if isinstance(value, str):
+        ips = parse_ip_list(value)
+    else:
+        ips = _check_string_list(value, path, errors)
+    match = _VALID_IPV4_RULE_RE.fullmatch
+    for i, ip in enumerate(ips):
+        if match(ip) is None:
+            try:
+                parse_ipv4_rule(ip)
+            except ValueError as e:
+                errors.add(f"{path}[{i}]", str(e))
+    return ips
+
+
+def _validate_perimeter(section, errors):
+    path = 'perimeter'
+    if not isinstance(section, dict):
+        errors.add(path, "must be a mapping")
+        return None
+    _check_keys(section, _PERIMETER_KEYS, path, errors)
+
+    company_name = section.get('company_name')
+    allowed_ips = _check_ip_list(section.get('allowed_ips'), f"{path}.allowed_ips", errors)
+    blocked_ips = _check_ip_list(section.get('blocked_ips'), f"{path}.blocked_ips", errors)
+
+    session_timeout = section.get('session_timeout', DEFAULT_SESSION_TIMEOUT)
+    if isinstance(session_timeout, bool) or not isinstance(session_timeout, int):
+        errors.add(f"{path}.session_timeout", "must be an integer number of minutes")
+    elif not MIN_SESSION_TIMEOUT <= session_timeout <= MAX_SESSION_TIMEOUT:
+        errors.add(f"{path}.session_timeout",
+                   f"must be between {MIN_SESSION_TIMEOUT} and {MAX_SESSION_TIMEOUT} minutes")
+
+    mfa_enrollment = section.get('mfa_enrollment', 'REQUIRED')
+    if mfa_enrollment not in MFA_ENROLLMENT_OPTIONS:
+        errors.add(f"{path}.mfa_enrollment", f"must be one of: {', '.join(MFA_ENROLLMENT_OPTIONS)}")
+
+    client_types = _check_string_list(section.get('client_types', list(DEFAULT_CLIENT_TYPES)),
+                                      f"{path}.client_types", errors)
+    for i, client_type in enumerate(client_types):
+        if client_type not in CLIENT_TYPES:
+            errors.add(f"{path}.client_types[{i}]", f"must be one of: {', '.join(CLIENT_TYPES)}")
+
+    return {
+        'company_name': _check_identifier(company_name, identifier_problem(company_name), f"{path}.company_name",
+                                          errors, PERIMETER_DERIVED_NAMES),
+        'allowed_ips': allowed_ips,
+        'blocked_ips': blocked_ips,
+        'session_timeout': session_timeout,
+        'mfa_enrollment': mfa_enrollment,
+        'client_types': client_types,
+    }
+
+
+def _validate_rbac(section, errors):
+    path = 'rbac'
+    if not isinstance(section, dict):
+        errors.add(path, "must be a mapping")
+        return None
+    _check_keys(section, ('databases',), path, errors)
+    databases = section.get('databases')
+    if not isinstance(databases, list):
+        errors.add(f"{path}.databases", "must be a list")
+        return None
+
+    # Names are validated in one vectorized pass; specs may describe thousands of databases
+    entries = [database if isinstance(database, dict) else {} for database in databases]
+    name_problems = identifier_problems([entry.get('name') for entry in entries]).tolist()
+    schema_problems = identifier_problems([entry.get('schema') for entry in entries]).tolist()
+
+    normalized = []
+    seen = {}
+    for i, database in enumerate(databases):
+        item_path = f"{path}.databases[{i}]"
+        if not isinstance(database, dict):
+            errors.add(item_path, "must be a mapping")
+            continue
+        _check_keys(database, _DATABASE_KEYS, item_path, errors)
+        name = _check_identifier(database.get('name'), name_problems[i], f"{item_path}.name", errors,
+                                 RBAC_DATABASE_DERIVED_NAMES)
+        schema = _check_identifier(database.get('schema'), schema_problems[i], f"{item_path}.schema", errors)
+        raw_roles = database.get('functional_roles', list(FUNCTIONAL_ROLES))
+        functional_roles = _check_string_list(raw_roles, f"{item_path}.functional_roles", errors)
+        # The RBAC script and page need at least one functional role
+        if raw_roles is None or raw_roles == []:
+            errors.add(f"{item_path}.functional_roles", f"must list at least one of: {', '.join(FUNCTIONAL_ROLES)}")
+        for j, role in enumerate(functional_roles):
+            if role not in FUNCTIONAL_ROLES:
+                errors.add(f"{item_path}.functional_roles[{j}]", f"must be one of: {', '.join(FUNCTIONAL_ROLES)}")
+        if name is not None:
+            # Snowflake resolves unquoted identifiers case-insensitively
+            if name.upper() in seen:
+                errors.add(f"{item_path}.name", f"duplicates rbac.databases[{seen[name.upper()]}]")
+            seen.setdefault(name.upper(), i)
+        normalized.append({'name': name, 'schema': schema, 'functional_roles': functional_roles})
+    return {'databases': normalized}
+
+
+def validate_spec(raw):
+    """Validate a parsed spec and return it normalized, raising SpecError with every problem found"""
+    errors = _ErrorCollector()
+    if not isinstance(raw, dict):
+        raise SpecError(["spec: must be a mapping with 'perimeter' and/or 'rbac' sections"])
+    _check_keys(raw, ('version', 'perimeter', 'rbac'), 'spec', errors)
+    version = raw.get('version', SPEC_VERSION)
+    if version != SPEC_VERSION:
+        errors.add('spec.version', f"unsupported version {version!r} (expected {SPEC_VERSION})")
+    if 'perimeter' not in raw and 'rbac' not in raw:
+        errors.add('spec', "must contain a 'perimeter' or 'rbac' section")
+
+    spec = {
+        'version': SPEC_VERSION,
+        'perimeter': _validate_perimeter(raw['perimeter'], errors) if 'perimeter' in raw else None,
+        'rbac': _validate_rbac(raw['rbac'], errors) if 'rbac' in raw else None,
+    }
+    errors.raise_if_any()
+    return spec
+
+
+def load_spec(data, file_name=None):
+    """Parse and validate a JSON or YAML spec"""
+    return validate_spec(parse_spec(data, file_name=file_name))
+
+
+class _LiteralString(str):
+    """String emitted as a YAML literal block"""
+
+
+class _SpecDumper(_YAML_DUMPER):
+    """YAML dumper that writes _LiteralString values as literal blocks"""
+
+
+def _represent_literal(dumper, value):
+    return dumper.represent_scalar('tag:yaml.org,2002:str', str(value), style='|')
+
+
+_SpecDumper.add_representer(_LiteralString, _represent_literal)
+
+
+def dump_spec(spec, fmt='yaml'):
+    """Serialize a spec as YAML or JSON, leaving out empty sections"""
+    document = {key: value for key, value in spec.items() if value is not None}
+    if fmt == 'json':
+        return json.dumps(document, indent=2) + "\n"
+    perimeter = document.get('perimeter')
+    if perimeter:
+        # One literal block per IP list keeps large lists fast to load (a single scalar each)
+        document['perimeter'] = dict(perimeter)
+        for key in ('allowed_ips', 'blocked_ips'):
+            if perimeter[key]:
+                document['perimeter'][key] = _LiteralString("\n".join(perimeter[key]) + "\n")
+    return yaml.dump(document, Dumper=_SpecDumper, sort_keys=False)
+
+
+def perimeter_section(company_name, allowed_ips, blocked_ips, session_timeout,
+                      mfa_enrollment='REQUIRED', client_types=DEFAULT_CLIENT_TYPES):
+    """Build the perimeter section of a spec from the page's configuration"""
+    return {
+        'company_name': company_name,
+        'allowed_ips': list(allowed_ips),
+        'blocked_ips': list(blocked_ips),
+        'session_timeout': int(session_timeout),
+        'mfa_enrollment': mfa_enrollment,
+        'client_types': list(client_types),
+    }
+
+
+def database_entry(database_name, schema_name, functional_roles=FUNCTIONAL_ROLES):
+    """Build one rbac.databases entry of a spec from the page's configuration"""
+    return {'name': database_name, 'schema': schema_name, 'functional_roles': list(functional_roles)}
+
+
+def render_spec(spec):
+    """Render every script a spec describes, as (file name, SQL) pairs
+
+    File names match the pages' download buttons, and the SQL goes through the same
+    templates the pages use, so a spec and the equivalent UI input give identical scripts.
+    """
+    scripts = []
+    perimeter = spec.get('perimeter')
+    if perimeter:
+        scripts.append((
+            f"security_perimeter_setup_{perimeter['company_name']}.sql",
+            render_perimeter_sql(
+                perimeter['company_name'], perimeter['allowed_ips'], perimeter['blocked_ips'],
+                perimeter['session_timeout'], perimeter['mfa_enrollment'], perimeter['client_types']
+            ),
+        ))
+    rbac = spec.get('rbac')
+    for database in (rbac or {}).get('databases', []):
+        scripts.append((
+            f"rbac_setup_{database['name']}_{database['schema']}.sql",
+            render_rbac_sql(database['name'], database['schema'], database['functional_roles']),
+        ))
+    return scripts
@@ -0,0 +1,230 @@
+import heapq
+import re
+from dataclasses import dataclass
+
+from sf_security.executor import context_statements, plan_statements, split_context
+from sf_security.sql_script import scripting_block, split_statements
+
+DEFAULT_BATCH_SIZE = 50
+
+_WHITESPACE_RE = re.compile(r'\s+')
+# GRANT <privileges> ON <object> TO <grantee>; privileges on the same object and grantee can share one statement
+_GRANT_RE = re.compile(r'^GRANT\s+(?P<privileges>.+?)\s+ON\s+(?P<object>.+?)\s+TO\s+(?P<grantee>.+)$',
+                       re.IGNORECASE | re.DOTALL)
+_UNMERGEABLE_PRIVILEGES = ('OWNERSHIP', 'ALL')
+_USE_ROLE_RE = re.compile(r'USE\s+ROLE\b', re.IGNORECASE)
+_CONTEXT_RE = re.compile(r'(USE|SET)\b', re.IGNORECASE)
+# Statements that have the same effect when run twice; only these may be dropped as repeats
+_IDEMPOTENT_RE = re.compile(
+    r'(GRANT|USE|SET|CREATE\s+OR\s+REPLACE)\b|CREATE\b(?:(?!\bAS\b).)*?\bIF\s+NOT\s+EXISTS\b',
+    re.IGNORECASE | re.DOTALL
+)
+# Statements whose results are for the user; inside a scripting block they'd be thrown away
+_RESULT_RE = re.compile(r'(SHOW|SELECT|DESCRIBE|DESC)\b', re.IGNORECASE)
+
+
+@dataclass
+class ScriptStats:
+    """Statement counts of a script before or after optimization"""
+    statements: int
+    role_switches: int
+    round_trips: int
+
+
+def _normalize(sql):
+    return _WHITESPACE_RE.sub(' ', sql).strip()
+
+
+def _context_key(context):
+    return tuple(sorted(context.items()))
+
+
+def script_stats(script):
+    """Count statements, USE ROLE switches, and round trips (one per top-level statement)"""
+    statements = split_statements(script)
+    role_switches = sum(1 for sql in statements if _USE_ROLE_RE.match(sql))
+    return ScriptStats(len(statements), role_switches, len(statements))
+
+
+def _grant_parts(sql):
+    """Return (privileges, object, grantee) for a grant whose privileges can be merged, else None"""
+    match = _GRANT_RE.match(sql)
+    if match is None or 'WITH GRANT OPTION' in match.group('grantee').upper():
+        return None
+    privileges = [privilege.strip() for privilege in match.group('privileges').split(',')]
+    if any(privilege.upper().split(' ')[0] in _UNMERGEABLE_PRIVILEGES for privilege in privileges):
+        return None
+    return privileges, match.group('object'), match.group('grantee')
+
+
+def coalesce_statements(items):
+    """Drop repeated idempotent statements and merge grants on the same object and grantee
+
+    items are (sql, context) pairs. A later statement is only folded into an earlier one
+    when nothing between them has to run first, so the script's effect is unchanged. Only
+    idempotent statements (grants, CREATE OR REPLACE, CREATE ... IF NOT EXISTS, USE, SET)
+    are dropped as repeats; DML, CALL, and queries always run as often as written.
+    """
+    items = [(_normalize(sql), context) for sql, context in items]
+    plan = plan_statements(items)
+    # Index of the surviving statement each original statement was folded into
+    merged_into = list(range(len(items)))
+    first_seen = {}
+    grants = {}
+    privileges = {}
+    for index, (sql, context) in enumerate(items):
+        context_key = _context_key(context)
+        deps = plan.dependencies[index]
+
+        def can_fold(target):
+            return all(merged_into[dep] <= target for dep in deps)
+
+        if _IDEMPOTENT_RE.match(sql):
+            key = (sql.upper(), context_key)
+            if key in first_seen and can_fold(first_seen[key]):
+                merged_into[index] = first_seen[key]
+                continue
+            first_seen.setdefault(key, index)
+
+        parts = _grant_parts(sql)
+        if parts is None:
+            continue
+        grant_privileges, grant_object, grantee = parts
+        grant_key = (_normalize(grant_object).upper(), _normalize(grantee).upper(), context_key)
+        target = grants.get(grant_key)
+        if target is not None and can_fold(target):
+            merged_into[index] = target
+            known = {privilege.upper() for privilege in privileges[target]}
+            privileges[target].extend(p for p in grant_privileges if p.upper() not in known)
+            continue
+        grants[grant_key] = index
+        privileges[index] = list(grant_privileges)
+
+    coalesced = []
+    for index, (sql, context) in enumerate(items):
+        if merged_into[index] != index:
+            continue
+        if index in privileges and len(privileges[index]) > 1:
+            _, grant_object, grantee = _grant_parts(sql)
+            sql = f"GRANT {', '.join(privileges[index])} ON {grant_object} TO {grantee}"
+        coalesced.append((sql, context))
+    return coalesced
+
+
+def group_by_context(items):
+    """Reorder statements so those sharing a role (and other context) run together
+
+    Statements are taken in dependency order; whenever the current context has a statement
+    ready it is taken next, otherwise the earliest ready statement starts a new group.
+    """
+    plan = plan_statements(items)
+    remaining = [len(deps) for deps in plan.dependencies]
+    dependents = [[] for _ in items]
+    for index, deps in enumerate(plan.dependencies):
+        for dep in deps:
+            dependents[dep].append(index)
+
+    context_keys = [_context_key(context) for _, context in items]
+    roles = [context.get('ROLE') for _, context in items]
+    ready = []
+    ready_by_context = {}
+    ready_by_role = {}
+
+    def push(index):
+        heapq.heappush(ready, index)
+        heapq.heappush(ready_by_context.setdefault(context_keys[index], []), index)
+        heapq.heappush(ready_by_role.setdefault(roles[index], []), index)
+
+    def pop(heap):
+        # Heaps share entries, so skip statements already taken through another heap
+        while heap and done[heap[0]]:
+            heapq.heappop(heap)
+        return heapq.heappop(heap) if heap else None
+
+    done = [False] * len(items)
+    for index, count in enumerate(remaining):
+        if count == 0:
+            push(index)
+
+    order = []
+    current = None
+    while len(order) < len(items):
+        # Prefer the same context, then the same role (e.g. only USE DATABASE changes), then script order
+        index = pop(ready_by_context.get(current, []))
+        if index is None and order:
+            index = pop(ready_by_role.get(roles[order[-1]], []))
+        if index is None:
+            index = pop(ready)
+        current = context_keys[index]
+        done[index] = True
+        order.append(index)
+        for dependent in dependents[index]:
+            remaining[dependent] -= 1
+            if remaining[dependent] == 0:
+                push(dependent)
+    return [items[index] for index in order]
+
+
+def render_optimized(items, batch_size=1):
+    """Render (sql, context) pairs, emitting context statements only when the context changes
+
+    With batch_size > 1, consecutive statements sharing a context are sent as scripting blocks
+    of up to batch_size statements each. Queries (SHOW, SELECT, DESCRIBE) stay top-level
+    statements so their results are still returned.
+    """
+    lines = []
+    current = {}
+    group = []
+
+    def flush_run(run):
+        for start in range(0, len(run), max(1, batch_size)):
+            batch = run[start:start + max(1, batch_size)]
+            # A $$ block can't be nested in another one
+            if batch_size > 1 and len(batch) > 1 and not any('$$' in sql for sql in batch):
+                lines.append(scripting_block(batch))
+            else:
+                lines.extend(f"{sql};" for sql in batch)
+
+    def flush():
+        run = []
+        for sql in group:
+            if _RESULT_RE.match(sql):
+                flush_run(run)
+                run = []
+                lines.append(f"{sql};")
+            else:
+                run.append(sql)
+        flush_run(run)
+        group.clear()
+
+    for sql, context in items:
+        switch = context_statements(context, current)
+        if switch:
+            flush()
+            if context.get('ROLE') != current.get('ROLE'):
+                if lines:
+                    lines.append("")
+                lines.append(f"-- Statements run as role {_normalize(context['ROLE']).split(' ')[-1]}")
+            lines.extend(f"{statement};" for statement in switch)
+            current = dict(context)
+        group.append(sql)
+    flush()
+    return "\n".join(lines) + "\n"
+
+
+def optimize_script(script, batch_size=1):
+    """Optimize a generated script: coalesce grants, drop idempotent repeats, and group statements by role
+
+    Returns the optimized script with the stats before and after.
+    """
+    items = group_by_context(coalesce_statements(split_context(script)))
+    optimized = render_optimized(items, batch_size=batch_size)
+    top_level = split_statements(optimized)
+    context_count = sum(1 for sql in top_level if _CONTEXT_RE.match(sql))
+    after = ScriptStats(
+        statements=len(items) + context_count,
+        role_switches=sum(1 for sql in top_level if _USE_ROLE_RE.match(sql)),
+        # A scripting block is a single round trip for all of its statements
+        round_trips=len(top_level),
+    )
+    return optimized, script_stats(script), after
@@ -0,0 +1,68 @@
+import re
+
+# Token kinds produced by tokenize()
+WORD = 'word'
+STRING = 'string'
+NUMBER = 'number'
+COMMENT = 'comment'
+SYMBOL = 'symbol'
+
+# Words are (possibly dotted) identifiers, including "quoted" parts and $session_variables;
+# $$ ... $$ blocks (procedure bodies, EXECUTE IMMEDIATE) are string literals
+_WORD_PART = r'(?:[A-Za-z_$][A-Za-z0-9_$]*|"(?:[^"]|"")*")'
+_TOKEN_RE = re.compile(rf"""
+    (?P<comment>--[^\n]*|//[^\n]*|/\*.*?\*/)
+  | (?P<string>'(?:[^'\\]|\\.|'')*'|\$\$.*?\$\$)
+  | (?P<word>{_WORD_PART}(?:\.{_WORD_PART})*)
+  | (?P<number>\d+(?:\.\d+)?)
+  | (?P<symbol>;|[^\s])
+""", re.VERBOSE | re.DOTALL)
+
+
+def tokenize(script):
+    """Split SQL text into (kind, text) tokens, keeping comments and string literals intact"""
+    tokens = []
+    for match in _TOKEN_RE.finditer(script):
+        tokens.append((match.lastgroup, match.group()))
+    return tokens
+
+
+def split_statements(script):
+    """Split a script into statements, ignoring semicolons inside comments and string literals
+
+    Comments are dropped and each statement is returned without its trailing semicolon.
+    Empty statements (e.g. the second semicolon of ";;") are skipped.
+    """
+    statements = []
+    segments = []
+    segment_start = segment_end = None
+    for match in _TOKEN_RE.finditer(script):
+        kind = match.lastgroup
+        is_terminator = kind == SYMBOL and match.group() == ';'
+        if kind == COMMENT or is_terminator:
+            # Close the running segment so the comment or semicolon is left out
+            if segment_start is not None:
+                segments.append(script[segment_start:segment_end])
+                segment_start = None
+            if is_terminator and segments:
+                statements.append("\n".join(segments))
+                segments = []
+            continue
+        if segment_start is None:
+            segment_start = match.start()
+        segment_end = match.end()
+
+    if segment_start is not None:
+        segments.append(script[segment_start:segment_end])
+    if segments:
+        statements.append("\n".join(segments))
+    return statements
+
+
+def scripting_block(statements):
+    """Wrap statements in one anonymous Snowflake Scripting block (a single round trip)
+
+    Statements are given without their trailing semicolons and must not contain $$ themselves.
+    """
+    body = "\n".join(f"    {sql.replace(chr(10), chr(10) + '    ')};" for sql in statements)
+    return f"EXECUTE IMMEDIATE $$\nBEGIN\n{body}\nEND;\n$$;"
@@ -0,0 +1,386 @@
+# SQL generation shared by the pages and policy-as-code specs
+
+# Authentication policy options
+MFA_ENROLLMENT_OPTIONS = ('REQUIRED', 'OPTIONAL')
+CLIENT_TYPES = {
+    'SNOWFLAKE_UI': 'Snowflake UI',
+    'SNOWFLAKE_CLI': 'Snowflake CLI',
+    'SNOWSQL': 'SnowSQL',
+    'DRIVERS': 'Drivers',
+}
+DEFAULT_CLIENT_TYPES = ('SNOWFLAKE_UI', 'SNOWFLAKE_CLI')
+
+# How each client type is described in the generated script's comments
+_CLIENT_TYPE_COMMENTS = {
+    'SNOWFLAKE_UI': 'Snowflake UI',
+    'SNOWFLAKE_CLI': 'CLI',
+    'SNOWSQL': 'SnowSQL',
+    'DRIVERS': 'driver',
+}
+
+# Account level functional roles, and the schema access role granted to each
+FUNCTIONAL_ROLES = ('ANALYST', 'DEVELOPER', 'SUPPORT')
+FUNCTIONAL_ROLE_SCHEMA_ROLES = {
+    'ANALYST': 'SC_R_DBR',
+    'SUPPORT': 'SC_C_DBR',
+    'DEVELOPER': 'SC_W_DBR',
+}
+
+
+# Creates SECURITY_DB.SECURITY_SCHEMA, where the perimeter objects live; it takes no inputs
+PERIMETER_PREP_SQL = """-- ============================================================================
+-- 1. PREPPING THE ROLE SECURITY CONFIGURATION
+-- ============================================================================
+USE ROLE SYSADMIN;
+
+CREATE DATABASE IF NOT EXISTS SECURITY_DB;
+CREATE SCHEMA IF NOT EXISTS SECURITY_DB.SECURITY_SCHEMA;
+USE DATABASE SECURITY_DB;
+USE SCHEMA SECURITY_SCHEMA;
+
+GRANT USAGE ON DATABASE SECURITY_DB TO ROLE SECURITYADMIN;
+GRANT USAGE ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
+GRANT SELECT ON ALL TABLES IN SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
+GRANT SELECT ON FUTURE TABLES IN SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
+GRANT CREATE SESSION POLICY ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
+GRANT CREATE NETWORK RULE ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
+GRANT CREATE SESSION POLICY ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
+GRANT CREATE AUTHENTICATION POLICY ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE SECURITYADMIN;
+
+GRANT CREATE NETWORK POLICY ON ACCOUNT TO ROLE SECURITYADMIN;
+
+
+USE ROLE SECURITYADMIN;
+
+"""
+
+
+def render_network_rules_sql(company_name, allowed_ips_list, blocked_ips_list):
+    """Render the network rules and network policy section of the perimeter script"""
+    # Format IP lists for SQL VALUE_LIST
+    allowed_ips_sql = ", ".join([f"'{ip}'" for ip in allowed_ips_list])
+    blocked_ips_sql = ", ".join([f"'{ip}'" for ip in blocked_ips_list])
+    
+    # Generate network rules SQL (only if IPs are provided)
+    allowed_rule_sql = ""
+    blocked_rule_sql = ""
+    allowed_rule_list = ""
+    blocked_rule_list = ""
+    
+    if allowed_ips_list:
+        allowed_rule_sql = f"""
+CREATE NETWORK RULE SECURITY_SCHEMA.{company_name}_allowed_ips
+    TYPE = IPV4
+    VALUE_LIST = ({allowed_ips_sql})
+    MODE = INGRESS
+    COMMENT = 'Allow access from specified IPs and subnets (VPN for instance)';
+"""
+        allowed_rule_list = f"    ALLOWED_NETWORK_RULE_LIST = ({company_name}_allowed_ips)"
+    
+    if blocked_ips_list:
+        blocked_rule_sql = f"""
+CREATE NETWORK RULE SECURITY_SCHEMA.{company_name}_blocked_ips
+    TYPE = IPV4
+    VALUE_LIST = ({blocked_ips_sql})
+    MODE = INGRESS
+    COMMENT = 'Block access from specified IPs';
+"""
+        blocked_rule_list = f"    BLOCKED_NETWORK_RULE_LIST = ({company_name}_blocked_ips)"
+    
+    # Build the network policy clause
+    network_policy_clauses = []
+    if allowed_rule_list:
+        network_policy_clauses.append(allowed_rule_list)
+    if blocked_rule_list:
+        network_policy_clauses.append(blocked_rule_list)
+    
+    network_policy_sql = ""
+    if network_policy_clauses:
+        network_policy_sql = f"""
+CREATE OR REPLACE NETWORK POLICY {company_name}_network_policy
+{chr(10).join(network_policy_clauses)}
+    COMMENT = 'Network policy for {company_name}';
+"""
+    
+    return f"""-- ============================================================================
+-- 2. NETWORK RULES AND POLICY
+-- ============================================================================
+-- Network rules define access controls for external network locations
+-- (used with external access integrations for data egress)
+-- Ref: https://docs.snowflake.com/en/sql-reference/sql/create-network-rule
+{allowed_rule_sql}{blocked_rule_sql}{network_policy_sql}
+
+    
+
+"""
+
+
+def render_session_policy_sql(session_timeout):
+    """Render the session policy section of the perimeter script"""
+    return f"""-- ============================================================================
+-- 3. SESSION POLICY
+-- ============================================================================
+-- Session policies control user session behavior and timeouts
+-- Idle timeout set to {session_timeout} minutes as specified
+-- Ref: https://docs.snowflake.com/en/sql-reference/sql/create-session-policy
+-- Can be applied to account or user
+
+CREATE OR REPLACE SESSION POLICY SECURITY_DB.SECURITY_SCHEMA.standard_session_policy
+    SESSION_IDLE_TIMEOUT_MINS = {session_timeout}
+    SESSION_UI_IDLE_TIMEOUT_MINS = {session_timeout}
+    COMMENT = 'Standard session policy with {session_timeout}-minute idle timeout';
+
+
+"""
+
+
+def mfa_client_types_problem(mfa_enrollment, client_types):
+    """Problem with an authentication policy's MFA and client types, or None
+
+    Users enroll in MFA through Snowsight, so Snowflake rejects a policy that requires MFA
+    but limits CLIENT_TYPES to clients without SNOWFLAKE_UI. No client types allows every client.
+    """
+    if mfa_enrollment == 'REQUIRED' and client_types and 'SNOWFLAKE_UI' not in client_types:
+        return "MFA enrollment REQUIRED needs the SNOWFLAKE_UI client type, where users enroll in MFA"
+    return None
+
+
+def render_auth_policy_sql(mfa_enrollment='REQUIRED', client_types=DEFAULT_CLIENT_TYPES):
+    """Render the authentication policy section of the perimeter script"""
+    # Build the authentication policy clauses (no CLIENT_TYPES clause allows every client)
+    auth_policy_clauses = [f"  MFA_ENROLLMENT = {mfa_enrollment}"]
+    if client_types:
+        client_types_sql = ", ".join([f"'{client_type}'" for client_type in client_types])
+        auth_policy_clauses.append(f"  CLIENT_TYPES = ({client_types_sql})")
+    client_access = [f"{_CLIENT_TYPE_COMMENTS.get(c, c)} access" for c in client_types] or ["all client"]
+    if len(client_access) > 1:
+        client_access = [", ".join(client_access[:-1]), client_access[-1]]
+    
+    return f"""-- ============================================================================
+-- 4. AUTHENTICATION POLICY
+-- ============================================================================
+-- Authentication policies define authentication requirements for users
+-- This policy allows {" and ".join(client_access)}
+-- Ref: https://docs.snowflake.com/en/sql-reference/sql/create-authentication-policy
+
+CREATE OR REPLACE AUTHENTICATION POLICY SECURITY_DB.SECURITY_SCHEMA.ui_cli_auth_policy
+{chr(10).join(auth_policy_clauses)};
+
+
+"""
+
+
+def render_apply_policies_sql(company_name):
+    """Render the (commented out) statements applying the perimeter policies"""
+    return f"""-- ============================================================================
+-- 5. APPLY POLICIES (OPTIONAL)
+-- ============================================================================
+-- Apply network policy to account
+-- ALTER ACCOUNT SET NETWORK_POLICY = {company_name}_network_policy;
+
+-- Apply session policy to account
+-- ALTER ACCOUNT SET SESSION_POLICY = SECURITY_DB.SECURITY_SCHEMA.standard_session_policy;
+
+-- Apply authentication policy to account
+-- ALTER ACCOUNT SET AUTHENTICATION POLICY = SECURITY_DB.SECURITY_SCHEMA.ui_cli_auth_policy;
+
+-- Or apply to specific users:
+-- ALTER USER <username> SET NETWORK_POLICY = {company_name}_network_policy;
+-- ALTER USER <username> SET SESSION POLICY = SECURITY_DB.SECURITY_SCHEMA.standard_session_policy;
+-- ALTER USER <username> SET AUTHENTICATION POLICY = SECURITY_DB.SECURITY_SCHEMA.ui_cli_auth_policy;
+"""
+
+
+def render_perimeter_sql(company_name, allowed_ips_list, blocked_ips_list, session_timeout,
+                         mfa_enrollment='REQUIRED', client_types=DEFAULT_CLIENT_TYPES):
+    """Render the security perimeter setup script"""
+    return (
+        PERIMETER_PREP_SQL
+        + render_network_rules_sql(company_name, allowed_ips_list, blocked_ips_list)
+        + render_session_policy_sql(session_timeout)
+        + render_auth_policy_sql(mfa_enrollment, client_types)
+        + render_apply_policies_sql(company_name)
+    )
+
+
+def render_rbac_sql(database_name, schema_name, functional_roles=FUNCTIONAL_ROLES):
+    """Render the RBAC setup script for a database and its managed access schema"""
+    # Functional role statements, in the order each section of the script lists them
+    roles = [role for role in FUNCTIONAL_ROLES if role in functional_roles]
+    create_roles_sql = "\n".join([f"CREATE OR REPLACE ROLE {database_name}_{role};" for role in roles])
+    schema_grants_sql = "\n".join([
+        f"GRANT DATABASE ROLE {schema_role}_{database_name} TO ROLE {database_name}_{role};"
+        for role, schema_role in FUNCTIONAL_ROLE_SCHEMA_ROLES.items() if role in functional_roles
+    ])
+    warehouse_grants_sql = "\n".join([
+        f"GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE {database_name}_{role};" for role in roles
+    ])
+    user_grants_sql = "\n".join([f"GRANT ROLE {database_name}_{role} TO USER IDENTIFIER($user_name);" for role in roles])
+    drop_roles_sql = "\n".join([f"-- DROP ROLE IF EXISTS {database_name}_{role};" for role in roles])
+    
+    # Generate the SQL with replacements
+    sql_script = f"""USE ROLE SYSADMIN;
+USE SECONDARY ROLES NONE;
+SET user_name = (SELECT CURRENT_USER());
+
+CREATE WAREHOUSE IF NOT EXISTS SIMPLE_COMPUTE 
+WITH 
+  WAREHOUSE_SIZE = 'XSMALL'
+  AUTO_SUSPEND = 300
+  AUTO_RESUME = TRUE;
+
+CREATE DATABASE IF NOT EXISTS {database_name}
+    COMMENT = 'Marketing production CRM database with private access.';
+
+
+USE ROLE SECURITYADMIN;
+
+-- Create functional roles to manage the database
+CREATE OR REPLACE ROLE RL_{database_name}_ADMIN;
+
+-- Grant the role to the proper user
+GRANT ROLE RL_{database_name}_ADMIN TO USER IDENTIFIER($user_name);;
+
+-- Platform admin changes ownership to the DB_ADMIN role
+GRANT OWNERSHIP ON DATABASE {database_name} TO ROLE RL_{database_name}_ADMIN;
+
+-- Create Database Roles
+USE ROLE RL_{database_name}_ADMIN;
+USE DATABASE {database_name};
+
+CREATE OR REPLACE DATABASE ROLE DB_R_DBR_{database_name}; -- read
+CREATE OR REPLACE DATABASE ROLE DB_C_DBR_{database_name}; -- create
+CREATE OR REPLACE DATABASE ROLE DB_W_DBR_{database_name}; -- write
+
+SHOW DATABASE ROLES IN DATABASE {database_name};
+
+
+-- Grant database permissions to database roles
+GRANT USAGE ON DATABASE {database_name} TO DATABASE ROLE DB_R_DBR_{database_name};
+GRANT CREATE SCHEMA ON DATABASE {database_name} TO DATABASE ROLE DB_C_DBR_{database_name};
+GRANT ALL ON DATABASE {database_name} TO DATABASE ROLE DB_W_DBR_{database_name};
+
+-- Create a Managed Access Schema
+USE ROLE RL_{database_name}_ADMIN;
+
+CREATE OR REPLACE SCHEMA {database_name}.{schema_name} WITH MANAGED ACCESS;
+
+SHOW GRANTS ON SCHEMA {database_name}.{schema_name};
+
+
+-- Create schema access roles using database roles
+USE ROLE RL_{database_name}_ADMIN;
+
+
+-- Create Schema access roles using database roles
+CREATE OR REPLACE DATABASE ROLE SC_R_DBR_{database_name};
+CREATE OR REPLACE DATABASE ROLE SC_C_DBR_{database_name};
+CREATE OR REPLACE DATABASE ROLE SC_W_DBR_{database_name};
+
+USE ROLE SYSADMIN;
+USE WAREHOUSE SIMPLE_COMPUTE;
+GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE RL_{database_name}_ADMIN;
+
+USE ROLE RL_{database_name}_ADMIN;
+USE WAREHOUSE SIMPLE_COMPUTE;
+CREATE OR REPLACE TABLE {database_name}.{schema_name}.INVENTORY_LEVELS (
+    INVENTORY_ID INT PRIMARY KEY,
+    WAREHOUSE_ID INT NOT NULL,
+    PRODUCT_ID INT NOT NULL,
+    QUANTITY_ON_HAND INT DEFAULT 0,
+    QUANTITY_RESERVED INT DEFAULT 0,
+    REORDER_POINT INT DEFAULT 0,
+    LAST_RESTOCK_DATE DATE,
+    NEXT_REORDER_DATE DATE
+) COMMENT = 'Inventory levels by warehouse and product';
+
+INSERT INTO {database_name}.{schema_name}.INVENTORY_LEVELS (INVENTORY_ID, WAREHOUSE_ID, PRODUCT_ID, QUANTITY_ON_HAND, QUANTITY_RESERVED, REORDER_POINT, LAST_RESTOCK_DATE, NEXT_REORDER_DATE)
+VALUES
+    (701, 501, 101, 75, 10, 20, '2023-06-01', '2023-07-15'),
+    (702, 501, 102, 35, 5, 15, '2023-06-01', '2023-07-01'),
+    (703, 502, 101, 50, 8, 20, '2023-06-05', '2023-07-20'),
+    (704, 502, 103, 250, 30, 50, '2023-06-10', '2023-08-01'),
+    (705, 503, 104, 15, 2, 10, '2023-06-15', '2023-06-25'),
+    (706, 503, 105, 60, 12, 25, '2023-06-12', '2023-07-30'),
+    (707, 505, 102, 40, 6, 15, '2023-06-08', '2023-07-05');
+
+
+-- Schema Object Grants
+-- Read Only
+GRANT USAGE ON SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_R_DBR_{database_name};
+GRANT SELECT ON ALL TABLES IN SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_R_DBR_{database_name};
+GRANT SELECT ON FUTURE TABLES IN SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_R_DBR_{database_name};
+
+-- create any object
+GRANT ALL ON SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_C_DBR_{database_name};
+REVOKE MODIFY ON SCHEMA {database_name}.{schema_name} FROM DATABASE ROLE SC_C_DBR_{database_name};
+
+-- write (allows renaming the schema)
+GRANT ALL ON SCHEMA {database_name}.{schema_name} TO DATABASE ROLE SC_W_DBR_{database_name};
+
+-- inheritance
+GRANT DATABASE ROLE SC_R_DBR_{database_name} TO DATABASE ROLE SC_C_DBR_{database_name};
+GRANT DATABASE ROLE SC_C_DBR_{database_name} TO DATABASE ROLE SC_W_DBR_{database_name};
+
+SHOW GRANTS ON SCHEMA {database_name}.{schema_name};
+
+-- grant database role to schema roles
+USE ROLE RL_{database_name}_ADMIN;
+
+GRANT DATABASE ROLE DB_R_DBR_{database_name} TO DATABASE ROLE SC_R_DBR_{database_name};
+GRANT DATABASE ROLE DB_R_DBR_{database_name} TO DATABASE ROLE SC_C_DBR_{database_name};
+GRANT DATABASE ROLE DB_R_DBR_{database_name} TO DATABASE ROLE SC_W_DBR_{database_name};
+
+
+-- Create account level roles
+USE ROLE SECURITYADMIN;
+
+{create_roles_sql}
+
+-- grant schema roles to account roles
+USE ROLE RL_{database_name}_ADMIN;
+USE DATABASE {database_name};
+
+{schema_grants_sql}
+
+-- granting warehouse usage to our account roles
+USE ROLE SYSADMIN;
+{warehouse_grants_sql}
+
+-- Granting roles to the user of your choice
+USE ROLE SECURITYADMIN;
+SET user_name = (SELECT CURRENT_USER());   
+{user_grants_sql}
+
+SHOW GRANTS ON DATABASE {database_name};
+SHOW GRANTS ON SCHEMA {database_name}.{schema_name};
+
+-- USE ROLE SECURITYADMIN;
+{drop_roles_sql}
+
+-- USE ROLE RL_{database_name}_ADMIN;
+-- DROP DATABASE IF EXISTS {database_name};
+-- USE ROLE SECURITYADMIN;
+-- DROP ROLE IF EXISTS RL_{database_name}_ADMIN;
+"""
+    return sql_script
+
+
+def render_security_link_sql(company_name, database_name, network_policy=True):
+    """Render the statements linking the SECURITY_DB.SECURITY_SCHEMA policies to a database's roles"""
+    network_policy_sql = ""
+    if network_policy:
+        network_policy_sql = f"-- ALTER USER IDENTIFIER($user_name) SET NETWORK_POLICY = {company_name}_network_policy;\n"
+    
+    return f"""-- ============================================================================
+-- LINK THE SECURITY PERIMETER TO THE {database_name} ROLES
+-- ============================================================================
+-- Let the project admin role see the policies in SECURITY_DB.SECURITY_SCHEMA
+USE ROLE SECURITYADMIN;
+GRANT USAGE ON DATABASE SECURITY_DB TO ROLE RL_{database_name}_ADMIN;
+GRANT USAGE ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE RL_{database_name}_ADMIN;
+
+-- Apply the perimeter policies to the user granted the {database_name} roles (optional)
+{network_policy_sql}-- ALTER USER IDENTIFIER($user_name) SET SESSION POLICY = SECURITY_DB.SECURITY_SCHEMA.standard_session_policy;
+-- ALTER USER IDENTIFIER($user_name) SET AUTHENTICATION POLICY = SECURITY_DB.SECURITY_SCHEMA.ui_cli_auth_policy;
+"""
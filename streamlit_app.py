@@ -1,5 +1,7 @@
 import streamlit as st
 
+from sf_security.project import get_project
+
 # Page configuration
 st.set_page_config(
     page_title="Snowflake Security Examples",
@@ -33,6 +35,12 @@ Set up Role-Based Access Control (RBAC) for your databases:
 - **Schema Access**: Configure managed access schemas
 - **Functional Roles**: Set up analyst, developer, and support roles
 
+#### 🕸️ RBAC Explorer
+Explore the roles and grants of an existing account:
+- **Search**: Find roles, users, and objects by prefix or fuzzy match
+- **Access Paths**: Trace how a user reaches an object through role grants
+- **Orphaned Roles**: List roles that no user holds
+
 ---
 
 ### 🚀 Getting Started
@@ -55,6 +63,44 @@ Set up Role-Based Access Control (RBAC) for your databases:
 
 """)
 
+# Full account script, assembled from the configuration entered on both pages
+project = get_project()
+perimeter_ready = project.perimeter_ready()
+rbac_ready = project.rbac_ready()
+
+st.markdown("### 🧩 Full Account Script")
+status_col1, status_col2 = st.columns(2)
+with status_col1:
+    if perimeter_ready:
+        st.success(f"✅ **Perimeter:** {project.fields['company_name']}")
+    else:
+        st.info("🔒 **Perimeter:** not configured yet")
+with status_col2:
+    if rbac_ready:
+        st.success(f"✅ **RBAC:** {project.fields['database_name']}.{project.fields['schema_name']}")
+    else:
+        st.info("🗄️ **RBAC:** not configured yet")
+
+if perimeter_ready or rbac_ready:
+    if perimeter_ready and rbac_ready:
+        st.markdown(f"""
+        The script runs the perimeter setup, then the RBAC setup, then grants `RL_{project.fields['database_name']}_ADMIN`
+        usage on `SECURITY_DB.SECURITY_SCHEMA` so the project admin can see the policies.
+        """)
+    full_account_sql = project.full_account_sql()
+    with st.expander("Preview"):
+        st.code(full_account_sql, language='sql')
+    st.download_button(
+        label="📥 Download Full Account Script",
+        data=full_account_sql,
+        file_name=f"full_account_setup_{project.fields['company_name'] or project.fields['database_name']}.sql",
+        mime="text/plain"
+    )
+else:
+    st.markdown("Fill in the Perimeter Setup and RBAC Setup pages to combine them into one script here.")
+
+st.markdown("---")
+
 # Quick links
 st.markdown("### 📖 Useful Resources")
 col1, col2, col3 = st.columns(3)
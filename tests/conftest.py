@@ -0,0 +1,72 @@
+import os
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+GOLDEN_DIR = Path(__file__).resolve().parent / 'golden'
+
+# The pages import sf_security from the repository root
+sys.path.insert(0, str(ROOT))
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-golden",
+        action="store_true",
+        default=False,
+        help="Rewrite the golden files in tests/golden instead of comparing against them",
+    )
+
+
+@pytest.fixture
+def golden(request):
+    """Compare text against tests/golden/<name>, or rewrite the file with --update-golden"""
+    update = request.config.getoption("--update-golden") or os.environ.get('UPDATE_GOLDEN') == '1'
+
+    def check(name, text):
+        path = GOLDEN_DIR / name
+        if update or not path.exists():
+            path.write_text(text, encoding='utf-8')
+            if not update:
+                pytest.fail(f"Golden file {name} did not exist and was written; review and commit it")
+            return
+        expected = path.read_text(encoding='utf-8')
+        assert text == expected, f"Output differs from golden file {name} (run pytest --update-golden if intended)"
+
+    return check
+
+
+_timings = []
+
+
+@pytest.fixture
+def timed(request):
+    """Time a block and fail when it exceeds its budget: with timed(budget_seconds): ..."""
+
+    class Timer:
+        def __init__(self, budget):
+            self.budget = budget
+
+        def __enter__(self):
+            self.start = time.perf_counter()
+            return self
+
+        def __exit__(self, *exc_info):
+            self.elapsed = time.perf_counter() - self.start
+            _timings.append((request.node.name, self.elapsed, self.budget))
+            if exc_info[0] is None:
+                assert self.elapsed <= self.budget, (
+                    f"took {self.elapsed:.2f}s, over the {self.budget:.2f}s budget"
+                )
+
+    return Timer
+
+
+def pytest_terminal_summary(terminalreporter):
+    if _timings:
+        terminalreporter.section("timings")
+        for name, elapsed, budget in _timings:
+            terminalreporter.write_line(f"{elapsed:8.3f}s  (budget {budget:.1f}s)  {name}")
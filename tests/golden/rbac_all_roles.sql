@@ -0,0 +1,153 @@
+USE ROLE SYSADMIN;
+USE SECONDARY ROLES NONE;
+SET user_name = (SELECT CURRENT_USER());
+
+CREATE WAREHOUSE IF NOT EXISTS SIMPLE_COMPUTE 
+WITH 
+  WAREHOUSE_SIZE = 'XSMALL'
+  AUTO_SUSPEND = 300
+  AUTO_RESUME = TRUE;
+
+CREATE DATABASE IF NOT EXISTS MARKETING_DB
+    COMMENT = 'Marketing production CRM database with private access.';
+
+
+USE ROLE SECURITYADMIN;
+
+-- Create functional roles to manage the database
+CREATE OR REPLACE ROLE RL_MARKETING_DB_ADMIN;
+
+-- Grant the role to the proper user
+GRANT ROLE RL_MARKETING_DB_ADMIN TO USER IDENTIFIER($user_name);;
+
+-- Platform admin changes ownership to the DB_ADMIN role
+GRANT OWNERSHIP ON DATABASE MARKETING_DB TO ROLE RL_MARKETING_DB_ADMIN;
+
+-- Create Database Roles
+USE ROLE RL_MARKETING_DB_ADMIN;
+USE DATABASE MARKETING_DB;
+
+CREATE OR REPLACE DATABASE ROLE DB_R_DBR_MARKETING_DB; -- read
+CREATE OR REPLACE DATABASE ROLE DB_C_DBR_MARKETING_DB; -- create
+CREATE OR REPLACE DATABASE ROLE DB_W_DBR_MARKETING_DB; -- write
+
+SHOW DATABASE ROLES IN DATABASE MARKETING_DB;
+
+
+-- Grant database permissions to database roles
+GRANT USAGE ON DATABASE MARKETING_DB TO DATABASE ROLE DB_R_DBR_MARKETING_DB;
+GRANT CREATE SCHEMA ON DATABASE MARKETING_DB TO DATABASE ROLE DB_C_DBR_MARKETING_DB;
+GRANT ALL ON DATABASE MARKETING_DB TO DATABASE ROLE DB_W_DBR_MARKETING_DB;
+
+-- Create a Managed Access Schema
+USE ROLE RL_MARKETING_DB_ADMIN;
+
+CREATE OR REPLACE SCHEMA MARKETING_DB.CRM_SCHEMA WITH MANAGED ACCESS;
+
+SHOW GRANTS ON SCHEMA MARKETING_DB.CRM_SCHEMA;
+
+
+-- Create schema access roles using database roles
+USE ROLE RL_MARKETING_DB_ADMIN;
+
+
+-- Create Schema access roles using database roles
+CREATE OR REPLACE DATABASE ROLE SC_R_DBR_MARKETING_DB;
+CREATE OR REPLACE DATABASE ROLE SC_C_DBR_MARKETING_DB;
+CREATE OR REPLACE DATABASE ROLE SC_W_DBR_MARKETING_DB;
+
+USE ROLE SYSADMIN;
+USE WAREHOUSE SIMPLE_COMPUTE;
+GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE RL_MARKETING_DB_ADMIN;
+
+USE ROLE RL_MARKETING_DB_ADMIN;
+USE WAREHOUSE SIMPLE_COMPUTE;
+CREATE OR REPLACE TABLE MARKETING_DB.CRM_SCHEMA.INVENTORY_LEVELS (
+    INVENTORY_ID INT PRIMARY KEY,
+    WAREHOUSE_ID INT NOT NULL,
+    PRODUCT_ID INT NOT NULL,
+    QUANTITY_ON_HAND INT DEFAULT 0,
+    QUANTITY_RESERVED INT DEFAULT 0,
+    REORDER_POINT INT DEFAULT 0,
+    LAST_RESTOCK_DATE DATE,
+    NEXT_REORDER_DATE DATE
+) COMMENT = 'Inventory levels by warehouse and product';
+
+INSERT INTO MARKETING_DB.CRM_SCHEMA.INVENTORY_LEVELS (INVENTORY_ID, WAREHOUSE_ID, PRODUCT_ID, QUANTITY_ON_HAND, QUANTITY_RESERVED, REORDER_POINT, LAST_RESTOCK_DATE, NEXT_REORDER_DATE)
+VALUES
+    (701, 501, 101, 75, 10, 20, '2023-06-01', '2023-07-15'),
+    (702, 501, 102, 35, 5, 15, '2023-06-01', '2023-07-01'),
+    (703, 502, 101, 50, 8, 20, '2023-06-05', '2023-07-20'),
+    (704, 502, 103, 250, 30, 50, '2023-06-10', '2023-08-01'),
+    (705, 503, 104, 15, 2, 10, '2023-06-15', '2023-06-25'),
+    (706, 503, 105, 60, 12, 25, '2023-06-12', '2023-07-30'),
+    (707, 505, 102, 40, 6, 15, '2023-06-08', '2023-07-05');
+
+
+-- Schema Object Grants
+-- Read Only
+GRANT USAGE ON SCHEMA MARKETING_DB.CRM_SCHEMA TO DATABASE ROLE SC_R_DBR_MARKETING_DB;
+GRANT SELECT ON ALL TABLES IN SCHEMA MARKETING_DB.CRM_SCHEMA TO DATABASE ROLE SC_R_DBR_MARKETING_DB;
+GRANT SELECT ON FUTURE TABLES IN SCHEMA MARKETING_DB.CRM_SCHEMA TO DATABASE ROLE SC_R_DBR_MARKETING_DB;
+
+-- create any object
+GRANT ALL ON SCHEMA MARKETING_DB.CRM_SCHEMA TO DATABASE ROLE SC_C_DBR_MARKETING_DB;
+REVOKE MODIFY ON SCHEMA MARKETING_DB.CRM_SCHEMA FROM DATABASE ROLE SC_C_DBR_MARKETING_DB;
+
+-- write (allows renaming the schema)
+GRANT ALL ON SCHEMA MARKETING_DB.CRM_SCHEMA TO DATABASE ROLE SC_W_DBR_MARKETING_DB;
+
+-- inheritance
+GRANT DATABASE ROLE SC_R_DBR_MARKETING_DB TO DATABASE ROLE SC_C_DBR_MARKETING_DB;
+GRANT DATABASE ROLE SC_C_DBR_MARKETING_DB TO DATABASE ROLE SC_W_DBR_MARKETING_DB;
+
+SHOW GRANTS ON SCHEMA MARKETING_DB.CRM_SCHEMA;
+
+-- grant database role to schema roles
+USE ROLE RL_MARKETING_DB_ADMIN;
+
+GRANT DATABASE ROLE DB_R_DBR_MARKETING_DB TO DATABASE ROLE SC_R_DBR_MARKETING_DB;
+GRANT DATABASE ROLE DB_R_DBR_MARKETING_DB TO DATABASE ROLE SC_C_DBR_MARKETING_DB;
+GRANT DATABASE ROLE DB_R_DBR_MARKETING_DB TO DATABASE ROLE SC_W_DBR_MARKETING_DB;
+
+
+-- Create account level roles
+USE ROLE SECURITYADMIN;
+
+CREATE OR REPLACE ROLE MARKETING_DB_ANALYST;
+CREATE OR REPLACE ROLE MARKETING_DB_DEVELOPER;
+CREATE OR REPLACE ROLE MARKETING_DB_SUPPORT;
+
+-- grant schema roles to account roles
+USE ROLE RL_MARKETING_DB_ADMIN;
+USE DATABASE MARKETING_DB;
+
+GRANT DATABASE ROLE SC_R_DBR_MARKETING_DB TO ROLE MARKETING_DB_ANALYST;
+GRANT DATABASE ROLE SC_C_DBR_MARKETING_DB TO ROLE MARKETING_DB_SUPPORT;
+GRANT DATABASE ROLE SC_W_DBR_MARKETING_DB TO ROLE MARKETING_DB_DEVELOPER;
+
+-- granting warehouse usage to our account roles
+USE ROLE SYSADMIN;
+GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE MARKETING_DB_ANALYST;
+GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE MARKETING_DB_DEVELOPER;
+GRANT USAGE ON WAREHOUSE SIMPLE_COMPUTE TO ROLE MARKETING_DB_SUPPORT;
+
+-- Granting roles to the user of your choice
+USE ROLE SECURITYADMIN;
+SET user_name = (SELECT CURRENT_USER());   
+GRANT ROLE MARKETING_DB_ANALYST TO USER IDENTIFIER($user_name);
+GRANT ROLE MARKETING_DB_DEVELOPER TO USER IDENTIFIER($user_name);
+GRANT ROLE MARKETING_DB_SUPPORT TO USER IDENTIFIER($user_name);
+
+SHOW GRANTS ON DATABASE MARKETING_DB;
+SHOW GRANTS ON SCHEMA MARKETING_DB.CRM_SCHEMA;
+
+-- USE ROLE SECURITYADMIN;
+-- DROP ROLE IF EXISTS MARKETING_DB_ANALYST;
+-- DROP ROLE IF EXISTS MARKETING_DB_DEVELOPER;
+-- DROP ROLE IF EXISTS MARKETING_DB_SUPPORT;
+
+-- USE ROLE RL_MARKETING_DB_ADMIN;
+-- DROP DATABASE IF EXISTS MARKETING_DB;
+-- USE ROLE SECURITYADMIN;
+-- DROP ROLE IF EXISTS RL_MARKETING_DB_ADMIN;
\ No newline at end of file
@@ -0,0 +1,39 @@
+import pytest
+from graphviz.quoting import quote
+
+from sf_security.diagram import RBAC_DIAGRAM_LABELS, build_rbac_digraph, rbac_diagram_labels, render_rbac_diagram
+from sf_security.templates import FUNCTIONAL_ROLES
+
+
+@pytest.mark.parametrize('database_name, schema_name', [
+    ('MARKETING_DB', 'CRM_SCHEMA'),
+    ('SALES', 'RAW'),
+    # $ and DOT keywords make graphviz quote a label that would otherwise be a plain ID
+    ('DB$1', 'node'),
+    ('Graph', 'Edge'),
+])
+def test_skeleton_matches_a_full_build(database_name, schema_name):
+    full = build_rbac_digraph(rbac_diagram_labels(database_name, schema_name)).source
+    assert render_rbac_diagram(database_name, schema_name) == full
+
+
+@pytest.mark.parametrize('functional_roles', [['ANALYST'], ['SUPPORT', 'DEVELOPER'], list(FUNCTIONAL_ROLES)])
+def test_only_selected_functional_roles_are_drawn(functional_roles):
+    labels = rbac_diagram_labels('SALES', 'RAW')
+    source = render_rbac_diagram('SALES', 'RAW', functional_roles)
+    assert source == build_rbac_digraph(labels, functional_roles).source
+    for role in FUNCTIONAL_ROLES:
+        assert (f'{role}_ROLE' in source) == (role in functional_roles)
+
+
+def test_every_label_is_filled_in():
+    source = render_rbac_diagram('SALES', 'RAW')
+    assert '__LABEL_' not in source
+    labels = rbac_diagram_labels('SALES', 'RAW')
+    assert set(labels) == set(RBAC_DIAGRAM_LABELS)
+    for label in labels.values():
+        assert f'label={quote(label)}' in source
+
+
+def test_skeleton_matches_golden(golden):
+    golden("rbac_all_roles.dot", render_rbac_diagram('MARKETING_DB', 'CRM_SCHEMA'))
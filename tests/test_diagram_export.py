@@ -0,0 +1,116 @@
+"""Diagram export: the dot worker pool, its cache, failures, and zip streaming"""
+import io
+import shutil
+import sys
+import zipfile
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+from sf_security.diagram import render_rbac_diagram
+from sf_security.diagram_export import DiagramExportError, DiagramRenderer, iter_zip, write_zip
+
+# Stands in for dot: echoes the format and source back, and logs each call
+FAKE_DOT = """#!{python}
+import sys, time
+source = sys.stdin.read()
+with open({log!r}, 'a') as log:
+    log.write(sys.argv[1] + '\\n')
+if 'SLOW' in source:
+    time.sleep(5)
+if 'BROKEN' in source:
+    sys.stderr.write('syntax error in line 1')
+    sys.exit(1)
+sys.stdout.write(sys.argv[1] + ':' + source)
+"""
+
+
+@pytest.fixture
+def fake_dot(tmp_path):
+    log = tmp_path / 'calls.log'
+    log.write_text('')
+    script = tmp_path / 'dot'
+    script.write_text(FAKE_DOT.format(python=sys.executable, log=str(log)))
+    script.chmod(0o755)
+    return str(script), log
+
+
+@pytest.fixture
+def renderer(fake_dot):
+    renderer = DiagramRenderer(max_workers=2, timeout=2, dot_binary=fake_dot[0])
+    yield renderer
+    renderer.close()
+
+
+def test_renderings_are_cached_by_source_and_format(renderer, fake_dot):
+    assert renderer.render('digraph {}', 'svg') == b'-Tsvg:digraph {}'
+    assert renderer.render('digraph {}', 'svg') == b'-Tsvg:digraph {}'
+    assert renderer.render('digraph {}', 'png') == b'-Tpng:digraph {}'
+    assert fake_dot[1].read_text().split() == ['-Tsvg', '-Tpng']
+
+
+def test_concurrent_requests_share_one_render(renderer, fake_dot):
+    futures = [renderer.submit('digraph { a }', 'pdf') for _ in range(5)]
+    assert {future.result() for future in futures} == {b'-Tpdf:digraph { a }'}
+    assert fake_dot[1].read_text().split() == ['-Tpdf']
+
+
+def test_failures_raise_export_errors(renderer):
+    with pytest.raises(DiagramExportError, match='syntax error'):
+        renderer.render('BROKEN', 'svg')
+    with pytest.raises(DiagramExportError, match='took over 2s'):
+        renderer.render('SLOW', 'svg')
+    with pytest.raises(ValueError):
+        renderer.submit('digraph {}', 'jpg')
+
+
+def test_missing_dot_is_reported():
+    renderer = DiagramRenderer(dot_binary='no-such-dot')
+    assert not renderer.available()
+    with pytest.raises(DiagramExportError, match="isn't installed"):
+        renderer.render('digraph {}', 'svg')
+    renderer.close()
+
+
+def test_zip_has_every_diagram_in_every_format(renderer):
+    diagrams = [(f"rbac_DB{i}_RAW", f"digraph {{ DB{i} }}") for i in range(10)]
+    # Two databases with the same diagram still get an entry each
+    diagrams.append(('rbac_COPY_RAW', 'digraph { DB0 }'))
+    entries = []
+    chunks = list(iter_zip(renderer, diagrams, ['svg', 'png'], on_entry=lambda *entry: entries.append(entry)))
+    assert len(chunks) == 23
+    assert len(entries) == 22
+
+    archive = zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+    assert archive.testzip() is None
+    assert len(archive.namelist()) == 22
+    assert archive.read('png/rbac_DB3_RAW.png') == b'-Tpng:digraph { DB3 }'
+    assert archive.read('svg/rbac_COPY_RAW.svg') == b'-Tsvg:digraph { DB0 }'
+
+
+def test_write_zip(renderer):
+    file = io.BytesIO()
+    write_zip(file, renderer, [('rbac_SALES_RAW', 'digraph {}')], ['pdf'])
+    assert zipfile.ZipFile(file).namelist() == ['pdf/rbac_SALES_RAW.pdf']
+
+
+@pytest.mark.skipif(shutil.which('dot') is None, reason="Graphviz's dot isn't installed")
+def test_real_dot_renders_the_rbac_diagram():
+    renderer = DiagramRenderer(max_workers=1)
+    source = render_rbac_diagram('SALES', 'RAW')
+    assert b'<svg' in renderer.render(source, 'svg')
+    assert renderer.render(source, 'png').startswith(b'\x89PNG')
+    assert renderer.render(source, 'pdf').startswith(b'%PDF')
+    renderer.close()
+
+
+def test_rbac_page_offers_the_dot_source():
+    at = AppTest.from_file(str(ROOT / 'pages' / '2_RBAC_Setup.py'), default_timeout=60)
+    at.session_state['database_name'] = 'SALES'
+    at.session_state['schema_name'] = 'RAW'
+    at.run()
+    assert not at.exception
+    assert any(expander.label == "📤 Export Diagram" for expander in at.expander)
+    if shutil.which('dot') is None:
+        assert any("isn't installed" in warning.value for warning in at.warning)
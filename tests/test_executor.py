@@ -0,0 +1,133 @@
+import threading
+
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+from sf_security.executor import RecordingSession, ScriptExecutor, build_plan
+from sf_security.script_panels import recorded_log
+from sf_security.templates import render_perimeter_sql, render_rbac_sql
+
+SCRIPT = """
+USE ROLE SYSADMIN;
+CREATE DATABASE IF NOT EXISTS SALES;
+CREATE WAREHOUSE IF NOT EXISTS WH;
+USE ROLE SECURITYADMIN;
+CREATE ROLE ANALYST;
+GRANT USAGE ON DATABASE SALES TO ROLE ANALYST;
+GRANT USAGE ON WAREHOUSE WH TO ROLE ANALYST;
+"""
+
+
+def test_plan_orders_objects_before_their_grants():
+    plan = build_plan(SCRIPT)
+    assert [statement.sql for statement in plan.statements][:2] == [
+        'CREATE DATABASE IF NOT EXISTS SALES', 'CREATE WAREHOUSE IF NOT EXISTS WH'
+    ]
+    assert plan.dependencies == [set(), set(), set(), {0, 2}, {1, 2}]
+    assert plan.levels() == [[0, 1, 2], [3, 4]]
+    assert plan.statements[3].context == {'ROLE': 'USE ROLE SECURITYADMIN'}
+
+
+def depends_on(plan, index, earlier):
+    """Whether statement index waits (directly or transitively) for statement earlier"""
+    pending = [index]
+    seen = set()
+    while pending:
+        deps = plan.dependencies[pending.pop()] - seen
+        if earlier in deps:
+            return True
+        seen |= deps
+        pending.extend(deps)
+    return False
+
+
+def test_container_grants_wait_for_objects_created_in_the_container():
+    plan = build_plan(render_rbac_sql('MKT', 'CRM'))
+    sqls = [statement.sql for statement in plan.statements]
+    create_table = next(i for i, sql in enumerate(sqls) if sql.startswith('CREATE OR REPLACE TABLE'))
+    all_tables = sqls.index('GRANT SELECT ON ALL TABLES IN SCHEMA MKT.CRM TO DATABASE ROLE SC_R_DBR_MKT')
+    assert depends_on(plan, all_tables, create_table)
+    waves = {index: level for level, wave in enumerate(plan.levels()) for index in wave}
+    assert waves[create_table] < waves[all_tables]
+
+
+def test_queries_report_the_state_at_their_place_in_the_script():
+    plan = build_plan(render_rbac_sql('MKT', 'CRM'))
+    last = len(plan.statements) - 1
+    assert plan.statements[last].sql == 'SHOW GRANTS ON SCHEMA MKT.CRM'
+    for statement in plan.statements[:last]:
+        if statement.writes or statement.appends:
+            assert depends_on(plan, last, statement.index), statement.sql
+
+
+def test_executor_runs_every_statement_after_its_dependencies():
+    for script in (render_rbac_sql('SALES', 'RAW'), render_perimeter_sql('acme', ['10.0.0.0/8'], [], 30)):
+        plan = build_plan(script)
+        log = []
+        results = ScriptExecutor(lambda: RecordingSession(log, delay=0.001), max_sessions=4).run(plan)
+        assert {result.status for result in results} == {'succeeded'}
+        executed = [sql for _, sql in log]
+        # Repeated statements (e.g. SHOW GRANTS) can't be told apart in the log
+        position = {sql: executed.index(sql) for sql in executed if executed.count(sql) == 1}
+        for statement in plan.statements:
+            for dep in plan.dependencies[statement.index]:
+                before, after = plan.statements[dep].sql, statement.sql
+                if before in position and after in position:
+                    assert position[before] < position[after]
+
+
+def test_each_session_switches_to_the_statement_context():
+    log = []
+    ScriptExecutor(lambda: RecordingSession(log), max_sessions=2).run(build_plan(SCRIPT))
+    roles = {}
+    for session, sql in log:
+        if sql.startswith('USE ROLE'):
+            roles[session] = sql
+        elif sql.startswith('GRANT') or sql.startswith('CREATE ROLE'):
+            assert roles[session] == 'USE ROLE SECURITYADMIN'
+
+
+def test_failures_are_retried_and_dependents_skipped():
+    results = ScriptExecutor(
+        lambda: RecordingSession(fail_on='CREATE ROLE', fail_times=5), retries=2, retry_delay=0
+    ).run(build_plan(SCRIPT))
+    statuses = [result.status for result in results]
+    assert statuses == ['succeeded', 'succeeded', 'failed', 'skipped', 'skipped']
+    assert results[2].attempts == 3
+
+    results = ScriptExecutor(
+        lambda: RecordingSession(fail_on='CREATE ROLE', fail_times=1), retries=1, retry_delay=0
+    ).run(build_plan(SCRIPT))
+    assert [result.status for result in results] == ['succeeded'] * 5
+
+
+def test_sessions_are_reused_up_to_the_pool_size():
+    created = []
+    lock = threading.Lock()
+
+    def factory():
+        with lock:
+            created.append(RecordingSession(delay=0.001))
+            return created[-1]
+
+    ScriptExecutor(factory, max_sessions=3).run(build_plan(render_rbac_sql('SALES', 'RAW')))
+    assert 1 <= len(created) <= 3
+
+
+def test_dry_run_shows_the_recorded_log():
+    log = []
+    ScriptExecutor(lambda: RecordingSession(log), max_sessions=2).run(build_plan(SCRIPT))
+    frame = recorded_log(log)
+    assert frame['ORDER'].tolist() == list(range(1, len(log) + 1))
+    assert set(frame['SESSION']) <= {1, 2}
+    assert frame['STATEMENT'].tolist() == [sql for _, sql in log]
+
+    at = AppTest.from_file(str(ROOT / 'pages' / '2_RBAC_Setup.py'), default_timeout=60)
+    at.session_state['database_name'] = 'SALES'
+    at.session_state['schema_name'] = 'RAW'
+    at.run()
+    at.button(key='rbac_run_run').click().run()
+    assert not at.exception
+    recorded = at.dataframe[-1].value
+    assert list(recorded.columns) == ['ORDER', 'SESSION', 'STATEMENT']
+    assert recorded['STATEMENT'].str.startswith('USE ROLE').any()
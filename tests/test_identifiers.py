@@ -0,0 +1,41 @@
+import pandas as pd
+import pytest
+
+from sf_security.identifiers import (
+    check_perimeter_names, check_rbac_names, identifier_problem, quote_identifier, quote_identifiers
+)
+
+
+@pytest.mark.parametrize('name', ['SALES', 'sales_db', '_X1', 'A$B'])
+def test_valid_identifiers(name):
+    assert identifier_problem(name) is None
+
+
+@pytest.mark.parametrize('name, message', [
+    ('', 'must not be empty'),
+    ('1DB', 'must start with a letter'),
+    ('my db', "(' ')"),
+    ('x"; DROP', 'characters'),
+    ('table', 'reserved word'),
+    ('A' * 256, 'limit is 255'),
+])
+def test_invalid_identifiers(name, message):
+    assert message in identifier_problem(name)
+
+
+def test_derived_names_respect_the_length_limit():
+    # RL_<db>_ADMIN and <db>_DEVELOPER add 10 characters to the database name
+    assert check_rbac_names('D' * 245, 'RAW') == []
+    assert 'at most 245' in check_rbac_names('D' * 246, 'RAW')[0]
+    # <company>_network_policy adds 15
+    assert check_perimeter_names('c' * 240) == []
+    assert check_perimeter_names('c' * 241)
+
+
+def test_quoting():
+    assert quote_identifier('SALES') == 'SALES'
+    assert quote_identifier('select') == '"select"'
+    assert quote_identifier('a"b') == '"a""b"'
+    names = pd.Series(['SALES', 'my user', 'a"b'])
+    assert quote_identifiers(names).tolist() == ['SALES', '"my user"', '"a""b"']
+    assert quote_identifiers(names, always=True).tolist() == ['"SALES"', '"my user"', '"a""b"']
@@ -0,0 +1,46 @@
+import io
+
+import pandas as pd
+import pytest
+
+from sf_security.login_replay import replay_logins
+from sf_security.network import NetworkPolicyIndex
+
+EXPORT = """USER_NAME,CLIENT_IP,IS_SUCCESS,EVENT_TIMESTAMP
+alice,10.0.0.1,YES,2024-01-01 08:00:00
+alice,8.8.8.8,YES,2024-01-02 08:00:00
+alice,8.8.8.8,YES,2024-01-03 08:00:00
+bob,8.8.4.4,YES,2024-01-01 09:00:00
+bob,8.8.4.4,NO,2024-01-04 09:00:00
+carol,10.0.0.2,YES,2024-01-01 10:00:00
+"""
+
+
+@pytest.mark.parametrize('chunk_size', [1, 1_000_000])
+def test_replay_counts_rejected_logins_per_user(chunk_size):
+    index = NetworkPolicyIndex(['10.0.0.0/8'], [])
+    by_user, by_user_ip = replay_logins(io.BytesIO(EXPORT.encode()), index, file_name='logins.csv',
+                                        chunk_size=chunk_size)
+    rejected = by_user.set_index('USER_NAME')['REJECTED_LOGINS'].to_dict()
+    # bob's failed login is ignored, so his only successful login being rejected locks him out
+    assert rejected == {'alice': 2, 'bob': 1}
+    locked_out = by_user.set_index('USER_NAME')['LOCKED_OUT'].to_dict()
+    assert locked_out == {'alice': False, 'bob': True}
+
+    alice = by_user_ip[by_user_ip['USER_NAME'] == 'alice'].iloc[0]
+    assert alice['CLIENT_IP'] == '8.8.8.8'
+    assert alice['FIRST_SEEN'] == pd.Timestamp('2024-01-02 08:00:00')
+    assert alice['LAST_SEEN'] == pd.Timestamp('2024-01-03 08:00:00')
+
+
+def test_replay_reads_parquet(tmp_path):
+    path = tmp_path / 'logins.parquet'
+    pd.read_csv(io.StringIO(EXPORT)).to_parquet(path)
+    with open(path, 'rb') as file:
+        by_user, _ = replay_logins(file, NetworkPolicyIndex([], ['8.8.8.8']))
+    assert by_user.set_index('USER_NAME')['REJECTED_LOGINS'].to_dict()['alice'] == 2
+
+
+def test_replay_requires_user_and_ip_columns():
+    with pytest.raises(ValueError, match='CLIENT_IP'):
+        replay_logins(io.BytesIO(b"USER_NAME\nalice\n"), NetworkPolicyIndex([], []))
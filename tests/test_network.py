@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+from sf_security.network import (
+    ALLOWED, BLOCKED, INVALID, UNMATCHED, NetworkPolicyIndex, classify_log, ipv4_to_int, parse_ipv4_rule
+)
+
+
+def test_parse_ipv4_rule_normalizes_host_bits():
+    assert parse_ipv4_rule('192.0.0.1/24') == (0xC0000000, 0xC00000FF)
+    assert parse_ipv4_rule('10.0.0.1') == (0x0A000001, 0x0A000001)
+
+
+@pytest.mark.parametrize('rule', ['10.0.0', '256.0.0.1', '10.0.0.0/33', 'abc'])
+def test_parse_ipv4_rule_rejects_invalid_rules(rule):
+    with pytest.raises(ValueError):
+        parse_ipv4_rule(rule)
+
+
+def test_ipv4_to_int_marks_invalid_addresses():
+    assert ipv4_to_int(['0.0.0.1', ' 10.0.0.1 ', '300.1.1.1', None, 'x']).tolist() == [1, 0x0A000001, -1, -1, -1]
+
+
+def test_blocked_rules_take_precedence():
+    index = NetworkPolicyIndex(['10.0.0.0/8'], ['10.1.2.3'])
+    assert index.classify(['10.0.0.5', '10.1.2.3', '11.0.0.1', 'bogus']).tolist() == [
+        ALLOWED, BLOCKED, UNMATCHED, INVALID
+    ]
+
+
+def test_unmatched_is_rejected_only_with_an_allowed_list():
+    assert NetworkPolicyIndex(['10.0.0.0/8'], []).is_rejected([UNMATCHED, ALLOWED]).tolist() == [True, False]
+    assert NetworkPolicyIndex([], ['10.0.0.1']).is_rejected([UNMATCHED, BLOCKED]).tolist() == [False, True]
+
+
+def test_classify_log_reads_csv_ip_column():
+    log = io.BytesIO(b"EVENT,CLIENT_IP\na,10.0.0.1\nb,10.0.0.1\nc,8.8.8.8\n")
+    result = classify_log(log, NetworkPolicyIndex(['10.0.0.0/8'], []), chunk_size=1)
+    assert result.to_dict('records') == [
+        {'ip': '10.0.0.1', 'status': ALLOWED, 'hits': 2},
+        {'ip': '8.8.8.8', 'status': UNMATCHED, 'hits': 1},
+    ]
+    assert not log.closed
+
+
+def test_classify_log_extracts_ips_from_text_lines():
+    log = io.BytesIO(b"GET / from 10.0.0.1 ok\nno address here\n")
+    result = classify_log(log, NetworkPolicyIndex(['10.0.0.0/8'], []))
+    assert dict(zip(result['ip'], result['status'])) == {'10.0.0.1': ALLOWED, '': INVALID}
+
+
+def test_classify_log_reads_single_column_csv():
+    log = io.BytesIO(b"client_ip\n10.0.0.1\n")
+    result = classify_log(log, NetworkPolicyIndex(['10.0.0.0/8'], []))
+    assert result.to_dict('records') == [{'ip': '10.0.0.1', 'status': ALLOWED, 'hits': 1}]
@@ -0,0 +1,93 @@
+"""Render both pages headlessly and compare their SQL and DOT output with golden files"""
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+
+PERIMETER_PAGE = str(ROOT / 'pages' / '1_Perimeter_Setup.py')
+RBAC_PAGE = str(ROOT / 'pages' / '2_RBAC_Setup.py')
+
+PERIMETER_CASES = {
+    'perimeter_defaults': {'company_name': 'acme'},
+    'perimeter_two_allowed_no_blocked': {
+        'company_name': 'beta', 'allowed_ips_input': '1.2.3.4, 5.6.7.8', 'blocked_ips_input': '',
+        'session_timeout': 5,
+    },
+    'perimeter_blocked_only': {
+        'company_name': 'gamma', 'allowed_ips_input': '', 'blocked_ips_input': '10.0.0.0/16\n10.1.0.0/16',
+        'session_timeout': 480,
+    },
+    'perimeter_mfa_optional_all_clients': {
+        'company_name': 'delta', 'mfa_enrollment': 'OPTIONAL',
+        'client_types': ['SNOWFLAKE_UI', 'SNOWFLAKE_CLI', 'SNOWSQL', 'DRIVERS'], 'session_timeout': 45,
+    },
+}
+
+RBAC_CASES = {
+    'rbac_all_roles': {'database_name': 'MARKETING_DB', 'schema_name': 'CRM_SCHEMA'},
+    'rbac_analyst_only': {'database_name': 'SALES', 'schema_name': 'RAW', 'functional_roles': ['ANALYST']},
+}
+
+
+def run_page(path, inputs):
+    """Run a page with the given session state and return the AppTest after the run"""
+    at = AppTest.from_file(path, default_timeout=60)
+    for key, value in inputs.items():
+        at.session_state[key] = value
+    at.run()
+    assert not at.exception, [exception.value for exception in at.exception]
+    return at
+
+
+def generated_sql(at):
+    """The script shown in the Generated SQL tab"""
+    sql_tab = next(tab for tab in at.tabs if tab.label == "📜 Generated SQL")
+    return sql_tab.code[0].value
+
+
+@pytest.mark.parametrize('case', sorted(PERIMETER_CASES))
+def test_perimeter_sql_matches_golden(case, golden):
+    at = run_page(PERIMETER_PAGE, PERIMETER_CASES[case])
+    golden(f"{case}.sql", generated_sql(at))
+
+
+@pytest.mark.parametrize('case', sorted(RBAC_CASES))
+def test_rbac_sql_matches_golden(case, golden):
+    at = run_page(RBAC_PAGE, RBAC_CASES[case])
+    golden(f"{case}.sql", generated_sql(at))
+
+
+@pytest.mark.parametrize('case', sorted(RBAC_CASES))
+def test_rbac_diagram_matches_golden(case, golden):
+    at = run_page(RBAC_PAGE, RBAC_CASES[case])
+    charts = at.get('graphviz_chart')
+    assert len(charts) == 1
+    golden(f"{case}.dot", charts[0].proto.spec)
+
+
+def test_persona_examples_follow_the_selected_roles():
+    at = run_page(RBAC_PAGE, RBAC_CASES['rbac_analyst_only'])
+    persona_tab = next(tab for tab in at.tabs if tab.label == "🧪 Test Personas")
+    assert [code.value.split(';')[0].strip() for code in persona_tab.code] == ["USE ROLE SALES_ANALYST"]
+
+
+def test_pages_render_nothing_for_invalid_names():
+    at = run_page(RBAC_PAGE, {'database_name': 'my db', 'schema_name': 'RAW'})
+    assert not at.tabs
+    assert any("Database name" in error.value for error in at.error)
+
+    at = run_page(PERIMETER_PAGE, {'company_name': 'acme corp'})
+    assert not at.tabs
+    assert any("Company name" in error.value for error in at.error)
+
+
+def test_perimeter_page_rejects_required_mfa_without_the_ui_client():
+    at = run_page(PERIMETER_PAGE, {'company_name': 'acme', 'mfa_enrollment': 'REQUIRED', 'client_types': ['DRIVERS']})
+    assert not at.tabs
+    assert any("SNOWFLAKE_UI" in error.value for error in at.error)
+    assert not at.session_state['project'].perimeter_ready()
+
+
+def test_pages_prompt_for_missing_input():
+    assert run_page(PERIMETER_PAGE, {}).info
+    assert run_page(RBAC_PAGE, {}).info
@@ -0,0 +1,136 @@
+"""Timing budgets for the hot paths; budgets leave ample headroom over typical laptop timings"""
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+from sf_security.network import NetworkPolicyIndex, classify_log
+from sf_security.policy_builder import (
+    assign_policies, default_assignments, default_authentication_policies, default_session_policies,
+    render_policy_builder_sql
+)
+from sf_security.diagram import render_rbac_diagram
+from sf_security.identifiers import identifier_problems
+from sf_security.role_graph import RoleGraph, synthetic_grants
+from sf_security.session_sim import simulate_timeouts
+from sf_security.spec import load_spec
+from sf_security.sql_optimize import optimize_script
+
+pytestmark = pytest.mark.perf
+
+RNG = np.random.default_rng(0)
+
+
+def random_ips(count, distinct=50_000):
+    values = RNG.integers(0, 2 ** 32, size=distinct)
+    addresses = np.array([f"{v >> 24}.{(v >> 16) & 255}.{(v >> 8) & 255}.{v & 255}" for v in values], dtype=object)
+    return addresses[RNG.integers(0, distinct, size=count)]
+
+
+@pytest.fixture(scope='module')
+def policy_index():
+    rules = [f"10.{i // 256}.{i % 256}.0/24" for i in range(5_000)]
+    return NetworkPolicyIndex(rules, [f"10.0.{i}.7" for i in range(256)])
+
+
+def test_classify_one_million_addresses(policy_index, timed):
+    ips = random_ips(1_000_000)
+    with timed(5.0):
+        labels = policy_index.classify(ips)
+    assert len(labels) == len(ips)
+
+
+def test_classify_one_million_line_log(policy_index, timed):
+    log = io.BytesIO(("CLIENT_IP\n" + "\n".join(random_ips(1_000_000)) + "\n").encode())
+    with timed(8.0):
+        result = classify_log(log, policy_index)
+    assert result['hits'].sum() == 1_000_000
+
+
+def test_load_spec_with_100k_ips(timed):
+    document = json.dumps({'perimeter': {'company_name': 'acme', 'allowed_ips': list(random_ips(100_000))}})
+    with timed(3.0):
+        spec = load_spec(document, file_name='spec.json')
+    assert len(spec['perimeter']['allowed_ips']) == 100_000
+
+
+def test_policy_builder_with_100k_users(timed):
+    users = pd.DataFrame({
+        'USER_NAME': [f"USER_{i}" for i in range(100_000)],
+        'USER_GROUP': np.where(np.arange(100_000) % 3, 'PERSON', 'SERVICE'),
+    })
+    with timed(5.0):
+        matched, _ = assign_policies(users, default_assignments())
+        sql = render_policy_builder_sql(default_authentication_policies(), default_session_policies(), matched)
+    assert sql.count('ALTER USER "') == 200_000
+
+
+def test_timeout_sweep_over_one_million_gaps(timed):
+    gaps = pd.DataFrame({
+        'USER_NAME': RNG.integers(0, 5_000, size=1_000_000).astype(str),
+        'SESSION_KEY': RNG.integers(0, 50_000, size=1_000_000).astype(str),
+        'GAP_MINS': RNG.exponential(30, size=1_000_000),
+    })
+    with timed(5.0):
+        sweep = simulate_timeouts(gaps)
+    assert len(sweep) == 476
+
+
+def test_validate_200k_names(timed):
+    names = [f"DB_{i}" for i in range(200_000)]
+    with timed(2.0):
+        problems = identifier_problems(names)
+    assert problems.isna().all()
+
+
+def test_optimize_policy_assignment_script(timed):
+    users = pd.DataFrame({'USER_NAME': [f"U{i}" for i in range(5_000)], 'USER_GROUP': 'PERSON'})
+    matched, _ = assign_policies(users, default_assignments())
+    # Unbatched, so the optimizer has 10,000 ALTER USER statements to group
+    sql = render_policy_builder_sql(default_authentication_policies(), default_session_policies(), matched,
+                                    batch_size=1)
+    with timed(10.0):
+        _, before, after = optimize_script(sql, batch_size=100)
+    assert after.round_trips < before.round_trips
+
+
+def test_rbac_page_render(timed):
+    at = AppTest.from_file(str(ROOT / 'pages' / '2_RBAC_Setup.py'), default_timeout=60)
+    at.session_state['database_name'] = 'SALES'
+    at.session_state['schema_name'] = 'RAW'
+    with timed(10.0):
+        at.run()
+    assert not at.exception
+
+
+def test_render_1000_rbac_diagrams(timed):
+    with timed(1.0):
+        sources = [render_rbac_diagram(f"DB_{i}", "RAW") for i in range(1_000)]
+    assert len(set(sources)) == 1_000
+
+
+@pytest.fixture(scope='module')
+def account_grants():
+    return synthetic_grants(users=2_000, roles=20_000, grants=1_000_000)
+
+
+def test_role_graph_with_20k_roles_and_1m_grants(account_grants, timed):
+    with timed(10.0):
+        graph = RoleGraph(account_grants)
+    assert graph.grant_count == len(account_grants)
+
+    with timed(5.0):
+        graph.search('rloe_1234')
+        for query in ['ROLE_12', 'TABLE_7', 'USER_99', 'db_3']:
+            assert not graph.search(query).empty
+    with timed(1.0):
+        orphans = graph.orphaned_roles()
+        edges, _ = graph.neighborhood(graph.find('ROLE_0'), depth=3, max_edges=200)
+        dot = graph.neighborhood_dot(graph.find('ROLE_0'), depth=3, max_edges=200)
+        for user in range(0, 2_000, 100):
+            graph.path(graph.find(f'USER_{user}'), graph.find('DB_1.PUBLIC.TABLE_1'))
+    assert len(orphans) > 0 and len(edges) <= 200 and dot.source
@@ -0,0 +1,67 @@
+import io
+
+import pandas as pd
+
+from sf_security.policy_builder import (
+    assign_policies, default_assignments, default_authentication_policies, default_session_policies,
+    load_users, render_policy_assignments, validate_policies
+)
+from sf_security.sql_script import split_statements
+
+
+def test_default_policies_are_valid():
+    assert validate_policies(default_authentication_policies(), default_session_policies(), default_assignments()) == []
+
+
+def test_validation_catches_bad_rows():
+    auth = default_authentication_policies()
+    auth.loc[0, 'NAME'] = 'bad name'
+    auth.loc[1, 'CLIENT_TYPES'] = 'SNOWFLAKE_UI, TELNET'
+    session = default_session_policies()
+    session.loc[0, 'IDLE_TIMEOUT_MINS'] = 1
+    errors = validate_policies(auth, session, default_assignments())
+    assert errors[0].startswith("authentication policy row 1: policy name 'bad name'")
+    assert "unknown client type 'TELNET'" in errors[1]
+    assert errors[2].startswith("session policy row 1: IDLE_TIMEOUT_MINS")
+    assert "'human_auth_policy' is not a defined authentication policy" in errors[3]
+
+
+def test_required_mfa_needs_the_snowflake_ui_client_type():
+    auth = default_authentication_policies()
+    auth.loc[0, 'CLIENT_TYPES'] = 'DRIVERS'
+    errors = validate_policies(auth, default_session_policies(), default_assignments())
+    assert errors == [
+        "authentication policy row 1: MFA enrollment REQUIRED needs the SNOWFLAKE_UI client type, "
+        "where users enroll in MFA"
+    ]
+    # No client types allows every client, including SNOWFLAKE_UI
+    auth.loc[0, 'CLIENT_TYPES'] = ''
+    assert validate_policies(auth, default_session_policies(), default_assignments()) == []
+
+
+def test_assign_policies_joins_on_user_group():
+    users = load_users(io.StringIO('name,type\nalice,person\nsvc,SERVICE\nbot,UNKNOWN\n'))
+    matched, unmatched = assign_policies(users, default_assignments())
+    assert matched.set_index('USER_NAME')['SESSION_POLICY'].to_dict() == {
+        'alice': 'human_session_policy', 'svc': 'service_session_policy'
+    }
+    assert unmatched['USER_NAME'].tolist() == ['bot']
+
+
+def test_assignments_are_batched_per_policy():
+    assigned = pd.DataFrame({
+        'USER_NAME': ['a', 'b', 'c"q'],
+        'USER_GROUP': ['PERSON'] * 3,
+        'AUTHENTICATION_POLICY': ['human_auth_policy'] * 3,
+        'SESSION_POLICY': [None] * 3,
+    })
+    sql = render_policy_assignments(assigned, batch_size=2)
+    assert sql.count('-- Authentication Policy: human_auth_policy (batch') == 2
+    assert 'ALTER USER "c""q" SET AUTHENTICATION POLICY SECURITY_DB.SECURITY_SCHEMA.human_auth_policy;' in sql
+    assert 'SESSION POLICY' not in sql
+    # A batch is one round trip; a batch of a single user is a plain statement
+    statements = split_statements(sql)
+    assert len(statements) == 2
+    assert statements[0].startswith('EXECUTE IMMEDIATE $$')
+    assert statements[0].count('ALTER USER') == 2
+    assert statements[1].startswith('ALTER USER "c""q"')
@@ -0,0 +1,117 @@
+"""Shared project model: cached fragments, selective invalidation, and the full account script"""
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+from sf_security.project import Project, get_project
+from sf_security.sql_script import split_statements
+from sf_security.templates import render_perimeter_sql, render_rbac_sql
+
+HOME_PAGE = str(ROOT / 'streamlit_app.py')
+
+
+def configured_project():
+    return Project(company_name='acme', database_name='SALES', schema_name='RAW')
+
+
+def test_fragments_assemble_the_perimeter_script():
+    project = Project(company_name='acme', allowed_ips=['1.2.3.4', '10.0.0.0/8'], blocked_ips=[],
+                      session_timeout=45, mfa_enrollment='OPTIONAL', client_types=['DRIVERS'])
+    expected = render_perimeter_sql('acme', ['1.2.3.4', '10.0.0.0/8'], [], 45, 'OPTIONAL', ['DRIVERS'])
+    assert project.perimeter_sql() == expected
+
+
+def test_updating_a_field_only_rebuilds_its_dependents():
+    project = configured_project()
+    project.perimeter_sql()
+    project.rbac_sql()
+    project.link_sql()
+    assert set(project.build_counts.values()) == {1}
+
+    assert project.update(session_timeout=60, company_name='acme') == ['session_timeout']
+    project.perimeter_sql()
+    project.rbac_sql()
+    project.link_sql()
+    assert project.build_counts['session_policy_sql'] == 2
+    assert all(count == 1 for name, count in project.build_counts.items() if name != 'session_policy_sql')
+
+    project.update(allowed_ips=['8.8.8.8'])
+    project.full_account_sql()
+    assert project.build_counts['network_rules_sql'] == 2
+    assert project.build_counts['link_sql'] == 2
+    assert project.build_counts['rbac_sql'] == 1
+
+
+def test_artifacts_are_keyed_on_values_not_list_identity():
+    project = configured_project()
+    roles = ['ANALYST']
+    project.update(functional_roles=roles)
+    first = project.rbac_sql()
+    roles.append('SUPPORT')
+    assert project.rbac_sql() == first == render_rbac_sql('SALES', 'RAW', ['ANALYST'])
+    assert project.update(functional_roles=['ANALYST']) == []
+
+
+def test_full_account_script_links_the_perimeter_to_the_rbac_roles():
+    project = configured_project()
+    statements = split_statements(project.full_account_sql())
+    assert "GRANT USAGE ON SCHEMA SECURITY_DB.SECURITY_SCHEMA TO ROLE RL_SALES_ADMIN" in statements
+    # The link runs after the RBAC script creates the admin role
+    assert statements.index("CREATE OR REPLACE ROLE RL_SALES_ADMIN") < statements.index(
+        "GRANT USAGE ON DATABASE SECURITY_DB TO ROLE RL_SALES_ADMIN"
+    )
+
+
+def test_full_account_script_only_includes_ready_parts():
+    assert Project().full_account_sql() == ""
+    perimeter_only = Project(company_name='acme')
+    assert perimeter_only.full_account_sql() == perimeter_only.perimeter_sql()
+    invalid_rbac = Project(company_name='acme', database_name='my db', schema_name='RAW')
+    assert not invalid_rbac.rbac_ready()
+    assert "RL_" not in invalid_rbac.full_account_sql()
+
+
+def test_unknown_fields_are_rejected():
+    with pytest.raises(KeyError):
+        Project(company='acme')
+    with pytest.raises(KeyError):
+        Project().update(database='SALES')
+
+
+def test_get_project_creates_one_project_per_session():
+    state = {}
+    assert get_project(state) is get_project(state)
+
+
+def test_home_page_offers_the_full_account_script():
+    at = AppTest.from_file(HOME_PAGE, default_timeout=60)
+    at.session_state['project'] = configured_project()
+    at.run()
+    assert not at.exception
+    assert len(at.success) == 2
+    assert "RL_SALES_ADMIN" in at.code[0].value
+
+
+def test_pages_share_the_project():
+    perimeter = AppTest.from_file(str(ROOT / 'pages' / '1_Perimeter_Setup.py'), default_timeout=60)
+    perimeter.session_state['company_name'] = 'acme'
+    perimeter.session_state['blocked_ips_input'] = ''
+    perimeter.run()
+    project = perimeter.session_state['project']
+    assert project.fields['company_name'] == 'acme'
+    assert project.fields['blocked_ips'] == ()
+
+    # Opening the RBAC page with the same session keeps the perimeter fields, and reopening
+    # the perimeter page starts its widgets from the project
+    rbac = AppTest.from_file(str(ROOT / 'pages' / '2_RBAC_Setup.py'), default_timeout=60)
+    rbac.session_state['project'] = project
+    rbac.session_state['database_name'] = 'SALES'
+    rbac.session_state['schema_name'] = 'RAW'
+    rbac.run()
+    assert project.rbac_ready() and project.perimeter_ready()
+
+    reopened = AppTest.from_file(str(ROOT / 'pages' / '1_Perimeter_Setup.py'), default_timeout=60)
+    reopened.session_state['project'] = project
+    reopened.run()
+    assert reopened.text_input(key='company_name').value == 'acme'
+    assert reopened.text_area(key='blocked_ips_input').value == ''
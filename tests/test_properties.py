@@ -0,0 +1,101 @@
+"""Property-based tests for input parsing, name validation, and the SQL generators"""
+import ipaddress
+
+from hypothesis import given, settings, strategies as st
+
+from sf_security.identifiers import identifier_problem, identifier_problems, quote_identifier
+from sf_security.network import ALLOWED, BLOCKED, INVALID, UNMATCHED, NetworkPolicyIndex, parse_ip_list
+from sf_security.sql_script import WORD, split_statements, tokenize
+from sf_security.templates import FUNCTIONAL_ROLES, render_perimeter_sql, render_rbac_sql
+
+ipv4_addresses = st.integers(min_value=0, max_value=2 ** 32 - 1).map(lambda value: str(ipaddress.IPv4Address(value)))
+ipv4_rules = st.one_of(
+    ipv4_addresses,
+    st.tuples(ipv4_addresses, st.integers(min_value=0, max_value=32)).map(lambda rule: f"{rule[0]}/{rule[1]}"),
+)
+# List items as a user might type them: no separators, but possibly padded with spaces
+ip_items = st.text(alphabet=st.characters(blacklist_characters=",\n\r"), min_size=1).filter(lambda item: item.strip())
+separators = st.sampled_from([",", ", ", "\n", " ,\n", ",,", "\n\n"])
+
+identifier_text = st.one_of(
+    st.text(),
+    st.from_regex(r'[A-Za-z_][A-Za-z0-9_$]{0,40}', fullmatch=True),
+    st.sampled_from(['TABLE', 'select', 'Schema', 'ACCOUNT']),
+)
+valid_names = st.from_regex(r'[A-Za-z_][A-Za-z0-9_$]{0,40}', fullmatch=True).filter(
+    lambda name: identifier_problem(name) is None
+)
+
+
+@given(st.lists(ip_items, max_size=20), separators)
+def test_parse_ip_list_round_trips_joined_items(items, separator):
+    assert parse_ip_list(separator.join(items)) == [item.strip() for item in items]
+
+
+@given(st.text())
+def test_parse_ip_list_returns_trimmed_non_empty_items(text):
+    for item in parse_ip_list(text):
+        assert item and item == item.strip()
+        assert ',' not in item and '\n' not in item
+
+
+@settings(max_examples=50)
+@given(st.lists(ipv4_rules, max_size=5), st.lists(ipv4_rules, max_size=5), st.lists(ipv4_addresses, max_size=20))
+def test_classification_matches_ipaddress(allowed, blocked, addresses):
+    index = NetworkPolicyIndex(allowed, blocked)
+    allowed_networks = [ipaddress.ip_network(rule, strict=False) for rule in allowed]
+    blocked_networks = [ipaddress.ip_network(rule, strict=False) for rule in blocked]
+    for address, label in zip(addresses, index.classify(addresses)):
+        ip = ipaddress.ip_address(address)
+        if any(ip in network for network in blocked_networks):
+            assert label == BLOCKED
+        elif any(ip in network for network in allowed_networks):
+            assert label == ALLOWED
+        else:
+            assert label == UNMATCHED
+
+
+@given(st.one_of(st.text(max_size=20), st.from_regex(r'\s?\d{1,4}(\.\d{1,4}){2,4}\s?', fullmatch=True)))
+def test_only_dotted_quads_are_classified(text):
+    label = NetworkPolicyIndex(['0.0.0.0/0'], []).classify_ip(text)
+    parts = text.strip().split('.')
+    is_dotted_quad = len(parts) == 4 and all(
+        part.isascii() and part.isdigit() and len(part) <= 3 and int(part) <= 255 for part in parts
+    )
+    assert label == (ALLOWED if is_dotted_quad else INVALID)
+
+
+@given(st.lists(st.one_of(identifier_text, st.none()), max_size=30))
+def test_vectorized_validation_matches_scalar(values):
+    assert identifier_problems(values).tolist() == [identifier_problem(value) for value in values]
+
+
+@given(st.text(min_size=1))
+def test_quoted_identifier_is_a_single_word(name):
+    quoted = quote_identifier(name)
+    tokens = tokenize(quoted)
+    assert tokens == [(WORD, quoted)]
+    if identifier_problem(name) is None:
+        assert quoted == name
+
+
+@given(valid_names, valid_names, st.lists(st.sampled_from(FUNCTIONAL_ROLES), min_size=1, unique=True))
+def test_valid_names_never_change_the_rbac_statements(database_name, schema_name, roles):
+    reference = split_statements(render_rbac_sql('DB', 'SC', roles))
+    statements = split_statements(render_rbac_sql(database_name, schema_name, roles))
+    assert len(statements) == len(reference)
+    assert [sql.split()[:2] for sql in statements] == [sql.split()[:2] for sql in reference]
+
+
+@given(valid_names)
+def test_valid_names_never_change_the_perimeter_statements(company_name):
+    reference = split_statements(render_perimeter_sql('acme', ['1.2.3.4'], ['5.6.7.8'], 30))
+    statements = split_statements(render_perimeter_sql(company_name, ['1.2.3.4'], ['5.6.7.8'], 30))
+    assert len(statements) == len(reference)
+
+
+@given(st.lists(st.from_regex(r"[A-Za-z0-9 _'.]{1,20}", fullmatch=True).map(lambda text: text.replace("'", "''")),
+                min_size=1, max_size=10))
+def test_split_statements_ignores_semicolons_in_literals(literals):
+    script = ";\n".join(f"SELECT '{literal};'" for literal in literals) + ";"
+    assert split_statements(script) == [f"SELECT '{literal};'" for literal in literals]
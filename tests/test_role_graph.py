@@ -0,0 +1,126 @@
+import io
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from conftest import ROOT
+from sf_security.role_graph import RoleGraph, load_grants, normalize_grants, synthetic_grants
+
+GRANTS_TO_ROLES = """PRIVILEGE,GRANTED_ON,NAME,TABLE_CATALOG,TABLE_SCHEMA,GRANTED_TO,GRANTEE_NAME,DELETED_ON
+USAGE,ROLE,SALES_READER,,,ROLE,SALES_ANALYST,
+USAGE,ROLE,SALES_ANALYST,,,ROLE,SYSADMIN,
+USAGE,DATABASE_ROLE,SC_R_DBR_SALES,SALES,,ROLE,SALES_READER,
+SELECT,TABLE,ORDERS,SALES,RAW,DATABASE_ROLE,SALES.SC_R_DBR_SALES,
+INSERT,TABLE,ORDERS,SALES,RAW,ROLE,SALES_WRITER,
+USAGE,SCHEMA,RAW,SALES,,DATABASE_ROLE,SALES.SC_R_DBR_SALES,
+OWNERSHIP,ROLE,LEGACY_ROLE,,,ROLE,SYSADMIN,
+SELECT,TABLE,CUSTOMERS,SALES,RAW,ROLE,LEGACY_ROLE,
+SELECT,TABLE,CUSTOMERS,SALES,RAW,ROLE,SALES_READER,2024-01-01
+"""
+
+GRANTS_TO_USERS = """ROLE,GRANTED_TO,GRANTEE_NAME,DELETED_ON
+SALES_ANALYST,USER,ALICE,
+SALES_WRITER,USER,BOB,2024-01-01
+"""
+
+
+@pytest.fixture
+def graph():
+    grants = pd.concat([
+        load_grants(io.BytesIO(GRANTS_TO_ROLES.encode()), file_name='grants_to_roles.csv'),
+        load_grants(io.BytesIO(GRANTS_TO_USERS.encode()), file_name='grants_to_users.csv'),
+    ], ignore_index=True)
+    return RoleGraph(grants)
+
+
+def test_exports_are_normalized(graph):
+    assert graph.find('SALES.RAW.ORDERS', kind='TABLE') is not None
+    assert graph.find('SALES.SC_R_DBR_SALES', kind='DATABASE_ROLE') is not None
+    # The revoked grant on CUSTOMERS and BOB's revoked role are dropped
+    assert graph.find('BOB') is None
+    assert graph.grant_count == 9
+
+
+def test_path_from_user_to_table_follows_role_grants(graph):
+    steps = graph.path(graph.find('ALICE'), graph.find('SALES.RAW.ORDERS'))
+    assert steps['GRANTED'].tolist() == [
+        'SALES_ANALYST (ROLE)', 'SALES_READER (ROLE)', 'SALES.SC_R_DBR_SALES (DATABASE_ROLE)',
+        'SALES.RAW.ORDERS (TABLE)',
+    ]
+    assert steps['PRIVILEGES'].iloc[-1] == 'SELECT'
+
+
+def test_ownership_of_a_role_is_not_inherited(graph):
+    # SYSADMIN owns LEGACY_ROLE but doesn't hold its privileges
+    assert graph.path(graph.find('SYSADMIN', kind='ROLE'), graph.find('SALES.RAW.CUSTOMERS')) is None
+    assert graph.path(graph.find('ALICE'), graph.find('SALES_WRITER')) is None
+
+
+def test_orphaned_roles(graph):
+    orphans = graph.orphaned_roles().set_index('ROLE')
+    assert set(orphans.index) == {'SYSADMIN', 'SALES_WRITER', 'LEGACY_ROLE'}
+    assert orphans.loc['SALES_WRITER', 'PRIVILEGES'] == 1
+    assert orphans.loc['SALES_WRITER', 'REASON'] == "not granted to any user or role"
+
+
+def test_prefix_and_token_search(graph):
+    names = graph.names[graph.prefix_search('sales_')].tolist()
+    assert names[:3] == ['SALES_ANALYST', 'SALES_READER', 'SALES_WRITER']
+    # "orders" is a token of SALES.RAW.ORDERS
+    assert graph.names[graph.prefix_search('ORD')].tolist() == ['SALES.RAW.ORDERS']
+
+
+def test_fuzzy_search_tolerates_typos(graph):
+    results = graph.search('SLAES_ANALYST', limit=3)
+    assert results['NAME'].iloc[0] == 'SALES_ANALYST'
+    assert results['MATCH'].iloc[0] == 'fuzzy'
+    assert graph.search('ALICE', kinds=('ROLE',)).empty
+
+
+def test_roles_with_privilege(graph):
+    holders = graph.roles_with_privilege('select', object_kind='TABLE')
+    assert holders['GRANTEE'].tolist() == ['LEGACY_ROLE', 'SALES.SC_R_DBR_SALES']
+
+
+def test_neighborhood_is_capped_and_summarized():
+    grants = normalize_grants(pd.DataFrame({
+        'PRIVILEGE': 'SELECT', 'GRANTED_ON': 'TABLE', 'NAME': [f"DB.S.T{i}" for i in range(500)],
+        'GRANTED_TO': 'ROLE', 'GRANTEE_NAME': 'WIDE_ROLE',
+    }))
+    graph = RoleGraph(grants)
+    edges, omitted = graph.neighborhood(graph.find('WIDE_ROLE'), depth=2, max_edges=20)
+    assert len(edges) == 20
+    assert omitted['COUNT'].sum() == 480
+    assert "+480 more table" in graph.neighborhood_dot(graph.find('WIDE_ROLE'), max_edges=20).source
+
+
+def test_synthetic_account_has_orphans_and_paths():
+    grants = synthetic_grants(users=50, roles=500, databases=2, tables_per_database=50, grants=5_000)
+    graph = RoleGraph(grants)
+    assert len(graph.orphaned_roles()) > 0
+    child = grants.loc[(grants['GRANTEE_NAME'] == 'ROLE_0') & (grants['GRANTED_ON'] == 'ROLE'), 'NAME'].iloc[0]
+    assert len(graph.path(graph.find('ROLE_0'), graph.find(child))) == 1
+
+
+def test_explorer_page_with_example_account():
+    at = AppTest.from_file(str(ROOT / 'pages' / '3_RBAC_Explorer.py'), default_timeout=120)
+    at.run()
+    assert at.info
+    at.session_state['explorer_use_example'] = True
+    at.session_state['explorer_query'] = 'ROLE_0'
+    at.run()
+    assert not at.exception
+    assert len(at.get('graphviz_chart')) == 1
+
+
+def test_neighborhood_keeps_edges_by_name():
+    grants = normalize_grants(pd.DataFrame({
+        'PRIVILEGE': 'SELECT', 'GRANTED_ON': 'TABLE', 'NAME': ['DB.S.ZEBRA', 'DB.S.apple', 'DB.S.MANGO'],
+        'GRANTED_TO': 'ROLE', 'GRANTEE_NAME': 'R',
+    }))
+    graph = RoleGraph(grants)
+    edges, omitted = graph.neighborhood(graph.find('R'), max_edges=2)
+    assert [graph.names[target] for target in edges['TARGET']] == ['DB.S.apple', 'DB.S.MANGO']
+    reused = graph.neighborhood_dot(graph.find('R'), neighborhood=(edges, omitted))
+    assert reused.source == graph.neighborhood_dot(graph.find('R'), max_edges=2).source
@@ -0,0 +1,37 @@
+import pandas as pd
+
+from sf_security.session_sim import idle_gaps, reauthentications_by_user, simulate_timeouts
+
+
+def activity():
+    return pd.DataFrame({
+        'USER_NAME': ['alice', 'alice', 'alice', 'bob', 'bob'],
+        'SESSION_ID': ['1', '1', '1', '2', '2'],
+        'START_TIME': ['2024-01-01 08:00', '2024-01-01 08:10', '2024-01-01 09:00',
+                       '2024-01-01 08:00', '2024-01-01 08:05'],
+        'END_TIME': ['2024-01-01 08:30', '2024-01-01 08:12', '2024-01-01 09:01',
+                     '2024-01-01 08:01', '2024-01-01 08:06'],
+    })
+
+
+def test_idle_gaps_start_after_the_longest_running_query():
+    gaps = idle_gaps(activity())
+    # alice's second query overlaps the first, so her idle time starts at 08:30
+    assert gaps.groupby('USER_NAME')['GAP_MINS'].apply(list).to_dict() == {
+        'alice': [0.0, 30.0], 'bob': [4.0]
+    }
+
+
+def test_simulate_timeouts_matches_direct_counts():
+    gaps = idle_gaps(activity())
+    sweep = simulate_timeouts(gaps, timeouts=[5, 20, 30]).set_index('TIMEOUT_MINS')
+    for timeout in (5, 20, 30):
+        forced = gaps[gaps['GAP_MINS'] > timeout]
+        assert sweep.loc[timeout, 'REAUTHENTICATIONS'] == len(forced)
+        assert sweep.loc[timeout, 'SESSIONS_ENDED'] == forced['SESSION_KEY'].nunique()
+    assert sweep.loc[20, 'REAUTHS_PER_USER'] == 0.5
+
+
+def test_reauthentications_by_user():
+    counts = reauthentications_by_user(idle_gaps(activity()), 20)
+    assert counts.to_dict('records') == [{'USER_NAME': 'alice', 'REAUTHENTICATIONS': 1}]
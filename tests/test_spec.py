@@ -0,0 +1,70 @@
+import pytest
+
+from sf_security.spec import SpecError, database_entry, dump_spec, load_spec, perimeter_section, render_spec
+from sf_security.templates import render_perimeter_sql, render_rbac_sql
+
+
+def example_spec():
+    return {
+        'version': 1,
+        'perimeter': perimeter_section('acme', ['192.0.0.1/24'], ['184.0.23.212'], 30),
+        'rbac': {'databases': [database_entry('MARKETING_DB', 'CRM_SCHEMA'),
+                               database_entry('SALES', 'RAW', ['ANALYST'])]},
+    }
+
+
+@pytest.mark.parametrize('fmt', ['yaml', 'json'])
+def test_dump_and_load_round_trip(fmt):
+    spec = example_spec()
+    assert load_spec(dump_spec(spec, fmt), file_name=f"spec.{fmt}") == spec
+
+
+def test_ip_lists_may_be_one_string():
+    spec = load_spec("perimeter:\n  company_name: acme\n  allowed_ips: |\n    10.0.0.0/8\n    11.0.0.1, 12.0.0.1\n")
+    assert spec['perimeter']['allowed_ips'] == ['10.0.0.0/8', '11.0.0.1', '12.0.0.1']
+
+
+def test_render_spec_matches_the_page_templates():
+    scripts = dict(render_spec(example_spec()))
+    assert scripts['security_perimeter_setup_acme.sql'] == render_perimeter_sql(
+        'acme', ['192.0.0.1/24'], ['184.0.23.212'], 30
+    )
+    assert scripts['rbac_setup_SALES_RAW.sql'] == render_rbac_sql('SALES', 'RAW', ['ANALYST'])
+
+
+def test_validation_reports_every_problem_with_its_path():
+    with pytest.raises(SpecError) as error:
+        load_spec("""
+version: 2
+perimeter:
+  company_name: acme corp
+  allowed_ips: [10.0.0.300]
+  session_timeout: 1
+rbac:
+  databases:
+    - {name: SALES, schema: RAW, functional_roles: [ADMIN]}
+    - {name: sales, schema: TABLE}
+""")
+    paths = [message.split(':')[0] for message in error.value.errors]
+    assert paths == [
+        'spec.version', 'perimeter.allowed_ips[0]', 'perimeter.session_timeout', 'perimeter.company_name',
+        'rbac.databases[0].functional_roles[0]', 'rbac.databases[1].schema', 'rbac.databases[1].name',
+    ]
+
+
+def test_databases_need_a_functional_role():
+    with pytest.raises(SpecError) as error:
+        load_spec("""
+rbac:
+  databases:
+    - {name: SALES, schema: RAW}
+    - {name: HR, schema: RAW, functional_roles: []}
+""")
+    assert error.value.errors == [
+        "rbac.databases[1].functional_roles: must list at least one of: ANALYST, DEVELOPER, SUPPORT"
+    ]
+
+
+def test_syntax_errors_report_the_location():
+    with pytest.raises(SpecError, match='line 1'):
+        load_spec('{"perimeter": ', file_name='spec.json')
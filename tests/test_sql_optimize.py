@@ -0,0 +1,96 @@
+import re
+
+from sf_security.executor import plan_statements, split_context
+from sf_security.sql_optimize import coalesce_statements, group_by_context, optimize_script
+from sf_security.sql_script import split_statements
+from sf_security.templates import render_perimeter_sql, render_rbac_sql
+
+_GRANT_RE = re.compile(r'GRANT (.+?) ON (.+?) TO (.+)', re.DOTALL)
+
+
+def expanded_grants(items):
+    """Every (privilege, object, grantee, role) granted by (sql, context) pairs"""
+    grants = []
+    for sql, context in items:
+        match = _GRANT_RE.fullmatch(' '.join(sql.split()))
+        if match:
+            for privilege in match.group(1).split(','):
+                grants.append((privilege.strip(), match.group(2), match.group(3), context.get('ROLE')))
+    return sorted(grants)
+
+
+def test_coalescing_keeps_every_grant():
+    items = split_context("""
+        USE ROLE SECURITYADMIN;
+        GRANT USAGE ON SCHEMA DB.S TO ROLE R;
+        GRANT CREATE TABLE ON SCHEMA DB.S TO ROLE R;
+        GRANT USAGE ON SCHEMA DB.S TO ROLE R;
+        GRANT USAGE ON SCHEMA DB.S TO ROLE OTHER;
+    """)
+    coalesced = coalesce_statements(items)
+    assert [sql for sql, _ in coalesced] == [
+        'GRANT USAGE, CREATE TABLE ON SCHEMA DB.S TO ROLE R', 'GRANT USAGE ON SCHEMA DB.S TO ROLE OTHER'
+    ]
+    assert sorted(set(expanded_grants(items))) == expanded_grants(coalesced)
+
+
+def test_grants_are_not_merged_across_a_revoke():
+    items = split_context("""
+        GRANT USAGE ON SCHEMA DB.S TO ROLE R;
+        REVOKE USAGE ON SCHEMA DB.S FROM ROLE R;
+        GRANT CREATE TABLE ON SCHEMA DB.S TO ROLE R;
+    """)
+    assert len(coalesce_statements(items)) == 3
+
+
+def test_grouping_is_a_valid_order_of_the_plan():
+    items = split_context(render_rbac_sql('SALES', 'RAW'))
+    plan = plan_statements(items)
+    order = group_by_context(items)
+    position = {id(item[0]): i for i, item in enumerate(order)}
+    for index, deps in enumerate(plan.dependencies):
+        for dep in deps:
+            assert position[id(items[dep][0])] < position[id(items[index][0])]
+
+
+def test_optimized_scripts_need_fewer_statements_and_role_switches():
+    for script in (render_rbac_sql('SALES', 'RAW'), render_perimeter_sql('acme', ['10.0.0.0/8'], [], 30)):
+        optimized, before, after = optimize_script(script)
+        assert after.statements < before.statements
+        assert after.role_switches <= before.role_switches
+        assert expanded_grants(split_context(optimized)) == sorted(set(expanded_grants(split_context(script))))
+
+    _, before, after = optimize_script(render_rbac_sql('SALES', 'RAW'), batch_size=50)
+    assert after.role_switches < before.role_switches
+    assert after.round_trips < before.round_trips / 2
+
+
+def test_repeated_dml_is_kept():
+    optimized, _, _ = optimize_script(
+        "USE ROLE SYSADMIN;\nINSERT INTO T VALUES (1);\nINSERT INTO T VALUES (1);\nSELECT COUNT(*) FROM T;"
+    )
+    assert optimized.count("INSERT INTO T VALUES (1);") == 2
+    items = split_context("CREATE ROLE IF NOT EXISTS R;\nCREATE ROLE IF NOT EXISTS R;\nCALL P();\nCALL P();")
+    assert [sql for sql, _ in coalesce_statements(items)] == ["CREATE ROLE IF NOT EXISTS R", "CALL P()", "CALL P()"]
+
+
+def test_queries_are_not_batched():
+    optimized, _, _ = optimize_script(render_rbac_sql('MKT', 'CRM'), batch_size=50)
+    top_level = split_statements(optimized)
+    queries = [sql for sql in top_level if sql.startswith(('SHOW', 'SELECT', 'DESCRIBE'))]
+    assert queries == [sql for sql in split_statements(render_rbac_sql('MKT', 'CRM'))
+                       if sql.startswith(('SHOW', 'SELECT', 'DESCRIBE'))]
+    blocks = [sql for sql in top_level if sql.startswith('EXECUTE IMMEDIATE')]
+    assert blocks
+    assert not any(re.search(r'^\s+(SHOW|SELECT|DESCRIBE)\b', sql, re.MULTILINE) for sql in blocks)
+
+
+def test_reordering_keeps_creates_before_container_grants_and_checks_last():
+    for batch_size in (1, 50):
+        optimized, _, _ = optimize_script(render_rbac_sql('MKT', 'CRM'), batch_size=batch_size)
+        create_table = optimized.index('CREATE OR REPLACE TABLE MKT.CRM.INVENTORY_LEVELS')
+        assert create_table < optimized.index('GRANT SELECT ON ALL TABLES IN SCHEMA MKT.CRM')
+        # The closing checks report the grants of the functional roles
+        last_grant = optimized.rindex('GRANT DATABASE ROLE SC_W_DBR_MKT TO ROLE MKT_DEVELOPER')
+        assert last_grant < optimized.index('SHOW GRANTS ON DATABASE MKT')
+        assert split_statements(optimized)[-2:] == ['SHOW GRANTS ON DATABASE MKT', 'SHOW GRANTS ON SCHEMA MKT.CRM']
@@ -0,0 +1,18 @@
+from sf_security.sql_script import COMMENT, STRING, WORD, split_statements, tokenize
+
+
+def test_split_ignores_semicolons_in_comments_and_literals():
+    script = "select 'a;b' -- x;y\n , 2;; /* ; */ select 3"
+    assert split_statements(script) == ["select 'a;b'\n, 2", 'select 3']
+
+
+def test_dollar_quoted_blocks_are_one_statement():
+    script = "EXECUTE IMMEDIATE $$\nBEGIN\n  SELECT 1;\nEND;\n$$; SELECT $user_name;"
+    assert split_statements(script) == ["EXECUTE IMMEDIATE $$\nBEGIN\n  SELECT 1;\nEND;\n$$", 'SELECT $user_name']
+
+
+def test_tokens():
+    tokens = tokenize('GRANT USAGE ON DATABASE "My;Db" TO ROLE r -- done\n')
+    assert (WORD, '"My;Db"') in tokens
+    assert tokens[-1] == (COMMENT, '-- done')
+    assert tokenize("SET v = 'it''s'")[-1] == (STRING, "'it''s'")